@@ -0,0 +1,6 @@
+"""
+Offline benchmarks for the Lambda scrapers.
+
+Benchmarks run against recorded fixtures and never touch the network, so they can
+be run locally or in CI to catch regressions before deploying.
+"""
@@ -0,0 +1,233 @@
+"""
+Cold-start benchmark for the scraper Lambda functions.
+
+Every function in serverless.yml has its handler imported in a fresh Python process,
+as Lambda does during INIT, and is then invoked once with an empty JSON body (which
+is answered with a 400 before any upstream request). The import time, first-call
+time and number of modules loaded are reported, along with the third-party packages
+the import pulled in.
+
+Each import is also checked against the function's package patterns, its dependency
+manifest: a first-party module the handler loads but its package would not contain
+is reported as a failure, since it would raise ImportError on Lambda. Package
+`__init__.py` files may be left out of a package (the directory is then imported as
+a namespace package), so they are not required.
+
+Usage (from the aws-lambda directory):
+
+    python -m benchmarks.coldstart               # Measure every function
+    python -m benchmarks.coldstart --runs 5      # Median over more fresh processes
+    python -m benchmarks.coldstart koa batch     # Only functions whose name contains a filter
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVERLESS_PATH = os.path.join(BASE_DIR, "serverless.yml")
+
+# Runs in the fresh process: import the handler, call it once and report what was loaded
+CHILD_SCRIPT = """
+import importlib, json, os, sys, time
+
+module_name, attribute = sys.argv[1], sys.argv[2]
+before = set(sys.modules)
+
+started = time.perf_counter()
+handler = getattr(importlib.import_module(module_name), attribute)
+imported = time.perf_counter()
+handler({"body": "{}"}, None)
+called = time.perf_counter()
+
+first_party, third_party = set(), set()
+for name in set(sys.modules) - before:
+    path = getattr(sys.modules[name], "__file__", None) or ""
+    if name.split(".")[0] == "scrapers" and path:
+        first_party.add(os.path.relpath(path, os.getcwd()).replace(os.sep, "/"))
+    elif "site-packages" in path or "dist-packages" in path:
+        third_party.add(name.split(".")[0])
+
+print(json.dumps({
+    "importMs": (imported - started) * 1000,
+    "firstCallMs": (called - imported) * 1000,
+    "modules": len(set(sys.modules) - before),
+    "firstParty": sorted(first_party),
+    "thirdParty": sorted(third_party)
+}))
+"""
+
+
+def _pattern(line):
+    match = re.match(r"^\s+-\s*\"([^\"]+)\"", line) or re.match(r"^\s+-\s*(\S+)", line)
+    return match.group(1) if match else None
+
+
+def load_functions(path=SERVERLESS_PATH):
+    """
+    Read the handlers and package patterns from serverless.yml.
+
+    Only the small subset of YAML used by that file is understood, so this does not
+    need PyYAML.
+
+    Returns:
+        tuple: (service-wide patterns, {function name: {"handler", "patterns"}})
+    """
+    service_patterns = []
+    functions = {}
+    section = None
+    function = None
+    in_patterns = False
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            top_level = re.match(r"^(\w+):", line)
+            if top_level:
+                section = top_level.group(1)
+                function = None
+                in_patterns = False
+                continue
+
+            if section == "package":
+                if re.match(r"^  patterns:", line):
+                    in_patterns = True
+                elif in_patterns and _pattern(line):
+                    service_patterns.append(_pattern(line))
+                continue
+
+            if section != "functions":
+                continue
+
+            function_match = re.match(r"^  (\w+):\s*$", line)
+            if function_match:
+                function = functions[function_match.group(1)] = {"handler": None, "patterns": []}
+                in_patterns = False
+                continue
+            if function is None:
+                continue
+
+            handler_match = re.match(r"^    handler:\s*(\S+)", line)
+            if handler_match:
+                function["handler"] = handler_match.group(1)
+            elif re.match(r"^      patterns:", line):
+                in_patterns = True
+            elif in_patterns and re.match(r"^        -", line):
+                function["patterns"].append(_pattern(line))
+            elif re.match(r"^    \S|^      \S", line):
+                in_patterns = False
+
+    return service_patterns, functions
+
+
+def _glob_regex(pattern):
+    regex = ""
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith("**/", index):
+            regex += "(?:.*/)?"
+            index += 3
+        elif pattern.startswith("**", index):
+            regex += ".*"
+            index += 2
+        elif pattern[index] == "*":
+            regex += "[^/]*"
+            index += 1
+        else:
+            regex += re.escape(pattern[index])
+            index += 1
+    return re.compile(f"^{regex}$")
+
+
+def is_packaged(path, patterns):
+    """
+    Whether a file ends up in a package, applying the patterns in order like Serverless.
+
+    Files are included by default; "!" patterns exclude and later patterns re-include.
+    """
+    included = True
+    for pattern in patterns:
+        negated = pattern.startswith("!")
+        if _glob_regex(pattern.lstrip("!")).match(path):
+            included = not negated
+    return included
+
+
+def measure(handler, runs):
+    """
+    Import and call a handler in `runs` fresh processes.
+
+    Returns:
+        dict: Median timings plus the modules loaded by the last run
+    """
+    module_path, _, attribute = handler.rpartition(".")
+    samples = []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-c", CHILD_SCRIPT, module_path.replace("/", "."), attribute],
+            cwd=BASE_DIR, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "import failed")
+        samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    result = dict(samples[-1])
+    result["importMs"] = round(statistics.median(sample["importMs"] for sample in samples), 1)
+    result["firstCallMs"] = round(statistics.median(sample["firstCallMs"] for sample in samples), 1)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the import and init time of every Lambda handler.")
+    parser.add_argument("filters", nargs="*", help="Only measure functions whose name contains one of these strings")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per function (the median is reported)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    service_patterns, functions = load_functions()
+    names = [name for name in functions if not args.filters or any(f in name for f in args.filters)]
+    if not names:
+        print("No functions match the given filters")
+        return 1
+
+    results = []
+    failed = False
+    for name in names:
+        function = functions[name]
+        try:
+            result = measure(function["handler"], args.runs)
+        except RuntimeError as e:
+            result = {"error": str(e)}
+        result["function"] = name
+
+        patterns = service_patterns + function["patterns"]
+        result["missing"] = [
+            path for path in result.get("firstParty", [])
+            if not path.endswith("__init__.py") and not is_packaged(path, patterns)
+        ]
+        failed = failed or "error" in result or bool(result["missing"])
+        results.append(result)
+
+        if args.json:
+            continue
+        if "error" in result:
+            print(f"{name:<34} FAIL  {result['error']}")
+            continue
+        status = "FAIL" if result["missing"] else "ok"
+        print(f"{name:<34} import {result['importMs']:>7.1f} ms  first call {result['firstCallMs']:>6.1f} ms"
+              f"  {result['modules']:>4} modules  {status}")
+        print(f"    third-party: {', '.join(result['thirdParty']) or '-'}")
+        for path in result["missing"]:
+            print(f"    - {path} is imported but not packaged")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
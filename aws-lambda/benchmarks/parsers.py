@@ -0,0 +1,218 @@
+"""
+Offline benchmark for the scraper parse stages.
+
+Every parser is fed its fixture from benchmarks/fixtures/, its output is checked
+against expected.json and its throughput (parses per second) and peak memory are
+measured. Results are compared against baseline.json so a slower parsing backend
+or a heavier extraction shows up as a failure instead of in production latency.
+
+Usage (from the aws-lambda directory):
+
+    python -m benchmarks.parsers                    # Check outputs and compare to the baseline
+    python -m benchmarks.parsers --save-baseline    # Record the current numbers as the baseline
+    python -m benchmarks.parsers --update-expected  # Accept the current parser outputs
+    python -m benchmarks.parsers koa newbook        # Only run cases whose name contains a filter
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from scrapers.mackinac_city.scrapeCabinsOfMackinaw.lambda_function import parse_room_rates
+from scrapers.providers import campspot, checkfront, koa, newbook
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BENCHMARK_DIR, "fixtures")
+EXPECTED_PATH = os.path.join(FIXTURE_DIR, "expected.json")
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+# Allowed slowdown / memory growth against the baseline before a case fails
+DEFAULT_TOLERANCE = 0.25
+
+# (case name, fixture file, parser)
+CASES = [
+    ("koa_verification_token", "koa_landing.html", koa.parse_verification_token),
+    ("koa_reservation_page", "koa_reserve.html", koa.parse_reservation_page),
+    ("newbook_categories", "newbook_categories.html", newbook.parse_categories),
+    ("checkfront_inventory", "checkfront_inventory.html", checkfront.parse_inventory),
+    ("cabins_room_rates", "cabins_request.html", parse_room_rates),
+    ("campspot_sites", "campspot_sites.json", campspot.parse_sites),
+    ("campspot_embedded_sites", "campspot_embedded.json", campspot.parse_sites),
+]
+
+
+def load_fixture(filename):
+    with open(os.path.join(FIXTURE_DIR, filename), encoding="utf-8") as f:
+        return f.read()
+
+
+def load_json(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def normalize(value):
+    """Round-trip a parser result through JSON so tuples and lists compare equal."""
+    return json.loads(json.dumps(value))
+
+
+def measure_throughput(parser, text, min_time, rounds):
+    """
+    Time a parser over its fixture.
+
+    The number of iterations per round is calibrated so each round takes roughly
+    `min_time` seconds; the best round is reported to reduce scheduler noise.
+
+    Returns:
+        float: Parses per second
+    """
+    # Warm up imports, regex caches and the allocator
+    parser(text)
+
+    iterations = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            parser(text)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / 10:
+            break
+        iterations *= 2
+    iterations = max(1, int(iterations * min_time / elapsed))
+
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            parser(text)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    return iterations / best
+
+
+def measure_peak_memory(parser, text):
+    """
+    Returns:
+        int: Peak bytes allocated while parsing the fixture once
+    """
+    tracemalloc.start()
+    try:
+        parser(text)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_case(name, fixture, parser, min_time, rounds):
+    text = load_fixture(fixture)
+    return {
+        "name": name,
+        "fixture": fixture,
+        "fixtureBytes": len(text.encode("utf-8")),
+        "output": normalize(parser(text)),
+        "opsPerSecond": round(measure_throughput(parser, text, min_time, rounds), 1),
+        "peakMemoryBytes": measure_peak_memory(parser, text)
+    }
+
+
+def compare(result, expected, baseline, tolerance):
+    """
+    Check one case against the expected output and the baseline numbers.
+
+    Returns:
+        list: Human-readable failure reasons (empty if the case passed)
+    """
+    failures = []
+    name = result["name"]
+
+    if name not in expected:
+        failures.append("no expected output recorded (run with --update-expected)")
+    elif result["output"] != expected[name]:
+        failures.append("output differs from expected.json")
+
+    previous = baseline.get(name)
+    if previous:
+        min_ops = previous["opsPerSecond"] * (1 - tolerance)
+        if result["opsPerSecond"] < min_ops:
+            failures.append(f"throughput {result['opsPerSecond']:.1f}/s is below baseline {previous['opsPerSecond']:.1f}/s")
+
+        max_memory = previous["peakMemoryBytes"] * (1 + tolerance)
+        if result["peakMemoryBytes"] > max_memory:
+            failures.append(f"peak memory {result['peakMemoryBytes']} B is above baseline {previous['peakMemoryBytes']} B")
+
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scraper parsers against recorded fixtures.")
+    parser.add_argument("filters", nargs="*", help="Only run cases whose name contains one of these strings")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Target seconds per measurement round")
+    parser.add_argument("--rounds", type=int, default=5, help="Measurement rounds per case (best is kept)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed regression as a fraction")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results to baseline.json")
+    parser.add_argument("--update-expected", action="store_true", help="Write the parser outputs to expected.json")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    cases = [case for case in CASES if not args.filters or any(f in case[0] for f in args.filters)]
+    if not cases:
+        print("No benchmark cases match the given filters")
+        return 1
+
+    expected = load_json(EXPECTED_PATH)
+    baseline = load_json(BASELINE_PATH)
+
+    results = []
+    failed = False
+    for name, fixture, parse in cases:
+        result = run_case(name, fixture, parse, args.min_time, args.rounds)
+
+        if args.update_expected:
+            expected[name] = result["output"]
+
+        failures = compare(result, expected, baseline, args.tolerance)
+        if args.save_baseline:
+            # Only output mismatches block a new baseline
+            failures = [reason for reason in failures if "output" in reason]
+        result["failures"] = failures
+        failed = failed or bool(failures)
+        results.append(result)
+
+        if not args.json:
+            status = "FAIL" if failures else "ok"
+            print(f"{name:<26} {result['opsPerSecond']:>10.1f} ops/s {result['peakMemoryBytes'] / 1024:>9.1f} KiB  {status}")
+            for reason in failures:
+                print(f"    - {reason}")
+
+    if args.update_expected:
+        save_json(EXPECTED_PATH, expected)
+
+    if args.save_baseline and not failed:
+        for result in results:
+            baseline[result["name"]] = {
+                "opsPerSecond": result["opsPerSecond"],
+                "peakMemoryBytes": result["peakMemoryBytes"]
+            }
+        save_json(BASELINE_PATH, baseline)
+
+    if args.json:
+        print(json.dumps([{key: value for key, value in result.items() if key != "output"} for result in results], indent=2))
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
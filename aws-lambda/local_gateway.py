@@ -0,0 +1,355 @@
+"""
+Local stand-in for the API Gateway routes in serverless.yml.
+
+Serves every `scrapers/<path>` route on localhost so the backend can be load-tested
+without spending real Lambda invocations. Point the backend at it with
+AWS_API_URL=http://localhost:3001.
+
+Two modes are available:
+
+    stub    Answer with synthetic availability after a sampled latency (default)
+    invoke  Run the real lambda_handler in-process; combine with
+            SCRAPER_HTTP_MODE=replay to serve recorded upstream responses
+
+In both modes each route keeps a pool of simulated containers. A request that finds
+no idle warm container pays the cold-start penalty, and containers idle for longer
+than --idle-timeout go cold again, mirroring Lambda's scaling behaviour.
+
+Latency distributions (--latency):
+
+    fixed:MS             Always MS milliseconds
+    uniform:LOW,HIGH     Uniform between LOW and HIGH milliseconds
+    lognormal:MEDIAN,P95 Log-normal with the given median and 95th percentile
+
+Examples (from the aws-lambda directory):
+
+    python local_gateway.py --latency lognormal:1200,4000 --error-rate 0.02 --cold-start-ms 1500
+    SCRAPER_HTTP_MODE=replay python local_gateway.py --mode invoke
+"""
+
+import argparse
+import importlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVERLESS_PATH = os.path.join(BASE_DIR, "serverless.yml")
+
+# API Gateway gives up on integrations after 29 seconds
+GATEWAY_TIMEOUT_SECONDS = 29
+
+ACCOMMODATION_TYPES = ("tent", "rv", "lodging")
+
+
+def load_routes(path=SERVERLESS_PATH):
+    """
+    Read the function handlers and HTTP paths from serverless.yml.
+
+    Only the small subset of YAML used by that file is understood, so this does not
+    need PyYAML.
+
+    Returns:
+        dict: Route path (e.g. "scrapers/anchor-inn") -> {"function", "handler"}
+    """
+    routes = {}
+    function_name = None
+    handler = None
+    in_functions = False
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if re.match(r"^functions:\s*$", line):
+                in_functions = True
+                continue
+            if not in_functions:
+                continue
+            if re.match(r"^\S", line):
+                break
+
+            function_match = re.match(r"^  (\w+):\s*$", line)
+            if function_match:
+                function_name = function_match.group(1)
+                handler = None
+                continue
+
+            handler_match = re.match(r"^\s+handler:\s*(\S+)", line)
+            if handler_match:
+                handler = handler_match.group(1)
+                continue
+
+            path_match = re.match(r"^\s+path:\s*(\S+)", line)
+            if path_match and function_name:
+                routes[path_match.group(1).strip("/")] = {"function": function_name, "handler": handler}
+
+    return routes
+
+
+def parse_latency(spec):
+    """
+    Build a latency sampler from a --latency specification.
+
+    Returns:
+        callable: Function returning a latency in seconds
+    """
+    kind, _, values = spec.partition(":")
+    numbers = [float(value) for value in values.split(",") if value]
+
+    if kind == "fixed" and len(numbers) == 1:
+        return lambda: numbers[0] / 1000
+    if kind == "uniform" and len(numbers) == 2:
+        return lambda: random.uniform(numbers[0], numbers[1]) / 1000
+    if kind == "lognormal" and len(numbers) == 2:
+        median, p95 = numbers
+        mu = math.log(median)
+        sigma = max(0.0, (math.log(p95) - mu) / 1.645)
+        return lambda: random.lognormvariate(mu, sigma) / 1000
+
+    raise ValueError(f"Invalid latency specification {spec!r}")
+
+
+class ContainerPool:
+    """
+    Simulated Lambda containers for one route.
+    """
+
+    def __init__(self, idle_timeout):
+        self.idle_timeout = idle_timeout
+        self._idle = []  # Last-used times of warm, idle containers
+        self._busy = 0
+        self._lock = threading.Lock()
+        self.cold_starts = 0
+        self.invocations = 0
+
+    def acquire(self):
+        """
+        Take a warm container if one is idle, otherwise start a new one.
+
+        Returns:
+            bool: True if this invocation is a cold start
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.invocations += 1
+            self._idle = [last_used for last_used in self._idle if now - last_used <= self.idle_timeout]
+            self._busy += 1
+            if self._idle:
+                self._idle.pop()
+                return False
+            self.cold_starts += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._busy -= 1
+            self._idle.append(time.monotonic())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "invocations": self.invocations,
+                "coldStarts": self.cold_starts,
+                "busy": self._busy,
+                "warmIdle": len(self._idle)
+            }
+
+
+def stub_result(function_name, cold_start, init_ms, total_ms):
+    """Build a synthetic scraper response with the same shape as the real Lambdas."""
+    result = {}
+    for accommodation_type in ACCOMMODATION_TYPES:
+        if random.random() < 0.6:
+            price = round(random.uniform(35, 250), 2)
+            result[accommodation_type] = {
+                "available": True,
+                "price": price,
+                "message": f"${price:.2f} per night - Stub {accommodation_type} site"
+            }
+        else:
+            result[accommodation_type] = {"available": False, "price": None, "message": "Not available"}
+
+    result["timestamp"] = datetime.now().isoformat()
+    result["scraper"] = function_name
+    result["timings"] = {
+        "coldStart": cold_start,
+        "initMs": init_ms,
+        "totalMs": total_ms,
+        "stages": [{"name": "fetch", "offsetMs": 0.0, "durationMs": total_ms}],
+        "totals": {"fetch": total_ms}
+    }
+    return result
+
+
+def stub_ranges_result(function_name, ranges, cold_start, init_ms, total_ms):
+    """Build a synthetic multi-range scraper response with one stub result per date range."""
+    payload = stub_result(function_name, cold_start, init_ms, total_ms)
+    entries = [
+        {
+            "startDate": date_range.get("startDate"),
+            "endDate": date_range.get("endDate"),
+            "result": {key: value for key, value in stub_result(function_name, False, 0.0, total_ms).items() if key in ACCOMMODATION_TYPES}
+        }
+        for date_range in ranges
+    ]
+    return {"ranges": entries, "timestamp": payload["timestamp"], "scraper": function_name, "timings": payload["timings"]}
+
+
+def stub_batch_result(jobs, error_rate, cold_start, init_ms, total_ms):
+    """Build a synthetic batch scraper response; each job fails independently at the error rate."""
+    results = []
+    for job in jobs:
+        campground_id = job.get("campgroundId")
+        if random.random() < error_rate:
+            results.append({"campgroundId": campground_id, "statusCode": 500, "error": "Injected scraper error"})
+        else:
+            results.append({"campgroundId": campground_id, "statusCode": 200, "result": stub_result(campground_id, False, 0.0, total_ms)})
+
+    payload = stub_result("Batch", cold_start, init_ms, total_ms)
+    return {"results": results, "timestamp": payload["timestamp"], "scraper": "Batch", "timings": payload["timings"]}
+
+
+class LocalGateway:
+    def __init__(self, routes, mode, latency, error_rate, cold_start_ms, idle_timeout):
+        self.routes = routes
+        self.mode = mode
+        self.latency = latency
+        self.error_rate = error_rate
+        self.cold_start_ms = cold_start_ms
+        self.pools = {path: ContainerPool(idle_timeout) for path in routes}
+        self._handlers = {}
+        self._handlers_lock = threading.Lock()
+
+    def _lambda_handler(self, route):
+        with self._handlers_lock:
+            handler = self._handlers.get(route["function"])
+            if handler is None:
+                module_path, _, attribute = route["handler"].rpartition(".")
+                module = importlib.import_module(module_path.replace("/", "."))
+                handler = getattr(module, attribute)
+                self._handlers[route["function"]] = handler
+            return handler
+
+    def invoke(self, path, body):
+        """
+        Serve one request for a route.
+
+        Returns:
+            tuple: (status code, response body dict)
+        """
+        route = self.routes[path]
+        pool = self.pools[path]
+        cold_start = pool.acquire()
+        started = time.perf_counter()
+
+        try:
+            init_ms = 0.0
+            if cold_start and self.cold_start_ms:
+                init_ms = self.cold_start_ms
+                time.sleep(self.cold_start_ms / 1000)
+
+            if self.mode == "invoke":
+                response = self._lambda_handler(route)({"body": body}, None)
+                status = response.get("statusCode", 200)
+                payload = json.loads(response.get("body") or "{}")
+            else:
+                time.sleep(self.latency())
+                total_ms = round((time.perf_counter() - started) * 1000 - init_ms, 2)
+                request_body = json.loads(body or "{}")
+                jobs = request_body.get("jobs")
+                ranges = request_body.get("ranges")
+                if random.random() < self.error_rate:
+                    status, payload = 500, {"error": "Injected scraper error"}
+                elif jobs is not None:
+                    status, payload = 200, stub_batch_result(jobs, self.error_rate, cold_start, init_ms, total_ms)
+                elif ranges is not None:
+                    status, payload = 200, stub_ranges_result(route["function"], ranges, cold_start, init_ms, total_ms)
+                else:
+                    status, payload = 200, stub_result(route["function"], cold_start, init_ms, total_ms)
+
+            if time.perf_counter() - started > GATEWAY_TIMEOUT_SECONDS:
+                return 504, {"message": "Endpoint request timed out"}
+            return status, payload
+        finally:
+            pool.release()
+
+    def stats(self):
+        return {path: pool.stats() for path, pool in self.pools.items()}
+
+
+def make_request_handler(gateway):
+    class RequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            path = self.path.split("?")[0].strip("/")
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length).decode("utf-8") if length else None
+
+            if path not in gateway.routes:
+                self._send(403, {"message": "Missing Authentication Token"})
+                return
+
+            status, payload = gateway.invoke(path, body)
+            self._send(status, payload)
+
+        def do_GET(self):
+            if self.path.strip("/") == "_stats":
+                self._send(200, gateway.stats())
+            else:
+                self._send(403, {"message": "Missing Authentication Token"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return RequestHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the scraper API Gateway routes locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3001)
+    parser.add_argument("--mode", choices=("stub", "invoke"), default="stub")
+    parser.add_argument("--latency", default="lognormal:1500,5000", help="Scrape latency distribution (stub mode)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub requests that fail with a 500")
+    parser.add_argument("--cold-start-ms", type=float, default=1200, help="Extra latency for a cold container")
+    parser.add_argument("--idle-timeout", type=float, default=600, help="Seconds before an idle container goes cold")
+    args = parser.parse_args()
+
+    routes = load_routes()
+    gateway = LocalGateway(
+        routes,
+        args.mode,
+        parse_latency(args.latency),
+        args.error_rate,
+        args.cold_start_ms,
+        args.idle_timeout
+    )
+
+    server = ThreadingHTTPServer((args.host, args.port), make_request_handler(gateway))
+    server.daemon_threads = True
+    print(f"Serving {len(routes)} scraper routes in {args.mode} mode on http://{args.host}:{args.port}")
+    print(f"Container stats: http://{args.host}:{args.port}/_stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
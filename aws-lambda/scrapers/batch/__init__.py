@@ -0,0 +1,5 @@
+"""
+Batch package for Lambda function.
+
+Runs several campground scrapers in a single invocation.
+"""
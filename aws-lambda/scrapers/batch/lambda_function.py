@@ -0,0 +1,136 @@
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from scrapers import registry
+from scrapers.common import retry, timings
+from scrapers.common.handler import RESPONSE_HEADERS, bad_request, parse_body
+
+MAX_JOBS = 50
+MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 8))
+
+# Jobs for sibling campgrounds run in this container, so providers may share lookups between them
+os.environ.setdefault('SCRAPER_SHARE_SIBLINGS', '1')
+
+
+def run_job(job, trace, deadline, context):
+    """
+    Run a single campground scrape from a batch through that campground's own handler.
+
+    Args:
+        job (dict): {"campgroundId", "startDate", "endDate", "numAdults", "numKids"}, with
+            "ranges" in place of the dates to scrape several date ranges, an optional
+            "types" list of accommodation types and an optional "maxAge" for cached results
+        trace (dict): Trace context of the batch invocation
+        deadline (float): Absolute deadline of the batch invocation (Unix epoch seconds), or None
+        context (object): AWS Lambda context object
+
+    Returns:
+        dict: {"campgroundId", "statusCode"} plus "result" on success or "error" on failure
+    """
+    campground_id = job.get('campgroundId')
+    if campground_id not in registry.SCRAPER_MODULES:
+        return {"campgroundId": campground_id, "statusCode": 404, "error": f"No scraper configured for {campground_id}"}
+
+    body = {
+        'startDate': job.get('startDate'),
+        'endDate': job.get('endDate'),
+        'numAdults': job.get('numAdults', 2),
+        'numKids': job.get('numKids', 0),
+        'trace': trace,
+        'deadline': deadline
+    }
+    if job.get('ranges') is not None:
+        body['ranges'] = job['ranges']
+    if job.get('types') is not None:
+        body['types'] = job['types']
+    if job.get('maxAge') is not None:
+        body['maxAge'] = job['maxAge']
+
+    try:
+        handler = registry.get_handler(campground_id)
+        response = handler({'body': json.dumps(body)}, context)
+        status_code = response.get('statusCode', 500)
+        response_body = json.loads(response.get('body') or '{}')
+    except Exception as e:
+        print(f"Error running batch job for {campground_id}: {str(e)}")
+        traceback.print_exc()
+        return {"campgroundId": campground_id, "statusCode": 500, "error": f"Error: {str(e)}"}
+
+    if status_code == 200:
+        return {"campgroundId": campground_id, "statusCode": 200, "result": response_body}
+
+    return {
+        "campgroundId": campground_id,
+        "statusCode": status_code,
+        "error": response_body.get('message', f"Scraper returned status code {status_code}"),
+        "timings": response_body.get('timings')
+    }
+
+
+def lambda_handler(event, context):
+    """
+    AWS Lambda handler that scrapes several campgrounds in one invocation.
+
+    The body carries a list of jobs, each a campground ID with its own dates and
+    party size. Jobs run concurrently on a thread pool through the existing scraper
+    handlers, so one invocation replaces a Lambda call (and potential cold start)
+    per campground. Results are returned in job order, with errors reported per job.
+
+    Args:
+        event (dict): AWS Lambda event object
+        context (object): AWS Lambda context object
+
+    Returns:
+        dict: API Gateway response object
+    """
+    with timings.start() as timer:
+        body, error_response = parse_body(event)
+        if error_response:
+            return error_response
+
+        jobs = body.get('jobs')
+        if not isinstance(jobs, list) or not jobs:
+            return bad_request('Missing jobs')
+        if len(jobs) > MAX_JOBS:
+            return bad_request(f'Too many jobs ({len(jobs)}), the limit is {MAX_JOBS}')
+
+        timer.trace = body.get('trace') or {}
+
+        # Jobs run on pool threads, so the batch deadline travels to them in the job payload
+        with retry.deadline_scope(context, body.get('deadline')):
+            left = retry.remaining()
+            deadline = time.time() + left if left is not None else None
+
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(jobs))) as executor:
+            results = list(executor.map(lambda job: run_job(job, timer.trace, deadline, context), jobs))
+
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'results': results,
+                'timestamp': datetime.now().isoformat(),
+                'scraper': 'Batch',
+                'timings': timer.as_dict()
+            }),
+            'headers': RESPONSE_HEADERS
+        }
+
+
+# This is used for local testing
+if __name__ == '__main__':
+    # Test the function with sample event
+    test_event = {
+        'body': json.dumps({
+            'jobs': [
+                {'campgroundId': 'anchor-inn', 'startDate': '06/29/25', 'endDate': '07/02/25', 'numAdults': 2, 'numKids': 0},
+                {'campgroundId': 'tourist-park', 'startDate': '06/29/25', 'endDate': '07/02/25', 'numAdults': 2, 'numKids': 0}
+            ]
+        })
+    }
+
+    response = lambda_handler(test_event, None)
+    print(json.dumps(response, indent=2))
@@ -0,0 +1,6 @@
+"""
+Shared runtime helpers for the scraper Lambda functions.
+
+Modules in this package are imported explicitly by each scraper (for example
+`from scrapers.common import timings`) so every Lambda only loads what it uses.
+"""
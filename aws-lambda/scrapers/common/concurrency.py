@@ -0,0 +1,108 @@
+"""
+Concurrent upstream requests for the scrapers.
+
+Threads do not inherit context variables, so work submitted to a plain thread pool
+would lose the invocation's stage timer, deadline and shared session. `map_concurrently`
+runs every call in a copy of the caller's context instead.
+
+`SharedResults` lets scrapers running in the same container (the batch Lambda, the
+local runner) share one upstream lookup: the first caller computes the result and
+concurrent or recent callers with the same key wait for it instead. Results that
+report an upstream failure are not kept for later callers. Sharing only
+pays off where sibling scrapers run in one process, so providers check
+`shares_siblings()` before widening a lookup to cover siblings: it is true in the
+batch Lambda and the backend's local pool (SCRAPER_SHARE_SIBLINGS=1), and false in
+the per-campground Lambdas, where each container only ever serves one scraper.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from scrapers.common import retry
+
+
+def shares_siblings():
+    """Whether scrapers for other campgrounds run in this process and can reuse shared results."""
+    return os.environ.get("SCRAPER_SHARE_SIBLINGS") == "1"
+
+
+def map_concurrently(function, items, max_workers=None):
+    """
+    Call `function` for every item at the same time and collect the results.
+
+    Args:
+        function (callable): Takes one item
+        items (list): Arguments, one call each
+        max_workers (int): Upper bound on concurrent calls (default: one per item)
+
+    Returns:
+        list: Results in the order of `items`; an exception from any call propagates
+    """
+    items = list(items)
+    if len(items) <= 1:
+        return [function(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers or len(items), len(items))) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, function, item) for item in items]
+        return [future.result() for future in futures]
+
+
+class SharedResults:
+    """
+    Single-flight results kept for a short time.
+
+    Args:
+        ttl (float): Seconds a finished result is shared after it was started
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, compute, keep=None):
+        """
+        Return the shared result for `key`, calling `compute()` if there is none.
+
+        A failed computation is not shared; its exception only reaches the callers
+        already waiting for it. The same goes for a result `keep(result)` rejects,
+        e.g. one in which some upstream request failed.
+
+        Raises:
+            retry.DeadlineExceeded: If the result is not ready before the deadline
+        """
+        now = time.monotonic()
+        with self._lock:
+            for stale_key in [k for k, (created, future) in self._results.items() if future.done() and now - created > self.ttl]:
+                del self._results[stale_key]
+            entry = self._results.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._results[key] = (now, Future())
+        future = entry[1]
+
+        if owner:
+            try:
+                result = compute()
+            except Exception as e:
+                with self._lock:
+                    self._results.pop(key, None)
+                future.set_exception(e)
+            else:
+                if keep is not None and not keep(result):
+                    with self._lock:
+                        self._results.pop(key, None)
+                future.set_result(result)
+
+        try:
+            return future.result(timeout=retry.remaining())
+        except FutureTimeoutError:
+            raise retry.DeadlineExceeded(f"Shared result for {key!r} was not ready before the deadline")
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
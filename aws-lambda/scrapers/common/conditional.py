@@ -0,0 +1,160 @@
+"""
+Conditional GETs for catalog-style upstream resources.
+
+Some requests fetch pages or JSON documents that rarely change between calls:
+recreation.gov campsite catalogs and seasonal rates, or landing pages fetched only
+for a token or a cookie. A `Cache` keeps the last body of each such resource with
+its validators (ETag / Last-Modified) and turns later fetches into conditional
+requests (If-None-Match / If-Modified-Since). A 304 answer reuses the cached body,
+so only headers cross the network.
+
+How long a cached body is used without asking the upstream at all is up to the
+caller:
+
+    revalidate_after  Bodies with validators are reused for this many seconds, then
+                      revalidated with a conditional request (default 0, always ask)
+    freshness         Bodies without validators are reused for this many seconds,
+                      then downloaded again in full (default 0, always download)
+
+`Cache.get` returns a requests.Response either way. Its `cache_status` attribute
+is "hit" (served without a request), "revalidated" (the upstream answered 304 and
+the body is the cached one) or "miss" (downloaded in full). Hits and revalidations
+have status 200, so callers handle them like a full download.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+DEFAULT_MAX_ENTRIES = 64
+
+HIT = "hit"
+REVALIDATED = "revalidated"
+MISS = "miss"
+
+
+class _Entry:
+    def __init__(self, response):
+        self.content = response.content
+        self.encoding = response.encoding
+        self.content_type = response.headers.get("Content-Type")
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        self.checked = time.monotonic()
+
+    @property
+    def has_validators(self):
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def response(self, url):
+        """Build a 200 response carrying the cached body, for answers served without a request."""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = self.content
+        response.encoding = self.encoding
+        if self.content_type:
+            response.headers["Content-Type"] = self.content_type
+        return response
+
+
+class Cache:
+    """
+    Cached bodies and validators for a set of resources, keyed by URL and query parameters.
+
+    Instances are module level for resources that may be shared by every session, or
+    kept on a session (in its `bootstrap` cache) when the body only makes sense with
+    that session's cookies.
+    """
+
+    def __init__(self, revalidate_after=0, freshness=0, max_entries=DEFAULT_MAX_ENTRIES):
+        self.revalidate_after = revalidate_after
+        self.freshness = freshness
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(url, params):
+        return url, tuple(sorted((params or {}).items()))
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, session, url, params=None, headers=None, **kwargs):
+        """
+        GET a resource, reusing or revalidating the cached body when possible.
+
+        Args:
+            session (requests.Session): Session that sends the request, if one is needed
+            url (str): Resource URL
+            params (dict): Query parameters, part of the cache key
+            headers (dict): Request headers; the conditional headers are added to them
+            **kwargs: Passed on to `session.get` (e.g. timeout)
+
+        Returns:
+            requests.Response: The upstream response, or one carrying the cached body;
+                see `cache_status`. Error responses are returned as they are.
+        """
+        key = self._key(url, params)
+        entry = self._lookup(key)
+
+        if entry is not None:
+            max_age = self.revalidate_after if entry.has_validators else self.freshness
+            if time.monotonic() - entry.checked <= max_age:
+                response = entry.response(url)
+                response.cache_status = HIT
+                return response
+
+        request_headers = dict(headers or {})
+        if entry is not None and entry.has_validators:
+            request_headers.update(entry.conditional_headers())
+
+        response = session.get(url, params=params, headers=request_headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            # Validators may be refreshed on a 304; the body stays the cached one
+            entry.etag = response.headers.get("ETag", entry.etag)
+            entry.last_modified = response.headers.get("Last-Modified", entry.last_modified)
+            entry.checked = time.monotonic()
+            self._store(key, entry)
+            response.status_code = 200
+            response._content = entry.content
+            response.encoding = entry.encoding
+            response.cache_status = REVALIDATED
+            return response
+
+        if response.status_code == 200:
+            entry = _Entry(response)
+            if entry.has_validators or self.freshness > 0:
+                self._store(key, entry)
+            else:
+                with self._lock:
+                    self._entries.pop(key, None)
+        response.cache_status = MISS
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
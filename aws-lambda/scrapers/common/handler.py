@@ -0,0 +1,280 @@
+"""
+Shared API Gateway handling for the scraper Lambda functions.
+
+Every scraper exposes a `lambda_handler` that delegates here, so request parsing,
+response formatting and stage timings behave identically across functions.
+
+Besides a single `startDate`/`endDate`, the body may carry a `ranges` list of
+{"startDate", "endDate"} objects. The ranges are scraped one after another on one
+shared transport session, so cookies and bootstrap tokens are fetched once per
+invocation rather than once per range.
+
+Each invocation runs inside a retry deadline (see retry.py) taken from the Lambda
+context and an optional `deadline` in the body, the Unix time at which the backend
+stops waiting. Scrapes that fail with a transient error are retried while time
+allows, ranges that cannot start before the deadline are reported as such, and an
+invocation that runs out of time answers with a 504 instead of being killed by the
+Lambda timeout. Scrapers that make several upstream requests stop sending them once
+the deadline passes; one that already has an answer for some accommodation types
+returns those with `"partial": true`.
+
+An optional `types` list (any of "tent", "rv", "lodging") limits the result to those
+accommodation types. Scrapers whose function takes a `types` argument receive it and
+skip the upstream requests only other types need; other scrapers run in full and
+their result is filtered.
+
+Identical scrapes in a warm container are answered from a short-lived result cache
+(see responses.py); `maxAge` in the body sets the oldest acceptable answer in
+seconds, and 0 always scrapes.
+"""
+
+import inspect
+import json
+import traceback
+from datetime import datetime
+
+from scrapers.common import responses, retry, timings, transport
+
+RESPONSE_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Credentials': 'true'
+}
+
+# Upper bound on date ranges per invocation, keeping sequential scrapes inside the API Gateway timeout
+MAX_RANGES = 14
+
+# Attempts per scrape for transient errors that escape the scraper itself
+SCRAPE_ATTEMPTS = 2
+
+ACCOMMODATION_TYPES = ("tent", "rv", "lodging")
+
+
+def bad_request(message):
+    return {
+        'statusCode': 400,
+        'body': json.dumps({
+            'message': message
+        })
+    }
+
+
+def parse_body(event):
+    """
+    Parse the JSON body of an API Gateway event.
+
+    Returns:
+        tuple: (body, error_response) - exactly one of them is None
+    """
+    if not event.get('body'):
+        return None, bad_request('Missing request body')
+
+    try:
+        return json.loads(event['body']), None
+    except Exception as e:
+        return None, bad_request(f'Error parsing request body: {str(e)}')
+
+
+def validate_ranges(ranges):
+    """
+    Check the `ranges` field of a request body.
+
+    Returns:
+        str or None: An error message, or None if the ranges are usable
+    """
+    if not isinstance(ranges, list) or not ranges:
+        return 'ranges must be a non-empty list'
+    if len(ranges) > MAX_RANGES:
+        return f'Too many ranges ({len(ranges)}), the limit is {MAX_RANGES}'
+    for date_range in ranges:
+        if not isinstance(date_range, dict) or not all([date_range.get('startDate'), date_range.get('endDate')]):
+            return 'Each range needs a startDate and endDate'
+    return None
+
+
+def validate_types(types):
+    """
+    Check the `types` field of a request body.
+
+    Returns:
+        str or None: An error message, or None if the types are usable
+    """
+    if not isinstance(types, list) or not types or any(t not in ACCOMMODATION_TYPES for t in types):
+        return f'types must be a non-empty list of {", ".join(ACCOMMODATION_TYPES)}'
+    return None
+
+
+def validate_max_age(max_age):
+    """
+    Check the `maxAge` field of a request body.
+
+    Returns:
+        str or None: An error message, or None if the value is usable
+    """
+    if isinstance(max_age, bool) or not isinstance(max_age, (int, float)) or max_age < 0:
+        return 'maxAge must be a non-negative number of seconds'
+    return None
+
+
+def accepts_types(scrape):
+    """Whether a scraper function takes a `types` argument."""
+    try:
+        return 'types' in inspect.signature(scrape).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def select_types(result, types):
+    """Drop the accommodation types that were not requested from a scraper result."""
+    if types is None or not isinstance(result, dict):
+        return result
+    return {key: value for key, value in result.items() if key not in ACCOMMODATION_TYPES or key in types}
+
+
+def run_scrape(scrape, start_date, end_date, num_adults, num_kids, types=None, scraper_name=None, max_age=None):
+    """
+    Run one scrape, retrying transient failures while the deadline allows.
+
+    With a `scraper_name`, a result cached in this container within `max_age` seconds
+    is returned instead, and concurrent identical scrapes share one run.
+    """
+    kwargs = {'types': types} if types is not None and accepts_types(scrape) else {}
+
+    def scrape_once():
+        result = retry.run(lambda attempt: scrape(start_date, end_date, num_adults, num_kids, **kwargs),
+                           max_attempts=SCRAPE_ATTEMPTS)
+        return select_types(result, types)
+
+    if scraper_name is None:
+        return scrape_once()
+    key = responses.make_key(scraper_name, start_date, end_date, num_adults, num_kids, types)
+    return responses.fetch(key, max_age, scrape_once)
+
+
+def scrape_ranges(scrape, ranges, num_adults, num_kids, scraper_name, types=None, max_age=None):
+    """
+    Scrape several date ranges on one shared session.
+
+    A failing range is reported in its own entry and does not stop the others. Once
+    the deadline has passed, the remaining ranges are reported without being scraped.
+
+    Returns:
+        list: {"startDate", "endDate"} plus "result" or "error" per range, in request order
+    """
+    results = []
+    with transport.shared_session():
+        for date_range in ranges:
+            entry = {'startDate': date_range['startDate'], 'endDate': date_range['endDate']}
+            if retry.expired():
+                entry['error'] = 'Deadline reached before this range was scraped'
+                results.append(entry)
+                continue
+            try:
+                entry['result'] = run_scrape(scrape, date_range['startDate'], date_range['endDate'], num_adults, num_kids,
+                                             types, scraper_name, max_age)
+            except Exception as e:
+                print(f"Error in {scraper_name} Lambda for {entry['startDate']} - {entry['endDate']}: {str(e)}")
+                traceback.print_exc()
+                entry['error'] = f'Error: {str(e)}'
+            results.append(entry)
+    return results
+
+
+def _scrape_response(body, scrape, scraper_name, timer):
+    """Scrape the dates in a parsed request body and build the success response."""
+    # Extract parameters
+    start_date = body.get('startDate')
+    end_date = body.get('endDate')
+    num_adults = body.get('numAdults', 2)
+    num_kids = body.get('numKids', 0)
+    ranges = body.get('ranges')
+    types = body.get('types')
+    max_age = body.get('maxAge')
+
+    if types is not None:
+        error_message = validate_types(types)
+        if error_message:
+            return bad_request(error_message)
+
+    if max_age is not None:
+        error_message = validate_max_age(max_age)
+        if error_message:
+            return bad_request(error_message)
+
+    if ranges is not None:
+        error_message = validate_ranges(ranges)
+        if error_message:
+            return bad_request(error_message)
+        result = {'ranges': scrape_ranges(scrape, ranges, num_adults, num_kids, scraper_name, types, max_age)}
+    elif not all([start_date, end_date]):
+        return bad_request('Missing required parameters')
+    else:
+        # Call the scraper function
+        result = run_scrape(scrape, start_date, end_date, num_adults, num_kids, types, scraper_name, max_age)
+
+    # Add timestamp, scraper name and stage timings
+    result['timestamp'] = datetime.now().isoformat()
+    result['scraper'] = scraper_name
+    result['timings'] = timer.as_dict()
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps(result),
+        'headers': RESPONSE_HEADERS
+    }
+
+
+def handle_request(event, context, scrape, scraper_name):
+    """
+    Run a scraper for an API Gateway event and wrap its result in a proxy response.
+
+    Args:
+        event (dict): AWS Lambda event object
+        context (object): AWS Lambda context object
+        scrape (callable): Scraper taking (start_date, end_date, num_adults, num_kids) and
+            optionally `types`, called once per date range
+        scraper_name (str): Name reported in the `scraper` response field
+
+    Returns:
+        dict: API Gateway response object
+    """
+    with timings.start() as timer:
+        try:
+            body, error_response = parse_body(event)
+            if error_response:
+                return error_response
+
+            timer.trace = body.get('trace') or {}
+
+            with retry.deadline_scope(context, body.get('deadline')):
+                return _scrape_response(body, scrape, scraper_name, timer)
+
+        except retry.DeadlineExceeded as e:
+            print(f"Deadline exceeded in {scraper_name} Lambda: {str(e)}")
+
+            return {
+                'statusCode': 504,
+                'body': json.dumps({
+                    'message': f'Deadline exceeded: {str(e)}',
+                    'scraper': scraper_name,
+                    'timestamp': datetime.now().isoformat(),
+                    'timings': timer.as_dict()
+                }),
+                'headers': RESPONSE_HEADERS
+            }
+
+        except Exception as e:
+            error_traceback = traceback.format_exc()
+            print(f"Error in {scraper_name} Lambda: {str(e)}")
+            print(f"Traceback: {error_traceback}")
+
+            return {
+                'statusCode': 500,
+                'body': json.dumps({
+                    'message': f'Error: {str(e)}',
+                    'scraper': scraper_name,
+                    'timestamp': datetime.now().isoformat(),
+                    'timings': timer.as_dict()
+                }),
+                'headers': RESPONSE_HEADERS
+            }
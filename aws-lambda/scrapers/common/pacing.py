@@ -0,0 +1,113 @@
+"""
+Adaptive request pacing for scrapers of rate-limited sites.
+
+A Pacer sends requests straight away while the recent request rate is low and only
+starts spacing them out once the site signals rate limiting. The backoff grows with
+each signal, is raised to any Retry-After the site sends, and decays again as
+requests succeed. Pacers are created at module level, so their state carries over
+between warm invocations of the same Lambda container.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+
+from scrapers.common import retry, timings
+
+
+class Pacer:
+    """
+    Paces requests to one upstream site.
+
+    Args:
+        window (float): Seconds of request history used to judge the recent rate
+        free_requests (int): Requests allowed within the window without any spacing
+        min_interval (float): Spacing between requests once the free allowance is used up
+        base_delay (float): Backoff after the first rate-limit signal
+        max_delay (float): Upper bound on the backoff
+        jitter (float): Random fraction added to every wait so requests are not regular
+    """
+
+    def __init__(self, window=60.0, free_requests=6, min_interval=1.0, base_delay=2.0, max_delay=30.0, jitter=0.25):
+        self.window = window
+        self.free_requests = free_requests
+        self.min_interval = min_interval
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+        self.backoff = 0.0
+        self.blocked_until = 0.0
+        self.rate_limited_count = 0
+        self._sent = deque()
+        self._lock = threading.Lock()
+
+    def _delay(self, now):
+        while self._sent and now - self._sent[0] > self.window:
+            self._sent.popleft()
+
+        delay = max(0.0, self.blocked_until - now)
+        if self._sent:
+            since_last = now - self._sent[-1]
+            if self.backoff:
+                delay = max(delay, self.backoff - since_last)
+            elif len(self._sent) >= self.free_requests:
+                delay = max(delay, self.min_interval - since_last)
+        return delay
+
+    def wait(self):
+        """
+        Block until the next request may be sent, then count it as sent.
+
+        Returns:
+            float: Seconds waited
+
+        Raises:
+            retry.DeadlineExceeded: If the wait would run past the invocation's deadline
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay = self._delay(now)
+            if delay > 0:
+                delay *= 1 + random.uniform(0, self.jitter)
+            left = retry.remaining()
+            if left is not None and delay > left - retry.MIN_TIMEOUT:
+                raise retry.DeadlineExceeded(f"Pacing requires a {delay:.1f}s wait with {max(left, 0):.1f}s left")
+            # Reserve the slot before sleeping so concurrent callers queue up behind it
+            self._sent.append(now + delay)
+
+        if delay > 0:
+            timings.sleep(delay)
+        return delay
+
+    def rate_limited(self, retry_after=None):
+        """
+        Record a rate-limit signal (an error page or a 429 response).
+
+        Args:
+            retry_after (str or float): Retry-After value sent by the site, in seconds
+        """
+        with self._lock:
+            self.rate_limited_count += 1
+            self.backoff = min(self.max_delay, max(self.base_delay, self.backoff * 2))
+            try:
+                wait = float(retry_after) if retry_after is not None else 0.0
+            except ValueError:
+                wait = 0.0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + max(wait, self.backoff))
+
+    def succeeded(self):
+        """Record a request that was not rate limited, letting the backoff decay."""
+        with self._lock:
+            self.backoff = self.backoff / 2 if self.backoff / 2 >= self.min_interval else 0.0
+
+    def state(self):
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "recentRequests": sum(1 for sent in self._sent if now - sent <= self.window),
+                "backoff": round(self.backoff, 2),
+                "blockedFor": round(max(0.0, self.blocked_until - now), 2),
+                "rateLimited": self.rate_limited_count
+            }
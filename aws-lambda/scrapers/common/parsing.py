@@ -0,0 +1,161 @@
+"""
+HTML parsing backend for the scrapers.
+
+Two levels are offered:
+
+    parsing.document(html)  An lxml.html tree for XPath extraction, by far the
+                            fastest option; None when lxml is unavailable, so
+                            callers fall back to BeautifulSoup
+    parsing.soup(html)      A BeautifulSoup tree built with lxml when installed and
+                            Python's html.parser otherwise
+
+Passing `only=parsing.only(...)` to `soup()` restricts tree building to the elements
+the extraction actually reads (a SoupStrainer), so the rest of a large page is
+skipped instead of being turned into Python objects.
+
+bs4 and lxml are imported on first use rather than with this module, so a scraper
+that never parses HTML does not load them, and the others load them at their first
+parse instead of during the Lambda's init phase.
+
+The parser can be forced with SCRAPER_HTML_PARSER ("lxml" or "html.parser"), e.g.
+to compare results: `python -m benchmarks.parsers` checks every provider against
+the recorded expectations with whichever parser is active.
+"""
+
+import os
+import threading
+
+FAST_PARSER = "lxml"
+FALLBACK_PARSER = "html.parser"
+
+# (lxml.html, ParserError) once imported, False when lxml is not installed
+_lxml = None
+
+
+def _load_lxml():
+    global _lxml
+    if _lxml is None:
+        try:
+            import lxml.html
+            from lxml.etree import ParserError
+            _lxml = (lxml.html, ParserError)
+        except ImportError:
+            _lxml = False
+    return _lxml
+
+
+def get_parser():
+    """
+    Returns:
+        str: The BeautifulSoup tree builder to use
+    """
+    configured = os.environ.get("SCRAPER_HTML_PARSER")
+    if configured == FALLBACK_PARSER or not _load_lxml():
+        return FALLBACK_PARSER
+    return FAST_PARSER
+
+
+def only(tag=None, class_=None, **attrs):
+    """
+    Describe the elements to keep when parsing, in `find_all` terms.
+
+    Args:
+        tag (str or list): Tag name(s) to keep
+        class_ (str or list): CSS class(es), any of which matches
+        **attrs: Other attribute filters (e.g. name="__RequestVerificationToken")
+
+    Returns:
+        Only: Filter to pass as `only` to `soup()`
+    """
+    if class_ is not None:
+        attrs["class"] = _class_matcher(class_)
+    return Only(tag, attrs)
+
+
+class Only:
+    """Elements to keep when parsing; the SoupStrainer is built on first use."""
+
+    def __init__(self, tag, attrs):
+        self.tag = tag
+        self.attrs = attrs
+        self._strainer = None
+
+    def strainer(self):
+        if self._strainer is None:
+            from bs4 import SoupStrainer
+            self._strainer = SoupStrainer(self.tag, self.attrs)
+        return self._strainer
+
+
+def _class_matcher(class_):
+    # While parsing, SoupStrainer sees the raw class attribute ("row main-row"), so
+    # match its individual classes rather than the whole string
+    wanted = {class_} if isinstance(class_, str) else set(class_)
+
+    def matches(value):
+        if value is None:
+            return False
+        classes = value.split() if isinstance(value, str) else value
+        return not wanted.isdisjoint(classes)
+
+    return matches
+
+
+def soup(html, only=None):
+    """
+    Parse HTML with the fastest available parser.
+
+    Args:
+        html (str): Document or fragment to parse
+        only (Only): Restrict the tree to matching elements and their descendants
+
+    Returns:
+        BeautifulSoup: The parsed tree
+    """
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, get_parser(), parse_only=only.strainer() if only is not None else None)
+
+
+def document(html):
+    """
+    Parse HTML into an lxml.html tree.
+
+    Args:
+        html (str): Document or fragment to parse
+
+    Returns:
+        lxml.html.HtmlElement or None: The root element, or None when the fast parser is
+            unavailable (or disabled with SCRAPER_HTML_PARSER) and the caller should use `soup()`
+    """
+    if get_parser() != FAST_PARSER:
+        return None
+    lxml_html, parser_error = _load_lxml()
+    if not html or not html.strip():
+        return lxml_html.fromstring("<html></html>")
+    try:
+        # Bytes, because lxml rejects str input that carries an encoding declaration
+        return lxml_html.fromstring(html.encode("utf-8"), parser=_utf8_parser())
+    except parser_error:
+        return None
+
+
+# lxml parsers must not be shared between threads (the batch Lambda parses concurrently)
+_local = threading.local()
+
+
+def _utf8_parser():
+    parser = getattr(_local, "parser", None)
+    if parser is None:
+        parser = _local.parser = _load_lxml()[0].HTMLParser(encoding="utf-8")
+    return parser
+
+
+def has_class(name):
+    """XPath predicate matching elements with the given CSS class, e.g. `//div[{has_class('row')}]`."""
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+def first(elements):
+    """First result of an XPath query, or None."""
+    return elements[0] if elements else None
@@ -0,0 +1,213 @@
+"""
+Warm-container cache of scrape results.
+
+Identical requests that reach the same warm container a few seconds apart (e.g.
+when several backend workers miss their caches at once) are answered from here
+instead of scraping the upstream site again, and identical requests running at the
+same time in one container (the batch Lambda, the backend's local runner) share a
+single scrape.
+
+Entries are keyed by the normalized query: scraper, ISO dates, party size and the
+sorted accommodation types. The caller decides how old an answer may be with
+`maxAge` in the request body (seconds, 0 to always scrape); without it
+SCRAPER_RESPONSE_MAX_AGE applies (default 60). Nothing is kept longer than
+SCRAPER_RESPONSE_CACHE_TTL (default 300).
+
+Entries live in memory, at most SCRAPER_RESPONSE_CACHE_ENTRIES of them (default
+256, least recently used evicted first), and results larger than
+SCRAPER_RESPONSE_CACHE_MAX_BYTES of JSON (default 64 KiB) are not cached. Setting
+SCRAPER_RESPONSE_CACHE_DIR (e.g. /tmp/scraper-responses) also writes them there,
+so the processes of the backend's local scraper pool share them. Partial results
+(cut short by the deadline) and failures are never cached: results with an `error`,
+and results where a scraper reported an accommodation type it could not check with
+`failure(message)`, which marks it with `"error": true`.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from scrapers.common import concurrency, timings
+
+DEFAULT_MAX_AGE = 60
+DEFAULT_TTL = 300
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 64 * 1024
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+
+# Concurrent identical scrapes wait for the first one; finished scrapes are not kept here
+_in_flight = concurrency.SharedResults(ttl=0)
+
+
+def _setting(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _normalize_date(value):
+    try:
+        return datetime.strptime(value, '%m/%d/%y').date().isoformat()
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def make_key(scraper_name, start_date, end_date, num_adults, num_kids, types=None):
+    """
+    Build the cache key for a scrape.
+
+    Returns:
+        str: The normalized query, e.g. "Anchorinn|2025-06-29|2025-07-02|2|0|all"
+    """
+    try:
+        party = f"{int(num_adults)}|{int(num_kids)}"
+    except (TypeError, ValueError):
+        party = f"{num_adults}|{num_kids}"
+    types_part = ",".join(sorted(set(types))) if types is not None else "all"
+    return "|".join([scraper_name, _normalize_date(start_date), _normalize_date(end_date), party, types_part])
+
+
+def _path(key):
+    directory = os.environ.get("SCRAPER_RESPONSE_CACHE_DIR")
+    if not directory:
+        return None
+    return os.path.join(directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+
+def _read_file(key):
+    path = _path(key)
+    if path is None:
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("key") != key:
+        return None
+    return entry["created"], entry["result"]
+
+
+def _write_file(key, created, result):
+    path = _path(key)
+    if path is None:
+        return
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # Written under a temporary name and renamed, so readers never see half a file
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "created": created, "result": result}, f)
+        os.replace(temporary, path)
+
+        files = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".json")]
+        excess = len(files) - int(_setting("SCRAPER_RESPONSE_CACHE_ENTRIES", DEFAULT_MAX_ENTRIES))
+        if excess > 0:
+            for stale in sorted(files, key=os.path.getmtime)[:excess]:
+                os.remove(stale)
+    except OSError as e:
+        print(f"Could not write response cache file {path}: {str(e)}")
+
+
+def get(key, max_age):
+    """
+    Return a cached result no older than `max_age` seconds.
+
+    Returns:
+        dict or None: A copy of the cached result, or None on a miss
+    """
+    max_age = min(max_age, _setting("SCRAPER_RESPONSE_CACHE_TTL", DEFAULT_TTL))
+    if max_age <= 0:
+        return None
+
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            _entries.move_to_end(key)
+    if entry is None:
+        entry = _read_file(key)
+    if entry is None or time.time() - entry[0] > max_age:
+        return None
+    return copy.deepcopy(entry[1])
+
+
+def failure(message):
+    """
+    Build the result for an accommodation type the scraper could not check (e.g. a failed request).
+
+    Returns:
+        dict: {"available", "price", "message"} like any result, plus the `error` marker
+    """
+    return {"available": False, "price": None, "message": message, "error": True}
+
+
+def is_failure(result):
+    """Whether a result has an error, or any accommodation type marked by `failure`."""
+    if result.get("error"):
+        return True
+    return any(isinstance(value, dict) and value.get("error") for value in result.values())
+
+
+def put(key, result):
+    """Cache a result unless it is partial, a failure or too large."""
+    if not isinstance(result, dict) or result.get("partial") or is_failure(result):
+        return
+    try:
+        size = len(json.dumps(result))
+    except (TypeError, ValueError):
+        return
+    if size > _setting("SCRAPER_RESPONSE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES):
+        return
+
+    created = time.time()
+    result = copy.deepcopy(result)
+    with _lock:
+        _entries[key] = (created, result)
+        _entries.move_to_end(key)
+        while len(_entries) > _setting("SCRAPER_RESPONSE_CACHE_ENTRIES", DEFAULT_MAX_ENTRIES):
+            _entries.popitem(last=False)
+    _write_file(key, created, result)
+
+
+def fetch(key, max_age, scrape):
+    """
+    Answer a scrape from the cache, or run it once for all concurrent identical callers.
+
+    Args:
+        key (str): Key from `make_key`
+        max_age (float): Oldest acceptable cached result in seconds, or None for the default
+        scrape (callable): Runs the scrape and returns its result
+
+    Returns:
+        dict: The result (a copy, so callers may add fields to it)
+    """
+    if max_age is None:
+        max_age = _setting("SCRAPER_RESPONSE_MAX_AGE", DEFAULT_MAX_AGE)
+
+    with timings.stage("cache"):
+        cached = get(key, max_age)
+    if cached is not None:
+        return cached
+
+    def scrape_and_store():
+        result = scrape()
+        put(key, result)
+        return result
+
+    return copy.deepcopy(_in_flight.get(key, scrape_and_store))
+
+
+def clear():
+    """Drop every in-memory entry (files under SCRAPER_RESPONSE_CACHE_DIR are kept)."""
+    with _lock:
+        _entries.clear()
+    _in_flight.clear()
@@ -0,0 +1,192 @@
+"""
+Deadline-aware retries for the scrapers.
+
+The handler opens a deadline scope for every invocation. The deadline is the earliest
+of the Lambda's remaining execution time, the API Gateway integration timeout (the
+functions are configured for 60 seconds but API Gateway stops waiting after 29) and
+an absolute `deadline` (Unix epoch seconds) from the request body, minus a margin
+for building the response. Scrapers then use:
+
+    retry.run(attempt, fallback=...)   Call `attempt` until it succeeds, backing off
+                                       exponentially between retryable failures, and
+                                       return the fallback (or the best partial
+                                       result) once attempts or time run out
+    retry.timeout(seconds)             A request timeout that never outlasts the deadline
+    retry.remaining()                  Seconds left, or None when there is no deadline
+"""
+
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import requests
+
+from scrapers.common import timings
+
+# API Gateway abandons the integration after 29 seconds; SCRAPER_TIME_BUDGET overrides
+DEFAULT_TIME_BUDGET = 29.0
+
+# Time kept back from the deadline for serialising and returning the response
+DEADLINE_MARGIN = 1.5
+
+# Shortest request timeout worth attempting
+MIN_TIMEOUT = 1.0
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+_deadline = ContextVar("scraper_deadline", default=None)
+
+
+class RetryableError(Exception):
+    """
+    A failure worth retrying, e.g. a rate-limit page or a 5xx response.
+
+    Args:
+        message (str): Description used in the fallback result
+        partial (dict): Best result obtained by the failed attempt, if any
+    """
+
+    def __init__(self, message, partial=None):
+        super().__init__(message)
+        self.partial = partial
+
+
+class DeadlineExceeded(Exception):
+    """Raised when there is not enough time left for another attempt."""
+
+
+def is_retryable(error):
+    """
+    Decide whether an exception from a scrape attempt is worth retrying.
+
+    Connection problems, timeouts and 408/425/429/5xx responses are transient;
+    parsing errors and other client errors will fail the same way again.
+    """
+    if isinstance(error, RetryableError):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError):
+        return error.response is not None and error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def _context_deadline(context):
+    get_remaining = getattr(context, "get_remaining_time_in_millis", None)
+    if get_remaining is None:
+        return None
+    return time.monotonic() + get_remaining() / 1000
+
+
+def _payload_deadline(deadline):
+    if deadline is None:
+        return None
+    try:
+        return time.monotonic() + (float(deadline) - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@contextmanager
+def deadline_scope(context=None, deadline=None):
+    """
+    Set the deadline for the enclosed block.
+
+    Args:
+        context (object): AWS Lambda context object (may be None)
+        deadline (float): Absolute deadline as Unix epoch seconds (may be None)
+
+    Yields:
+        float or None: The deadline on the time.monotonic() clock
+    """
+    budget = time.monotonic() + float(os.environ.get("SCRAPER_TIME_BUDGET", DEFAULT_TIME_BUDGET))
+    candidates = [value for value in (budget, _context_deadline(context), _payload_deadline(deadline)) if value is not None]
+    effective = min(candidates) - DEADLINE_MARGIN
+
+    outer = _deadline.get()
+    if outer is not None and outer < effective:
+        effective = outer
+
+    token = _deadline.set(effective)
+    try:
+        yield effective
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Seconds until the deadline, or None when the invocation has no deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def expired():
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def timeout(seconds):
+    """
+    Bound a request timeout by the time left.
+
+    Raises:
+        DeadlineExceeded: If less than MIN_TIMEOUT is left
+    """
+    left = remaining()
+    if left is None:
+        return seconds
+    if left < MIN_TIMEOUT:
+        raise DeadlineExceeded(f"Only {max(left, 0):.1f}s left before the deadline")
+    return min(seconds, left)
+
+
+def backoff_delay(attempt, base_delay, max_delay):
+    """Exponential backoff with full jitter for the given zero-based attempt number."""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def run(attempt, max_attempts=4, base_delay=1.0, max_delay=8.0, retryable=is_retryable, fallback=None):
+    """
+    Call `attempt` until it succeeds, within the current deadline.
+
+    Args:
+        attempt (callable): Takes the zero-based attempt number and returns the result
+        max_attempts (int): Upper bound on the number of attempts
+        base_delay (float): Backoff before the second attempt, doubling afterwards
+        max_delay (float): Upper bound on a single backoff
+        retryable (callable): Classifies an exception as retryable
+        fallback (callable): Builds the result from the last exception when giving up;
+            without one the exception propagates
+
+    Returns:
+        The first successful result; otherwise the best partial result carried by a
+        RetryableError, or the fallback
+    """
+    best_partial = None
+    last_error = None
+
+    for attempt_number in range(max_attempts):
+        try:
+            return attempt(attempt_number)
+        except Exception as e:
+            last_error = e
+            if isinstance(e, RetryableError) and e.partial is not None:
+                best_partial = e.partial
+            if isinstance(e, DeadlineExceeded) or not retryable(e) or attempt_number == max_attempts - 1:
+                break
+
+            delay = backoff_delay(attempt_number, base_delay, max_delay)
+            left = remaining()
+            # Leave enough time for the next attempt to complete at least one short request
+            if left is not None and left - delay < MIN_TIMEOUT:
+                last_error = DeadlineExceeded(f"Deadline reached after {attempt_number + 1} attempts: {str(e)}")
+                break
+            timings.sleep(delay)
+
+    if best_partial is not None:
+        return best_partial
+    if fallback is not None:
+        return fallback(last_error)
+    raise last_error
@@ -0,0 +1,115 @@
+"""
+Per-invocation stage timings for the scraper Lambdas.
+
+The handler starts a StageTimer for each request and scrapers mark their stages
+(bootstrap requests, upstream fetches, parsing, deliberate sleeps) with
+`timings.stage(...)`. The collected timings are returned to the backend in the
+`timings` field of every response so it can assemble an end-to-end trace.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Recorded when the first scraper module imports this one, i.e. during Lambda init
+_PROCESS_STARTED = time.perf_counter()
+_cold_start = True
+
+_current_timer = ContextVar("scraper_stage_timer", default=None)
+
+
+class StageTimer:
+    """
+    Collects named stage durations for a single scraper invocation.
+    """
+
+    def __init__(self, trace=None):
+        global _cold_start
+
+        self.trace = trace or {}
+        self.started = time.perf_counter()
+        self.stages = []
+        self.cold_start = _cold_start
+        self.init_ms = (self.started - _PROCESS_STARTED) * 1000 if _cold_start else 0.0
+        _cold_start = False
+
+    def add(self, name, started, ended):
+        self.stages.append({
+            "name": name,
+            "offsetMs": round((started - self.started) * 1000, 2),
+            "durationMs": round((ended - started) * 1000, 2)
+        })
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, started, time.perf_counter())
+
+    def as_dict(self):
+        """
+        Summarise the invocation for the `timings` response field.
+
+        Returns:
+            dict: Trace identifiers, cold start flag, per-stage list and totals per stage name
+        """
+        totals = {}
+        for entry in self.stages:
+            totals[entry["name"]] = round(totals.get(entry["name"], 0.0) + entry["durationMs"], 2)
+
+        return {
+            "traceId": self.trace.get("traceId"),
+            "parentSpanId": self.trace.get("spanId"),
+            "coldStart": self.cold_start,
+            "initMs": round(self.init_ms, 2),
+            "totalMs": round((time.perf_counter() - self.started) * 1000, 2),
+            "stages": self.stages,
+            "totals": totals
+        }
+
+
+@contextmanager
+def start(trace=None):
+    """
+    Start a StageTimer and make it the current timer for the enclosed block.
+
+    Args:
+        trace (dict): Trace context from the request payload ({"traceId", "spanId"})
+
+    Yields:
+        StageTimer: The active timer
+    """
+    timer = StageTimer(trace)
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+
+
+def current():
+    """Return the StageTimer for the running invocation, or None outside a handler."""
+    return _current_timer.get()
+
+
+@contextmanager
+def stage(name):
+    """
+    Time the enclosed block as a named stage of the current invocation.
+
+    Does nothing when no timer is active, so scrapers can be called directly.
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+def sleep(seconds):
+    """Sleep deliberately (pacing between upstream requests) and record it as a stage."""
+    with stage("sleep"):
+        time.sleep(seconds)
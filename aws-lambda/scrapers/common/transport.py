@@ -0,0 +1,436 @@
+"""
+HTTP transport for the scrapers with optional record/replay.
+
+Scrapers create their sessions with `transport.session()` (or call
+`transport.get` / `transport.post`) instead of using `requests` directly. The
+mode is chosen with the SCRAPER_HTTP_MODE environment variable:
+
+    live    Talk to the upstream sites (default, used in production)
+    record  Talk to the upstream sites and save every request/response pair
+    replay  Serve saved responses without touching the network
+
+Recordings are stored as one JSON file per request under SCRAPER_HTTP_FIXTURES
+(default: aws-lambda/recordings/), grouped by host. A request is identified by its
+method, URL (query parameters sorted) and body, so replaying a scraper with the
+same arguments reproduces the recorded conversation, including cookies. Query
+parameters that scrapers fill with fresh UUIDs or timestamps on every run are left
+out of the key; extend the list with SCRAPER_HTTP_IGNORE_PARAMS (comma-separated).
+
+Replay can be made more realistic with:
+
+    SCRAPER_HTTP_LATENCY_MS     Fixed latency per request (default: the recorded latency)
+    SCRAPER_HTTP_LATENCY_SCALE  Multiplier applied to the recorded latency (default 1, 0 disables)
+    SCRAPER_HTTP_ERROR_RATE     Fraction of requests that fail (default 0)
+    SCRAPER_HTTP_ERROR          How they fail: an HTTP status code, "timeout" or "connection" (default 503)
+
+Inside a `shared_session()` block every `transport.session()` call returns the same
+session, so an invocation that scrapes several date ranges keeps its cookies and
+connections. Each session also carries a `bootstrap` cache where scrapers keep
+values from their bootstrap requests (e.g. anti-forgery tokens) for later ranges.
+
+`transport.warm_session(name)` goes one step further and keeps a named session at
+module level, so warm Lambda invocations reuse its connections, cookies and
+bootstrap values. Warm sessions are rebuilt after SCRAPER_SESSION_TTL seconds
+(default 900), and scrapers call `discard_warm_session(name)` when a site rejects
+the state they reused.
+"""
+
+import base64
+import hashlib
+import http.client
+import io
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3 import HTTPResponse
+
+LIVE = "live"
+RECORD = "record"
+REPLAY = "replay"
+
+DEFAULT_FIXTURE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "recordings"))
+
+# Bodies are stored decoded, so these headers no longer describe them
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+# Query parameters regenerated on every run (midnrreservations.com cart/booking IDs and seed,
+# and the Checkfront widget's original search dates, which are today's date)
+DEFAULT_IGNORED_PARAMS = {"cartUid", "cartTransactionUid", "bookingUid", "seed",
+                          "original_start_date", "original_end_date"}
+
+_write_lock = threading.Lock()
+
+_shared_session = ContextVar("scraper_shared_session", default=None)
+
+DEFAULT_SESSION_TTL = 900
+
+_warm_sessions = {}
+_warm_lock = threading.Lock()
+
+
+def get_mode():
+    mode = os.environ.get("SCRAPER_HTTP_MODE", LIVE).lower()
+    if mode not in (LIVE, RECORD, REPLAY):
+        raise ValueError(f"Unknown SCRAPER_HTTP_MODE {mode!r}, expected live, record or replay")
+    return mode
+
+
+def get_fixture_dir():
+    return os.environ.get("SCRAPER_HTTP_FIXTURES", DEFAULT_FIXTURE_DIR)
+
+
+def get_ignored_params():
+    configured = os.environ.get("SCRAPER_HTTP_IGNORE_PARAMS", "")
+    return DEFAULT_IGNORED_PARAMS | {name.strip() for name in configured.split(",") if name.strip()}
+
+
+def request_key(method, url, body):
+    """
+    Identify a request independently of header values, query parameter order and
+    volatile query parameters.
+
+    Returns:
+        str: Hex digest used as the recording's file name
+    """
+    parts = urlsplit(url)
+    ignored = get_ignored_params()
+    params = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if name not in ignored]
+    query = urlencode(sorted(params))
+    normalized_url = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, ""))
+
+    if body is None:
+        body = b""
+    elif isinstance(body, str):
+        body = body.encode("utf-8")
+
+    digest = hashlib.sha1()
+    digest.update(method.upper().encode("ascii"))
+    digest.update(b" ")
+    digest.update(normalized_url.encode("utf-8"))
+    digest.update(b"\n")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def recording_path(fixture_dir, prepared_request):
+    host = urlsplit(prepared_request.url).hostname or "unknown"
+    key = request_key(prepared_request.method, prepared_request.url, prepared_request.body)
+    return os.path.join(fixture_dir, host, f"{key}.json")
+
+
+class _OriginalResponse:
+    """Stands in for the http.client response urllib3 normally wraps."""
+
+    def __init__(self, msg):
+        self.msg = msg
+
+    def isclosed(self):
+        return True
+
+
+def _encode_body(body):
+    if body is None:
+        return None
+    if isinstance(body, str):
+        return body
+    try:
+        return body.decode("utf-8")
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(body).decode("ascii")}
+
+
+def _decode_body(body):
+    if body is None:
+        return b""
+    if isinstance(body, dict):
+        return base64.b64decode(body["base64"])
+    return body.encode("utf-8")
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    A normal HTTP adapter that saves every response it receives.
+    """
+
+    def __init__(self, fixture_dir, **kwargs):
+        super().__init__(**kwargs)
+        self.fixture_dir = fixture_dir
+
+    def send(self, request, **kwargs):
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        content = response.content
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        raw_headers = getattr(response.raw, "headers", None) or response.headers
+        headers = [[name, value] for name, value in raw_headers.items() if name.lower() not in _DROPPED_HEADERS]
+
+        recording = {
+            "request": {
+                "method": request.method,
+                "url": request.url,
+                "body": _encode_body(request.body)
+            },
+            "response": {
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": headers,
+                "body": _encode_body(content),
+                "elapsedMs": elapsed_ms
+            }
+        }
+
+        path = recording_path(self.fixture_dir, request)
+        with _write_lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(recording, f, indent=2)
+
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Serves recorded responses, with optional latency and error injection.
+    """
+
+    def __init__(self, fixture_dir, latency_ms=None, latency_scale=1.0, error_rate=0.0, error="503"):
+        super().__init__()
+        self.fixture_dir = fixture_dir
+        self.latency_ms = latency_ms
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.error = error
+        # Used only to turn urllib3 responses into requests responses
+        self._builder = HTTPAdapter()
+
+    def _load(self, request):
+        path = recording_path(self.fixture_dir, request)
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise requests.exceptions.ConnectionError(
+                f"No recorded response for {request.method} {request.url} (expected {path})",
+                request=request
+            )
+
+    def _build_response(self, request, status, reason, headers, body):
+        # Cookies are read from the underlying http.client message, so recreate one
+        message = http.client.HTTPMessage()
+        for name, value in headers:
+            message[name] = value
+
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers=headers,
+            status=status,
+            reason=reason,
+            preload_content=False,
+            decode_content=False,
+            original_response=_OriginalResponse(message)
+        )
+        return self._builder.build_response(request, raw)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        recording = self._load(request)["response"]
+
+        if self.latency_ms is not None:
+            delay_ms = self.latency_ms
+        else:
+            delay_ms = recording.get("elapsedMs", 0.0) * self.latency_scale
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+        if self.error_rate and random.random() < self.error_rate:
+            if self.error == "timeout":
+                raise requests.exceptions.ReadTimeout(f"Injected timeout for {request.url}", request=request)
+            if self.error == "connection":
+                raise requests.exceptions.ConnectionError(f"Injected connection error for {request.url}", request=request)
+            status = int(self.error)
+            return self._build_response(request, status, http.client.responses.get(status, ""), [], b"")
+
+        return self._build_response(
+            request,
+            recording["status"],
+            recording.get("reason", ""),
+            [tuple(header) for header in recording.get("headers", [])],
+            _decode_body(recording.get("body"))
+        )
+
+    def close(self):
+        self._builder.close()
+
+
+def _replay_adapter():
+    latency_ms = os.environ.get("SCRAPER_HTTP_LATENCY_MS")
+    return ReplayAdapter(
+        get_fixture_dir(),
+        latency_ms=float(latency_ms) if latency_ms else None,
+        latency_scale=float(os.environ.get("SCRAPER_HTTP_LATENCY_SCALE", 1.0)),
+        error_rate=float(os.environ.get("SCRAPER_HTTP_ERROR_RATE", 0.0)),
+        error=os.environ.get("SCRAPER_HTTP_ERROR", "503").lower()
+    )
+
+
+class BootstrapCache:
+    """
+    Values obtained from bootstrap requests, kept on a session.
+
+    Behaves like a small dict whose entries can expire: `set(key, value, ttl)` stores
+    a value that `get` stops returning after `ttl` seconds. Warm sessions are used by
+    several batch threads at once, so every access holds a lock.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value, expires = self._values.get(key, (default, None))
+            if expires is not None and time.monotonic() > expires:
+                self._values.pop(key, None)
+                return default
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._values[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._values.pop(key, (default, None))[0]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+def _new_session():
+    s = requests.Session()
+    s.bootstrap = BootstrapCache()
+    mode = get_mode()
+
+    if mode == RECORD:
+        adapter = RecordingAdapter(get_fixture_dir())
+    elif mode == REPLAY:
+        adapter = _replay_adapter()
+    else:
+        return s
+
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def get_session_ttl():
+    return float(os.environ.get("SCRAPER_SESSION_TTL", DEFAULT_SESSION_TTL))
+
+
+def session():
+    """
+    Create a requests session using the transport selected by SCRAPER_HTTP_MODE.
+
+    Inside a `shared_session()` block the shared session is returned instead.
+
+    Returns:
+        requests.Session: A session that talks to the network, records or replays
+    """
+    shared = _shared_session.get()
+    if shared is not None:
+        return shared
+    return _new_session()
+
+
+def warm_session(name):
+    """
+    Return the named session kept for the lifetime of the Lambda container.
+
+    The session is created on first use and replaced once it is older than
+    SCRAPER_SESSION_TTL, so warm invocations skip DNS, TLS and bootstrap requests
+    while cookies and tokens are still fresh. A replaced session is not closed, as
+    other threads may still be using it; it is closed when garbage collected.
+
+    Args:
+        name (str): Session name, normally the upstream host (e.g. "koa.com")
+
+    Returns:
+        requests.Session: The warm session, with a `reused` flag telling whether it
+            served an earlier request
+    """
+    key = (name, get_mode())
+    now = time.monotonic()
+    with _warm_lock:
+        s = _warm_sessions.get(key)
+        if s is not None and now - s.created <= get_session_ttl():
+            s.reused = True
+            return s
+
+        s = _new_session()
+        s.created = now
+        s.reused = False
+        _warm_sessions[key] = s
+        return s
+
+
+def discard_warm_session(name):
+    """
+    Drop a warm session (e.g. after the site rejected its cookies) so the next call starts afresh.
+
+    The dropped session is left open for threads that are still using it.
+    """
+    with _warm_lock:
+        _warm_sessions.pop((name, get_mode()), None)
+
+
+@contextmanager
+def shared_session():
+    """
+    Make every `session()` call in the enclosed block return one session.
+
+    Yields:
+        requests.Session: The shared session, closed when the block exits
+    """
+    s = session()
+    if _shared_session.get() is s:
+        # Already inside a shared block; the outer one owns the session
+        yield s
+        return
+
+    token = _shared_session.set(s)
+    try:
+        yield s
+    finally:
+        _shared_session.reset(token)
+        s.close()
+
+
+def request(method, url, **kwargs):
+    """Drop-in replacement for `requests.request` that honours SCRAPER_HTTP_MODE."""
+    shared = _shared_session.get()
+    if shared is not None:
+        return shared.request(method, url, **kwargs)
+    with session() as s:
+        return s.request(method, url, **kwargs)
+
+
+def get(url, params=None, **kwargs):
+    """Drop-in replacement for `requests.get`."""
+    return request("get", url, params=params, **kwargs)
+
+
+def post(url, data=None, json=None, **kwargs):
+    """Drop-in replacement for `requests.post`."""
+    return request("post", url, data=data, json=json, **kwargs)
@@ -1,35 +1,129 @@
 import json
-# Only import datetime module if it's not already imported in the original code
-import sys
-import os
-import traceback
+from datetime import datetime
 
-from bs4 import BeautifulSoup
 import requests
-from datetime import datetime
+
+from scrapers.common import parsing, responses, retry, timings, transport
+from scrapers.common.handler import handle_request
+
+# PHP expires idle sessions after 24 minutes by default
+PHP_SESSION_TTL = 20 * 60
+
+HOST = "ssl.mackinaw-city.com"
+
+BOOTSTRAP_URL = "https://ssl.mackinaw-city.com/newreservations/request.php?HotelId=13"
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.3.1 Safari/605.1.15'
+
+# Only the rates tables are built into the tree
+RATE_TABLES = parsing.only('table', class_='data')
+
+
+def parse_room_rates(html):
+    """
+    Parse the room rates table from a request.php availability page.
+    
+    Args:
+        html (str): Body of the availability response
+        
+    Returns:
+        dict or None: Room title -> price text ("$129.00" or "not available"),
+            or None if the page has no rates table
+    """
+    doc = parsing.document(html)
+    if doc is None:
+        return _parse_room_rates_soup(html)
+
+    tables = doc.xpath(f"//table[{parsing.has_class('data')}]")
+    if len(tables) < 2:
+        return None
+    
+    cabins_data = {}
+    tbody = parsing.first(tables[1].xpath('.//tbody'))
+    
+    if tbody is not None:
+        for row in tbody.xpath('.//tr'):
+            a_tag = parsing.first(row.xpath('.//a'))
+            span_tag = parsing.first(row.xpath('.//span'))
+            
+            if a_tag is not None and span_tag is not None:
+                cabins_data[a_tag.text_content().strip()] = span_tag.text_content().strip()
+    
+    return cabins_data
+
+
+def _parse_room_rates_soup(html):
+    """BeautifulSoup fallback for parse_room_rates."""
+    tables = parsing.soup(html, only=RATE_TABLES).find_all('table', class_='data')
+    if len(tables) < 2:
+        return None
+    
+    cabins_data = {}
+    tbody = tables[1].find('tbody')
+    
+    if tbody:
+        for row in tbody.find_all('tr'):
+            a_tag = row.find('a')
+            span_tag = row.find('span')
+            
+            if a_tag and span_tag:
+                title = a_tag.text.strip()
+                price = span_tag.text.strip()
+
+                cabins_data[title] = price
+    
+    return cabins_data
+
+
+def start_php_session(session):
+    """
+    Request the bootstrap page for a new PHP session.
+
+    The warm session is shared by batch threads, so the request carries its own
+    empty cookie jar instead of the session's cookies.
+
+    Returns:
+        str or None: The PHPSESSID the site set, or None if it set none
+    """
+    request = requests.Request('GET', BOOTSTRAP_URL, headers={'User-Agent': USER_AGENT},
+                               cookies=requests.cookies.RequestsCookieJar()).prepare()
+    response = session.send(request, timeout=retry.timeout(30))
+    return response.cookies.get('PHPSESSID')
+
 
 def scrape_cabinsOfMackinaw(start_date_str, end_date_str, num_adults, num_kids=0):
     # Calculate num_travelers from num_adults and num_kids
     num_travelers = num_adults + num_kids
  
-    session = requests.Session()
-    session.get("https://ssl.mackinaw-city.com/newreservations/request.php?HotelId=13")
+    results = {
+        "lodging": {"available": False, "price": None, "message": "Not available for selected dates"}
+    }
 
-    url = "https://ssl.mackinaw-city.com/newreservations/request.php"
+    # The PHP session ID is kept across date ranges and warm invocations until it goes stale
+    session = transport.warm_session(HOST)
+    cookie = session.bootstrap.get("PHPSESSID")
+    reused_session = cookie is not None
+    if not reused_session:
+        with timings.stage("bootstrap"):
+            cookie = start_php_session(session)
+        if cookie is None:
+            results["lodging"] = responses.failure("Failed to retrieve data.")
+            print("Failed to start a PHP session.")
+            return results
+        session.bootstrap.set("PHPSESSID", cookie, ttl=PHP_SESSION_TTL)
 
-    cookie = session.cookies._cookies['ssl.mackinaw-city.com']['/']['PHPSESSID'].value
+    url = "https://ssl.mackinaw-city.com/newreservations/request.php"
 
+    # The session ID is sent as an explicit header, which takes precedence over the shared session's cookies
     headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.3.1 Safari/605.1.15',
+        'User-Agent': USER_AGENT,
         'Cookie': 'PHPSESSID=' + cookie,
-        'Host': 'ssl.mackinaw-city.com',
+        'Host': HOST,
         'Accept': '*/*',
         'Accept-Encoding': 'gzip, deflate, br',
         'Connection': 'keep-alive'
     }
 
-    session.headers.update(headers)
-
     start_date = datetime.strptime(start_date_str, '%m/%d/%y')
     end_date = datetime.strptime(end_date_str, '%m/%d/%y')
 
@@ -43,34 +137,24 @@ def scrape_cabinsOfMackinaw(start_date_str, end_date_str, num_adults, num_kids=0
         'submit_x': 'true'
     }
 
-    results = {
-        "lodging": {"available": False, "price": None, "message": "Not available for selected dates"}
-    }
-
-    response = session.get(url, headers=headers, params=params)
+    with timings.stage("fetch"):
+        response = session.get(url, headers=headers, params=params, timeout=retry.timeout(30))
 
+    cabins_data = None
     if response.status_code == 200 and response.text:
-        soup = BeautifulSoup(response.text, 'html.parser')
+        with timings.stage("parse"):
+            cabins_data = parse_room_rates(response.text)
+
+    if reused_session and cabins_data is None:
+        # The reused PHP session was rejected; an expired one still answers 200, just without
+        # the rates table. Retry once with a fresh session (the retry does not reuse one).
+        session.bootstrap.pop("PHPSESSID")
+        return scrape_cabinsOfMackinaw(start_date_str, end_date_str, num_adults, num_kids)
 
-        cabins_data = {}
+    if response.status_code == 200 and response.text:
         selected_cabin = None
         
-        table = soup.find_all('table', class_='data')[1]
-        
-        if table:
-            tbody = table.find('tbody')
-            
-            if tbody:
-                for row in tbody.find_all('tr'):
-                    a_tag = row.find('a')
-                    span_tag = row.find('span')
-                    
-                    if a_tag and span_tag:
-                        title = a_tag.text.strip()
-                        price = span_tag.text.strip()
-
-                        cabins_data[title] = price
-        
+        if cabins_data is not None:
             pc1 = 'Private Chalet - 1 Room Queen Bed'
             pc2 = 'Private Chalet - 1 Room 2 Queen Beds'
             pc3 = 'Private Chalet - 2 Rooms, 2 Queen Beds and 2 TVs'
@@ -121,11 +205,7 @@ def scrape_cabinsOfMackinaw(start_date_str, end_date_str, num_adults, num_kids=0
                 "message": "No data found."
             }
     else:
-        results["lodging"] = {
-            "available": False, 
-            "price": None, 
-            "message": "Failed to retrieve data."
-        }
+        results["lodging"] = responses.failure("Failed to retrieve data.")
         print("Failed to retrieve data, or data is empty.")
     
     return results
@@ -142,80 +222,7 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response object
     """
-    try:
-        # Parse the request body
-        if event.get('body'):
-            try:
-                body = json.loads(event['body'])
-            except Exception as e:
-                return {
-                    'statusCode': 400,
-                    'body': json.dumps({
-                        'message': f'Error parsing request body: {str(e)}'
-                    })
-                }
-        else:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'message': 'Missing request body'
-                })
-            }
-        
-        # Extract parameters
-        start_date = body.get('startDate')
-        end_date = body.get('endDate')
-        num_adults = body.get('numAdults', 2)
-        num_kids = body.get('numKids', 0)
-        
-        if not all([start_date, end_date]):
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'message': 'Missing required parameters'
-                })
-            }
-        
-        # Call the scraper function
-        result = scrape_cabinsOfMackinaw(start_date, end_date, num_adults, num_kids)
-        
-        # Add timestamp and scraper name
-        from datetime import datetime
-        result['timestamp'] = datetime.now().isoformat()
-        result['scraper'] = "Cabinsofmackinaw"
-        
-        # Return the result
-        return {
-            'statusCode': 200,
-            'body': json.dumps(result),
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Credentials': 'true'
-            }
-        }
-        
-    except Exception as e:
-        error_traceback = traceback.format_exc()
-        print(f"Error in Cabinsofmackinaw Lambda: {str(e)}")
-        
-        # Get current time for timestamp
-        from datetime import datetime
-        current_time = datetime.now().isoformat()
-        
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'message': f'Error: {str(e)}',
-                'scraper': "Cabinsofmackinaw",
-                'timestamp': current_time
-            }),
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Credentials': 'true'
-            }
-        }
+    return handle_request(event, context, scrape_cabinsOfMackinaw, "Cabinsofmackinaw")
 
 
 # This is used for local testing
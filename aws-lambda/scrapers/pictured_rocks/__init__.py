@@ -1,12 +1,7 @@
 """
-Pictured Rocks package for Lambda function.
+Pictured Rocks scrapers.
 
-This package contains only the necessary imports for the Lambda function.
+Each subpackage is a separate Lambda function and is imported on its own (see
+scrapers/registry.py), so nothing is imported here: the functions do not package
+this file, and importing one scraper must not load its neighbours.
 """
-
-# Import only what's needed for this specific Lambda function
-from .scrapeTouristPark import scrape_touristPark
-
-__all__ = [
-    'scrape_touristPark'
-]
@@ -1,11 +1,8 @@
 import json
-# Only import datetime module if it's not already imported in the original code
-import sys
-import os
-import traceback
-
 from datetime import datetime
-import requests
+
+from scrapers.common import responses, retry, timings, transport
+from scrapers.common.handler import handle_request
 
 def scrape_fortSuperior(start_date, end_date, num_adults, num_kids):
     # Initialize results dictionary
@@ -51,12 +48,14 @@ def scrape_fortSuperior(start_date, end_date, num_adults, num_kids):
     }
 
     # Use a session to handle cookies
-    session = requests.Session()
-    response = session.post(url, headers=headers, json=payload, timeout=30)
+    session = transport.warm_session("hotels.wixapps.net")
+    with timings.stage("fetch"):
+        response = session.post(url, headers=headers, json=payload, timeout=retry.timeout(30))
 
     # Check if the response was successful and return the content
     if response.status_code == 200:
-        inventory = response.json()
+        with timings.stage("parse"):
+            inventory = response.json()
         for room in inventory:
             # if room['availableUnits'] == None:
             #     continue
@@ -80,11 +79,7 @@ def scrape_fortSuperior(start_date, end_date, num_adults, num_kids):
             
     else:
         print("Failed to retrieve data:", response)
-        results["tent"] = {
-            "available": False, 
-            "price": None, 
-            "message": "Failed to retrieve data"
-        }
+        results["tent"] = responses.failure("Failed to retrieve data")
         return results
             
 
@@ -101,80 +96,7 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response object
     """
-    try:
-        # Parse the request body
-        if event.get('body'):
-            try:
-                body = json.loads(event['body'])
-            except Exception as e:
-                return {
-                    'statusCode': 400,
-                    'body': json.dumps({
-                        'message': f'Error parsing request body: {str(e)}'
-                    })
-                }
-        else:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'message': 'Missing request body'
-                })
-            }
-        
-        # Extract parameters
-        start_date = body.get('startDate')
-        end_date = body.get('endDate')
-        num_adults = body.get('numAdults', 2)
-        num_kids = body.get('numKids', 0)
-        
-        if not all([start_date, end_date]):
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'message': 'Missing required parameters'
-                })
-            }
-        
-        # Call the scraper function
-        result = scrape_fortSuperior(start_date, end_date, num_adults, num_kids)
-        
-        # Add timestamp and scraper name
-        from datetime import datetime
-        result['timestamp'] = datetime.now().isoformat()
-        result['scraper'] = "Fortsuperior"
-        
-        # Return the result
-        return {
-            'statusCode': 200,
-            'body': json.dumps(result),
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Credentials': 'true'
-            }
-        }
-        
-    except Exception as e:
-        error_traceback = traceback.format_exc()
-        print(f"Error in Fortsuperior Lambda: {str(e)}")
-        
-        # Get current time for timestamp
-        from datetime import datetime
-        current_time = datetime.now().isoformat()
-        
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'message': f'Error: {str(e)}',
-                'scraper': "Fortsuperior",
-                'timestamp': current_time
-            }),
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Credentials': 'true'
-            }
-        }
+    return handle_request(event, context, scrape_fortSuperior, "Fortsuperior")
 
 
 # This is used for local testing
@@ -1,15 +1,18 @@
 import json
-# Only import datetime module if it's not already imported in the original code
-import sys
-import os
 import traceback
-import re
+from datetime import datetime
 
 import requests
-from datetime import datetime
-from bs4 import BeautifulSoup
 
-def scrape_uncleDuckysPaddlersVillage(start_date_str, end_date_str, num_adults, num_kids=0):
+from scrapers.common import responses
+from scrapers.common.handler import handle_request
+from scrapers.providers import checkfront
+
+def scrape_uncleDuckysPaddlersVillage(start_date_str, end_date_str, num_adults, num_kids=0, types=None):
+    # Paddlers Village only offers lodging
+    if types is not None and "lodging" not in types:
+        return {}
+
     # Calculate num_travelers from num_adults and num_kids
     num_travelers = num_adults + num_kids
 
@@ -18,164 +21,50 @@ def scrape_uncleDuckysPaddlersVillage(start_date_str, end_date_str, num_adults,
         "lodging": {"available": False, "price": None, "message": "Not available"}
     }
 
-    # Convert dates to the format required by the website
-    start_date = datetime.strptime(start_date_str, '%m/%d/%y').strftime('%Y-%m-%d')
-    end_date = datetime.strptime(end_date_str, '%m/%d/%y').strftime('%Y-%m-%d')
-    
-    # Get current date in YYYYMMDD format for original_start_date and original_end_date
-    current_date = datetime.now().strftime('%Y%m%d')
-    
-    # Get month for cf-month parameter (YYYYMM01)
-    cf_month = start_date[:7].replace('-', '') + '01'
-
-    url = 'https://paddlersvillage.checkfront.com/reserve/inventory/'
-
-    headers = {
-        'Accept': '*/*',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Connection': 'keep-alive',
-        'Host': 'paddlersvillage.checkfront.com',
-        'Referer': 'https://paddlersvillage.checkfront.com/reserve/?inline=1&category_id=3%2C2%2C4%2C9&provider=droplet&ssl=1&src=https%3A%2F%2Fwww.paddlingmichigan.com',
-        'Sec-Fetch-Dest': 'empty',
-        'Sec-Fetch-Mode': 'cors',
-        'Sec-Fetch-Site': 'same-origin',
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36',
-        'X-Requested-With': 'XMLHttpRequest'
-    }
+    # Only the categories this lookup reads are fetched when the caller narrowed the types
+    categories = None
+    if types is not None:
+        categories = ["2"] if num_travelers > 5 else ["2", "4"]
 
     # Function to process results for each category
     def process_category(category_id, category_name, num_travelers):
-        params = {
-            'inline': '1',
-            'header': 'hide',
-            'src': 'https://www.paddlingmichigan.com',
-            'filter_category_id': '3,2,4,9',
-            'ssl': '1',
-            'provider': 'droplet',
-            'filter_item_id': '',
-            'customer_id': '',
-            'original_start_date': current_date,
-            'original_end_date': current_date,
-            'date': '',
-            'language': '',
-            'cacheable': '1',
-            'category_id': category_id,
-            'view': '',
-            'start_date': start_date,
-            'end_date': end_date,
-            'keyword': '',
-            'cf-month': cf_month
-        }
-
         try:
-            response = requests.get(url, params=params, headers=headers)
-            if response.status_code == 200:
-                data = response.json()
-                inventory = data.get("inventory", "")
+            # The categories are fetched in one concurrent batch, with the other property's in a batch run
+            inventory = checkfront.inventory("paddlers_village", category_id, start_date_str, end_date_str,
+                                             categories=categories)
+            if inventory is None:
+                return {"available": False, "price": None, "message": f"No {category_name} data available."}
 
-                if not inventory:
-                    return {"available": False, "price": None, "message": f"No {category_name} data available."}
+            nothing_available, items = inventory
 
-                soup = BeautifulSoup(inventory, 'html.parser')
-                
-                unavailable = soup.find_all(string="Nothing available for the dates selected.")
-                if unavailable:
-                    return {"available": False, "price": None, "message": f"No {category_name} options available."}
-                else:
-                    items = soup.find_all(class_="cf-item-data")
-                    if not items:
-                        return {"available": False, "price": None, "message": f"No {category_name} options found."}
-                    
-                    price = None
-                    item_name = None
-                    
-                    for item in items:
-                        # Find the item title and summary section
-                        title_summary = item.find(class_="cf-item-title-summary")
-                        if not title_summary:
-                            continue
-                        
-                        # Extract item name from cf-title > h2
-                        title_div = title_summary.find(class_="cf-title")
-                        if not title_div:
-                            continue
-                            
-                        # Find the h2 tag with the item name
-                        h2_tag = title_div.find('h2')
-                        if not h2_tag:
-                            continue
-                            
-                        # Extract the full item name and remove any trailing/leading whitespace
-                        item_name_candidate = h2_tag.text.strip()
-                        # Clean up the item name by removing tabs and extra whitespace
-                        item_name_candidate = re.sub(r'\s+', ' ', item_name_candidate).strip()
-                        
-                        # Find the item summary for checking sleeps capacity
-                        item_summary = title_summary.find(class_="cf-item-summary")
-                        if not item_summary:
-                            continue
-                            
-                        # Extract text from p tag to check capacity
-                        p_tag = item_summary.find('p')
-                        if not p_tag:
-                            continue
-                            
-                        p_tag_text = p_tag.get_text().strip()
-                        
-                        # Find price element - it's now in the cf-title div
-                        price_element = title_div.find(class_="cf-price")
-                        if not price_element or not price_element.strong or not price_element.strong.span:
-                            continue
-                            
-                        try:
-                            if num_travelers > 5:
-                                if "Sleeps 8" in p_tag_text:
-                                    price_text = price_element.strong.span.text.strip("$")
-                                    if price_text:
-                                        # Handle price ranges (e.g., "188.30 - $215.20")
-                                        if " - $" in price_text:
-                                            # Extract the two prices and calculate the average
-                                            price_parts = price_text.split(" - $")
-                                            min_price = float(price_parts[0])
-                                            max_price = float(price_parts[1])
-                                            price = (min_price + max_price) / 2
-                                        else:
-                                            price = float(price_text)
-                                        item_name = item_name_candidate
-                                        break
-                            else:
-                                if "Sleeps 5" in p_tag_text:
-                                    price_text = price_element.strong.span.text.strip("$")
-                                    if price_text:
-                                        # Handle price ranges (e.g., "188.30 - $215.20")
-                                        if " - $" in price_text:
-                                            # Extract the two prices and calculate the average
-                                            price_parts = price_text.split(" - $")
-                                            min_price = float(price_parts[0])
-                                            max_price = float(price_parts[1])
-                                            price = (min_price + max_price) / 2
-                                        else:
-                                            price = float(price_text)
-                                        item_name = item_name_candidate
-                                        break
-                        except (ValueError, AttributeError) as e:
-                            print(f"Error parsing {category_name} price: {e}")
-                            continue
-                    
-                    if price is not None and item_name:
-                        # Make sure the item name is clean before returning
-                        clean_item_name = re.sub(r'\s+', ' ', item_name).strip()
-                        return {"available": True, "price": price, "message": f"${price:.2f} per night - {clean_item_name}"}
-                    else:
-                        return {"available": False, "price": None, "message": f"No suitable {category_name} found for your group size."}
+            if nothing_available:
+                return {"available": False, "price": None, "message": f"No {category_name} options available."}
             else:
-                print(f"Failed to retrieve {category_name} data:", response.status_code)
-                return {"available": False, "price": None, "message": f"Failed to retrieve {category_name} data"}
+                if not items:
+                    return {"available": False, "price": None, "message": f"No {category_name} options found."}
+
+                price = None
+                item_name = None
+
+                # Larger groups need an item that sleeps 8, otherwise one that sleeps 5
+                capacity = "Sleeps 8" if num_travelers > 5 else "Sleeps 5"
+                for item in items:
+                    if item["summary"] and capacity in item["summary"] and item["price"] is not None:
+                        price = item["price"]
+                        item_name = item["name"]
+                        break
+
+                if price is not None and item_name:
+                    return {"available": True, "price": price, "message": f"${price:.2f} per night - {item_name}"}
+                else:
+                    return {"available": False, "price": None, "message": f"No suitable {category_name} found for your group size."}
+        except requests.exceptions.RequestException as e:
+            print(f"Failed to retrieve {category_name} data: {e}")
+            return responses.failure(f"Failed to retrieve {category_name} data")
         except Exception as e:
             print(f"Error processing {category_name}: {str(e)}")
             traceback.print_exc()
-            return {"available": False, "price": None, "message": f"Error processing {category_name}: {str(e)}"}
+            return responses.failure(f"Error processing {category_name}: {str(e)}")
 
     # Check if start date is before May 23, 2025
     start_date_obj = datetime.strptime(start_date_str, '%m/%d/%y')
@@ -190,7 +79,7 @@ def scrape_uncleDuckysPaddlersVillage(start_date_str, end_date_str, num_adults,
     if num_travelers > 5:
         # Skip yurts and only check platform tents for large groups
         platform_tent_result = process_category("2", "yurt", num_travelers)
-        if platform_tent_result["available"]:
+        if platform_tent_result["available"] or platform_tent_result.get("error"):
             results["lodging"] = platform_tent_result
     else:
         # For smaller groups, check yurts first
@@ -203,6 +92,9 @@ def scrape_uncleDuckysPaddlersVillage(start_date_str, end_date_str, num_adults,
             platform_tent_result = process_category("4", "platform tent", num_travelers)
             if platform_tent_result["available"]:
                 results["lodging"] = platform_tent_result
+            elif yurt_result.get("error") or platform_tent_result.get("error"):
+                # Without both answers it is unknown whether any lodging is available
+                results["lodging"] = yurt_result if yurt_result.get("error") else platform_tent_result
     
     return results
 
@@ -219,81 +111,7 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response object
     """
-    try:
-        # Parse the request body
-        if event.get('body'):
-            try:
-                body = json.loads(event['body'])
-            except Exception as e:
-                return {
-                    'statusCode': 400,
-                    'body': json.dumps({
-                        'message': f'Error parsing request body: {str(e)}'
-                    })
-                }
-        else:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'message': 'Missing request body'
-                })
-            }
-        
-        # Extract parameters
-        start_date = body.get('startDate')
-        end_date = body.get('endDate')
-        num_adults = body.get('numAdults', 2)
-        num_kids = body.get('numKids', 0)
-        
-        if not all([start_date, end_date]):
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'message': 'Missing required parameters'
-                })
-            }
-        
-        # Call the scraper function
-        result = scrape_uncleDuckysPaddlersVillage(start_date, end_date, num_adults, num_kids)
-        
-        # Add timestamp and scraper name
-        from datetime import datetime
-        result['timestamp'] = datetime.now().isoformat()
-        result['scraper'] = "Uncleduckyspaddlersvillage"
-        
-        # Return the result
-        return {
-            'statusCode': 200,
-            'body': json.dumps(result),
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Credentials': 'true'
-            }
-        }
-        
-    except Exception as e:
-        error_traceback = traceback.format_exc()
-        print(f"Error in Uncleduckyspaddlersvillage Lambda: {str(e)}")
-        print(f"Traceback: {error_traceback}")
-        
-        # Get current time for timestamp
-        from datetime import datetime
-        current_time = datetime.now().isoformat()
-        
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'message': f'Error: {str(e)}',
-                'scraper': "Uncleduckyspaddlersvillage",
-                'timestamp': current_time
-            }),
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Credentials': 'true'
-            }
-        }
+    return handle_request(event, context, scrape_uncleDuckysPaddlersVillage, "Uncleduckyspaddlersvillage")
 
 
 # This is used for local testing
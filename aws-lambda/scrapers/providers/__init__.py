@@ -0,0 +1,6 @@
+"""
+Booking-platform providers shared by the scraper Lambda functions.
+
+Each module wraps one upstream platform (KOA, Newbook, Checkfront, Campspot) so
+campground scrapers built on the same platform share request and parsing code.
+"""
@@ -0,0 +1,397 @@
+"""
+Shared Campspot client and parsing.
+
+Covers both the public gator-core API (Indian River, Teepee Campground, Tourist
+Park) and the embedded booking API used by Leelanau Pines. Each park is described
+in PARKS: which API it uses, when its season opens and how its site types map onto
+the rv/tent/lodging accommodation types. `check_parks` queries several parks at
+once over the shared warm sessions, so checking every Campspot park in a city costs
+one round trip. `check_city_park` is what the scrapers call. In the batch Lambda and
+the local runner it checks the park together with the other Campspot parks in its
+city and shares the results for RESULT_TTL seconds, so when every park in the city
+is asked for, one scraper's request answers them all. In a park's own Lambda the
+siblings could never use those results, so only the park itself is checked.
+
+Every park's site catalog (its site type names and their accommodation types) is
+cached for CATALOG_TTL seconds. While it is fresh, gator-core queries skip the
+unavailable site types, and classification is a dictionary lookup.
+"""
+
+import json
+import threading
+import time
+from datetime import date, datetime
+
+from scrapers.common import concurrency, responses, retry, timings, transport
+
+GATOR_HOST = "www.campspot.com"
+EMBEDDED_HOST = "campspot-embedded-booking-ytynsus4ka-uc.a.run.app"
+
+GATOR_HEADERS = {
+    "accept": "application/json, text/plain, */*",
+    "accept-encoding": "gzip, deflate, br, zstd",
+    "accept-language": "en-US,en;q=0.9",
+    "sec-ch-ua": '"Not A(Brand";v="8", "Chromium";v="132", "Google Chrome";v="132"',
+    "sec-ch-ua-mobile": "?0",
+    "sec-ch-ua-platform": '"macOS"',
+    "sec-fetch-dest": "empty",
+    "sec-fetch-mode": "cors",
+    "sec-fetch-site": "same-origin",
+    "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
+    "x-client-type": "CONSUMER",
+    "x-cognito-userpool-clientid": "60jmeb5kmfgfkeljne4car54vo"
+}
+
+EMBEDDED_HEADERS = {
+    "accept": "application/json, text/plain, */*",
+    "accept-encoding": "gzip, deflate, br",
+    "accept-language": "en-US,en;q=0.9",
+    "sec-ch-ua": '"Chromium";v="128", "Not;A=Brand";v="24", "Google Chrome";v="128"',
+    "sec-ch-ua-mobile": "?0",
+    "sec-ch-ua-platform": '"macOS"',
+    "sec-fetch-dest": "empty",
+    "sec-fetch-mode": "cors",
+    "sec-fetch-site": "cross-site",
+    "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36"
+}
+
+# Site type rules per park and accommodation type:
+#   sites      Site type names belonging to the type
+#   match      "exact" name or case-insensitive "contains"
+#   select     "cheapest" available site, or the first available in "priority" order
+#   preferred  Site taken whenever it is available, before the cheapest
+#   none       Message when no site of the type is available
+PARKS = {
+    "719": {
+        "name": "Indian River",
+        "city": "mackinac_city",
+        "api": "gator",
+        "opens": date(2025, 5, 1),
+        "guests": "guests{kids},{adults},0",
+        "types": {
+            "rv": {"sites": ["Back In Deluxe", "Pull Through Buddy", "Back In", "Pull Through", "Water and Electric",
+                             "Pull Through Super", "Back In Extended Stay"],
+                   "none": "No RV sites available."},
+            "tent": {"sites": ["Water and Electric"], "none": "No tent sites available."},
+            "lodging": {"sites": ["Tiny Cottages", "Cabins"], "none": "No lodging options available."}
+        }
+    },
+    "4816": {
+        "name": "Teepee Campground",
+        "city": "mackinac_city",
+        "api": "gator",
+        "opens": date(2025, 5, 1),
+        "guests": "guests{kids},0,{adults},0",
+        "types": {
+            "tent": {"sites": ["30 amp", "tent site (electric/water)", "30 amp lake"], "match": "contains",
+                     "none": "No tent sites available."},
+            "rv": {"sites": ["30 amp", "large 30/50 amp", "30 amp lake", "30/50 amp lake"], "match": "contains",
+                   "none": "No RV sites available."},
+            "lodging": {"sites": ["camper rental, great deal, price includes campsite fee."], "match": "contains",
+                        "none": "No lodging options available."}
+        }
+    },
+    "1850": {
+        "name": "Tourist Park",
+        "city": "pictured_rocks",
+        "api": "gator",
+        "opens": date(2025, 5, 15),
+        "guests": "guests{kids},{adults},0",
+        "empty": "No options available.",
+        "types": {
+            "tent": {"sites": ["Waterfront Rustic Tent Site", "Rustic Tent Site", "W/E Campsite"], "select": "priority",
+                     "none": "No tent sites available."},
+            "rv": {"sites": ["W/E Campsite", "Full Hookup Campsite", "Waterfront Full Hookup Campsite",
+                             "W/E Campsite - Pull Through", "Waterfront W/E Campsite", "W/E Campsite Lakeview"],
+                   "none": "No RV sites available."}
+        }
+    },
+    "2000": {
+        "name": "Leelanau Pines",
+        "city": "traverse_city",
+        "api": "embedded",
+        "opens": date(2025, 5, 2),
+        "origin": "https://leelanaupinescampresort.com",
+        "types": {
+            # Tent and RV share the RV sites, so they get the same result
+            "tent": {"sites": ["Lakefront Standard RV", "Standard Back-In RV", "Deluxe Back-In RV", "Lakefront Basic RV",
+                               "Premium Back-In RV"],
+                     "preferred": "Lakefront Basic RV", "none": "No tent/RV sites available."},
+            "rv": {"sites": ["Lakefront Standard RV", "Standard Back-In RV", "Deluxe Back-In RV", "Lakefront Basic RV",
+                             "Premium Back-In RV"],
+                   "preferred": "Lakefront Basic RV", "none": "No tent/RV sites available."},
+            "lodging": {"sites": ["Rice Creek Glamping Pod", "White Pine Cabin"], "preferred": "Rice Creek Glamping Pod",
+                        "none": "No lodging options available."}
+        }
+    }
+}
+
+# Site catalogs change rarely (new site types, renames), so they are kept for hours
+CATALOG_TTL = 6 * 60 * 60
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+# City-wide results are shared briefly, long enough for sibling scrapers in the same batch
+RESULT_TTL = 60
+
+_results = concurrency.SharedResults(ttl=RESULT_TTL)
+
+
+def parse_sites(text):
+    """
+    Decode a Campspot availability response into its site types.
+
+    Args:
+        text (str): JSON body of the availability response
+
+    Returns:
+        list: One dict per site type with "name", "available" (bool) and
+            "price" (average price per night, may be None)
+    """
+    data = json.loads(text)
+
+    # The embedded booking API wraps the site types in a "data" field
+    places = data.get('data', []) if isinstance(data, dict) else data
+
+    return [
+        {
+            "name": place.get('name', ''),
+            "available": place.get("availability") == "AVAILABLE",
+            "price": place.get('averagePricePerNight')
+        }
+        for place in places
+    ]
+
+
+def site_types(park, site_name):
+    """
+    Classify a site type name using the park's rules.
+
+    Returns:
+        set: Accommodation types the site counts towards (may be empty)
+    """
+    types = set()
+    for accommodation_type, rule in park["types"].items():
+        if rule.get("match") == "contains":
+            if any(site.lower() in site_name.lower() for site in rule["sites"]):
+                types.add(accommodation_type)
+        elif site_name in rule["sites"]:
+            types.add(accommodation_type)
+    return types
+
+
+def get_catalog(park_id):
+    """
+    Returns:
+        dict or None: Cached site type name -> accommodation types, or None if not cached or stale
+    """
+    with _catalogs_lock:
+        entry = _catalogs.get(park_id)
+    if entry is None or time.monotonic() - entry[0] > CATALOG_TTL:
+        return None
+    return entry[1]
+
+
+def _update_catalog(park_id, park, sites, complete):
+    """Classify every site type seen; only a full listing replaces the cached catalog."""
+    if complete:
+        catalog = {site["name"]: site_types(park, site["name"]) for site in sites}
+        with _catalogs_lock:
+            _catalogs[park_id] = (time.monotonic(), catalog)
+        return catalog
+
+    catalog = get_catalog(park_id) or {}
+    new_sites = [site["name"] for site in sites if site["name"] not in catalog]
+    if new_sites:
+        # A site type added since the catalog was built; classify it for this response only
+        catalog = dict(catalog, **{name: site_types(park, name) for name in new_sites})
+    return catalog
+
+
+def classify(park, sites, catalog):
+    """
+    Pick the site reported for each accommodation type.
+
+    Args:
+        park (dict): Park configuration from PARKS
+        sites (list): Parsed site types from `parse_sites`
+        catalog (dict): Site type name -> accommodation types
+
+    Returns:
+        dict: Accommodation type -> {"available", "price", "message"}
+    """
+    available = {}
+    for site in sites:
+        # Skip sites that are unavailable or have no price
+        if site["available"] and site["price"]:
+            available[site["name"]] = site["price"]
+
+    results = {}
+    for accommodation_type, rule in park["types"].items():
+        candidates = [(name, price) for name, price in available.items() if accommodation_type in catalog.get(name, ())]
+
+        chosen = None
+        if rule.get("preferred") in available and accommodation_type in catalog.get(rule["preferred"], ()):
+            chosen = (rule["preferred"], available[rule["preferred"]])
+        elif rule.get("select") == "priority":
+            chosen = next(((name, available[name]) for name in rule["sites"] if name in available), None)
+        elif candidates:
+            chosen = min(candidates, key=lambda candidate: candidate[1])
+
+        if chosen:
+            name, price = chosen
+            results[accommodation_type] = {"available": True, "price": price, "message": f"${price:.2f} per night - {name}"}
+        else:
+            results[accommodation_type] = {"available": False, "price": None, "message": rule["none"]}
+
+    return results
+
+
+def _all_types(park, message):
+    return {accommodation_type: {"available": False, "price": None, "message": message} for accommodation_type in park["types"]}
+
+
+def _failed_types(park, message):
+    return {accommodation_type: responses.failure(message) for accommodation_type in park["types"]}
+
+
+def _request(park_id, park, start, end, num_adults, num_kids, complete):
+    if park["api"] == "embedded":
+        session = transport.warm_session(EMBEDDED_HOST)
+        url = f"https://{EMBEDDED_HOST}/parks/{park_id}/search"
+        headers = dict(EMBEDDED_HEADERS, origin=park["origin"], referer=park["origin"] + "/")
+        params = {
+            "checkIn": start.strftime('%Y-%m-%d'),
+            "checkOut": end.strftime('%Y-%m-%d'),
+            "adults": num_adults,
+            "children": num_kids,
+            "pets": 0
+        }
+    else:
+        session = transport.warm_session(GATOR_HOST)
+        url = f"https://{GATOR_HOST}/api/gator-core/v2/availability/parks/{park_id}"
+        headers = GATOR_HEADERS
+        params = {
+            "checkin": start.strftime('%Y-%m-%d'),
+            "checkout": end.strftime('%Y-%m-%d'),
+            "guests": park["guests"].format(kids=num_kids, adults=num_adults),
+            "useCustomParkData": "true",
+            # Unavailable site types are only needed to (re)build the catalog
+            "includeUnavailable": "true" if complete else "false"
+        }
+
+    with timings.stage("fetch"):
+        return session.get(url, headers=headers, params=params, timeout=retry.timeout(30))
+
+
+def _fetch_sites(park_id, park, start, end, num_adults, num_kids, complete):
+    """
+    Returns:
+        tuple: (sites, failure) - the parsed site types, or None and the park's failed types
+    """
+    response = _request(park_id, park, start, end, num_adults, num_kids, complete)
+
+    if response.status_code != 200:
+        print(f"Failed to retrieve data for {park['name']}: Status Code {response.status_code}")
+        return None, _failed_types(park, "Failed to retrieve data")
+
+    try:
+        with timings.stage("parse"):
+            return parse_sites(response.text), None
+    except json.JSONDecodeError:
+        print(f"Failed to parse JSON response for {park['name']}: {response.text[:200]}")
+        return None, _failed_types(park, "Invalid JSON response from API")
+
+
+def check_park(park_id, start_date, end_date, num_adults, num_kids):
+    """
+    Check one Campspot park.
+
+    Args:
+        park_id (str): Campspot park ID, a key of PARKS
+        start_date (str): Start date in format MM/DD/YY
+        end_date (str): End date in format MM/DD/YY
+        num_adults (int): Number of adults
+        num_kids (int): Number of children
+
+    Returns:
+        dict: Accommodation type -> {"available", "price", "message"} for the park's types
+    """
+    park = PARKS[park_id]
+    start = datetime.strptime(start_date, '%m/%d/%y')
+    end = datetime.strptime(end_date, '%m/%d/%y')
+
+    if start.date() < park["opens"]:
+        return _all_types(park, f"Not available before {park['opens'].strftime('%B')} {park['opens'].day}, {park['opens'].year}")
+
+    catalog = get_catalog(park_id)
+    complete = catalog is None or park["api"] == "embedded"
+    sites, failure = _fetch_sites(park_id, park, start, end, num_adults, num_kids, complete)
+    if failure is None and not sites and not complete and park.get("empty"):
+        # Without unavailable sites, an empty listing may only mean the park is full; the full
+        # listing tells it apart from a park with nothing to offer for the dates
+        complete = True
+        sites, failure = _fetch_sites(park_id, park, start, end, num_adults, num_kids, complete)
+    if failure is not None:
+        return failure
+
+    if not sites and park.get("empty"):
+        return _all_types(park, park["empty"])
+
+    catalog = _update_catalog(park_id, park, sites, complete)
+    return classify(park, sites, catalog)
+
+
+def check_parks(park_ids, start_date, end_date, num_adults, num_kids):
+    """
+    Check several Campspot parks concurrently for the same dates.
+
+    The requests share the warm sessions' connection pools, and each runs with a copy
+    of the caller's context so stage timings and the deadline still apply.
+
+    Returns:
+        dict: Park ID -> result of `check_park` (or an error result if it raised)
+    """
+    def run(park_id):
+        try:
+            return check_park(park_id, start_date, end_date, num_adults, num_kids)
+        except Exception as e:
+            print(f"Error checking Campspot park {park_id}: {str(e)}")
+            return _failed_types(PARKS[park_id], f"Error: {str(e)}")
+
+    return dict(zip(park_ids, concurrency.map_concurrently(run, park_ids)))
+
+
+def city_parks(park_id):
+    """
+    Returns:
+        tuple: IDs of the Campspot parks in the same city as `park_id`, including it
+    """
+    city = PARKS[park_id]["city"]
+    return tuple(other_id for other_id, park in PARKS.items() if park["city"] == city)
+
+
+def check_city_park(park_id, start_date, end_date, num_adults, num_kids):
+    """
+    Check a park, together with the other Campspot parks in its city where they can share the result.
+
+    Where `concurrency.shares_siblings()`, concurrent and recent callers for the same
+    city and dates share one `check_parks` call instead of each sending their own
+    requests. Elsewhere this is `check_park`.
+
+    Returns:
+        dict: The result of `check_park` for `park_id`
+
+    Raises:
+        retry.DeadlineExceeded: If the shared check does not finish before the deadline
+    """
+    if not concurrency.shares_siblings():
+        return check_park(park_id, start_date, end_date, num_adults, num_kids)
+
+    parks = city_parks(park_id)
+    # A park that failed is checked again by the next caller rather than shared
+    results = _results.get((parks, start_date, end_date, num_adults, num_kids),
+                           lambda: check_parks(list(parks), start_date, end_date, num_adults, num_kids),
+                           keep=lambda results: not any(map(responses.is_failure, results.values())))
+    return results[park_id]
@@ -0,0 +1,255 @@
+"""
+Shared client and parsing for Checkfront (paddlersvillage.checkfront.com) inventory.
+
+Used by both Uncle Ducky's scrapers, which read the same inventory widget for
+different category IDs. `inventory` fetches the categories a scraper needs at the
+same time over one warm session, parses each response once and shares the parsed
+items for RESULT_TTL seconds, so yurt/platform tent fallbacks cost no extra
+requests. In the batch Lambda and the local runner, where both scrapers run in one
+process, it fetches every category of both properties at once, so the two scrapers
+cost a single concurrent batch of requests.
+"""
+
+import re
+from datetime import datetime
+
+from scrapers.common import concurrency, parsing, retry, timings, transport
+
+NOTHING_AVAILABLE = "Nothing available for the dates selected."
+
+HOST = "paddlersvillage.checkfront.com"
+INVENTORY_URL = f"https://{HOST}/reserve/inventory/"
+
+HEADERS = {
+    "accept": "*/*",
+    "accept-encoding": "gzip, deflate, br, zstd",
+    "accept-language": "en-US,en;q=0.9",
+    "sec-ch-ua": '"Not A(Brand";v="8", "Chromium";v="132", "Google Chrome";v="132"',
+    "sec-ch-ua-mobile": "?0",
+    "sec-ch-ua-platform": '"macOS"',
+    "sec-fetch-dest": "empty",
+    "sec-fetch-mode": "cors",
+    "sec-fetch-site": "same-origin",
+    "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
+    "x-requested-with": "XMLHttpRequest"
+}
+
+# Inventory widgets embedded by each property, with the categories its scraper reads
+PROPERTIES = {
+    "au_train": {
+        "filter_category_id": "8,15,14,13,16,20",
+        "options": "tabs",
+        "referer": "https://paddlersvillage.checkfront.com/reserve/?inline=1&category_id=8%2C15%2C14%2C13%2C16%2C20&options=tabs&provider=droplet&ssl=1&src=https%3A%2F%2Fwww.paddlingmichigan.com",
+        "categories": {"14": "tent", "15": "platform tent", "16": "yurt"}
+    },
+    "paddlers_village": {
+        "filter_category_id": "3,2,4,9",
+        # This widget sends today's date as the original search dates
+        "original_dates_today": True,
+        "referer": "https://paddlersvillage.checkfront.com/reserve/?inline=1&category_id=3%2C2%2C4%2C9&provider=droplet&ssl=1&src=https%3A%2F%2Fwww.paddlingmichigan.com",
+        "categories": {"2": "yurt", "4": "platform tent"}
+    }
+}
+
+# Parsed inventories are shared briefly, long enough for sibling scrapers in the same batch
+RESULT_TTL = 60
+
+REQUEST_TIMEOUT = 30
+
+_results = concurrency.SharedResults(ttl=RESULT_TTL)
+
+
+def parse_price(price_text):
+    """
+    Parse a Checkfront price label into a per-night price.
+
+    Price ranges such as "$188.30 - $215.20" are averaged.
+
+    Returns:
+        float or None: The price, or None if the label is empty or malformed
+    """
+    cleaned = price_text.replace('$', '').strip()
+    if not cleaned:
+        return None
+
+    try:
+        if ' - ' in cleaned:
+            low_price, high_price = map(float, cleaned.split(' - '))
+            return (low_price + high_price) / 2
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+def parse_inventory(html):
+    """
+    Parse the HTML fragment from the `inventory` field of a Checkfront response.
+
+    Args:
+        html (str): The inventory HTML
+
+    Returns:
+        tuple: (nothing_available, items) where items is a list of dicts with
+            "name" (whitespace-normalised title), "summary" (item summary text or None)
+            and "price" (float or None)
+    """
+    # The fragment is small and the "nothing available" message can be anywhere, so it is parsed whole
+    soup = parsing.soup(html)
+
+    # Check for "Nothing available" message
+    if soup.find_all(string=NOTHING_AVAILABLE):
+        return True, []
+
+    items = []
+    for container in soup.find_all(class_="cf-item-data"):
+        # Find the item title and summary section
+        title_summary = container.find(class_="cf-item-title-summary")
+        if not title_summary:
+            continue
+
+        # Extract item name from cf-title > h2
+        title_div = title_summary.find(class_="cf-title")
+        if not title_div:
+            continue
+
+        h2_tag = title_div.find('h2')
+        if not h2_tag:
+            continue
+
+        # Remove multiple spaces, tabs and newlines from the item name
+        name = re.sub(r'\s+', ' ', h2_tag.text).strip()
+
+        summary = None
+        item_summary = title_summary.find(class_="cf-item-summary")
+        if item_summary and item_summary.find('p'):
+            summary = item_summary.find('p').get_text().strip()
+
+        price = None
+        price_div = title_div.find(class_="cf-price")
+        if price_div and price_div.find("strong") and price_div.find("strong").find("span"):
+            price = parse_price(price_div.find("strong").find("span").text)
+
+        items.append({"name": name, "summary": summary, "price": price})
+
+    return False, items
+
+
+def fetch_inventory(property_name, category_id, start_date, end_date):
+    """
+    Fetch and parse one category of a property's inventory widget.
+
+    Args:
+        property_name (str): Key of PROPERTIES
+        category_id (str): Checkfront category ID
+        start_date (str): Start date in format MM/DD/YY
+        end_date (str): End date in format MM/DD/YY
+
+    Returns:
+        tuple or None: `parse_inventory` result, or None if the response had no inventory
+
+    Raises:
+        requests.exceptions.RequestException: On network errors and error responses
+        ValueError: If the response is not JSON
+    """
+    widget = PROPERTIES[property_name]
+    start = datetime.strptime(start_date, '%m/%d/%y')
+    end = datetime.strptime(end_date, '%m/%d/%y')
+
+    original_date = datetime.now().strftime('%Y%m%d') if widget.get("original_dates_today") else ""
+
+    params = {
+        "inline": "1",
+        "header": "hide",
+        "src": "https://www.paddlingmichigan.com",
+        "filter_category_id": widget["filter_category_id"],
+        "ssl": "1",
+        "provider": "droplet",
+        "filter_item_id": "",
+        "customer_id": "",
+        "original_start_date": original_date,
+        "original_end_date": original_date,
+        "date": "",
+        "language": "",
+        "cacheable": "1",
+        "category_id": category_id,
+        "view": "",
+        "start_date": start.strftime('%Y-%m-%d'),
+        "end_date": end.strftime('%Y-%m-%d'),
+        "keyword": "",
+        "cf-month": start.strftime('%Y%m01')
+    }
+    if "options" in widget:
+        params["options"] = widget["options"]
+
+    session = transport.warm_session(HOST)
+    with timings.stage("fetch"):
+        response = session.get(INVENTORY_URL, headers=dict(HEADERS, referer=widget["referer"]), params=params,
+                               timeout=retry.timeout(REQUEST_TIMEOUT))
+    response.raise_for_status()
+
+    inventory_html = response.json().get("inventory")
+    if not inventory_html:
+        return None
+
+    with timings.stage("parse"):
+        return parse_inventory(inventory_html)
+
+
+def fetch_all(start_date, end_date, keys=None):
+    """
+    Fetch inventory categories at the same time.
+
+    Args:
+        start_date (str): Start date in format MM/DD/YY
+        end_date (str): End date in format MM/DD/YY
+        keys (list): (property name, category ID) pairs to fetch (default: every category of every property)
+
+    Returns:
+        dict: (property name, category ID) -> `fetch_inventory` result, or the exception it raised
+    """
+    if keys is None:
+        keys = [(property_name, category_id)
+                for property_name, widget in PROPERTIES.items()
+                for category_id in widget["categories"]]
+
+    def fetch(key):
+        try:
+            return fetch_inventory(key[0], key[1], start_date, end_date)
+        except Exception as e:
+            return e
+
+    return dict(zip(keys, concurrency.map_concurrently(fetch, keys)))
+
+
+def inventory(property_name, category_id, start_date, end_date, categories=None):
+    """
+    Parsed inventory of one category, from the shared batch for the dates.
+
+    Args:
+        property_name (str): Key of PROPERTIES
+        category_id (str): Checkfront category ID
+        start_date (str): Start date in format MM/DD/YY
+        end_date (str): End date in format MM/DD/YY
+        categories (list): Category IDs of the property the caller needs. By default
+            every category of the property, or of both properties where
+            `concurrency.shares_siblings()`
+
+    Returns:
+        tuple or None: As `fetch_inventory`
+
+    Raises:
+        The exception `fetch_inventory` raised for this category
+    """
+    if categories is None and concurrency.shares_siblings():
+        keys = None
+    else:
+        if categories is None:
+            categories = PROPERTIES[property_name]["categories"]
+        keys = tuple((property_name, category) for category in categories)
+    # A batch with a failed category is fetched again by the next caller rather than shared
+    outcomes = _results.get((start_date, end_date, keys), lambda: fetch_all(start_date, end_date, keys),
+                            keep=lambda outcomes: not any(isinstance(o, Exception) for o in outcomes.values()))
+    outcome = outcomes[(property_name, category_id)]
+    if isinstance(outcome, Exception):
+        raise outcome
+    return outcome
@@ -0,0 +1,172 @@
+"""
+Shared parsing for koa.com campground reservation pages.
+
+Used by the Traverse City, St. Ignace and Munising KOA scrapers, which only differ
+in the campground slug they request. They also share one request pacer, since
+koa.com rate-limits across all of its campground pages.
+
+Landing pages are only fetched for their anti-forgery token. Each warm session
+keeps the last copy of every landing page it fetched, and fetches it again with a
+conditional request when koa.com sent validators, so an unchanged page is not
+downloaded twice. The token pairs with the session's cookies, which is why the
+copies are kept per session rather than at module level.
+"""
+
+import logging
+
+from scrapers.common import conditional, pacing, parsing, retry
+
+logger = logging.getLogger(__name__)
+
+# Only the elements each extraction reads are built into the tree
+TOKEN_ELEMENTS = parsing.only('input', name='__RequestVerificationToken')
+RESERVATION_ELEMENTS = parsing.only('div', class_=['alert-danger', 'reserve-sitetype-main-row'])
+
+# Module level, so the recent request history survives warm invocations
+pacer = pacing.Pacer(window=60.0, free_requests=6, min_interval=1.0, base_delay=3.0, max_delay=20.0)
+
+RV_KEYWORDS = ('rv', 'full hook', 'pull-thru', 'hook-up')
+TENT_KEYWORDS = ('tent', 'primitive')
+LODGING_KEYWORDS = ('cabin', 'lodge', 'cottage')
+
+LANDING_PAGE_TIMEOUT = 10
+
+
+def get_landing_page(session, url, headers):
+    """
+    Fetch a campground landing page, revalidating the copy this session already has.
+
+    Returns:
+        requests.Response: The page; a 304 answer carries the cached body
+    """
+    pages = session.bootstrap.get("landing_pages")
+    if pages is None:
+        pages = conditional.Cache()
+        session.bootstrap["landing_pages"] = pages
+    return pages.get(session, url, headers=headers, timeout=retry.timeout(LANDING_PAGE_TIMEOUT))
+
+
+def parse_verification_token(html):
+    """
+    Extract the anti-forgery token from a KOA campground landing page.
+
+    Returns:
+        str or None: The __RequestVerificationToken value, or None if the page has none
+    """
+    doc = parsing.document(html)
+    if doc is not None:
+        token = parsing.first(doc.xpath('//input[@name="__RequestVerificationToken"]'))
+    else:
+        token = parsing.soup(html, only=TOKEN_ELEMENTS).find('input', {'name': '__RequestVerificationToken'})
+    return token.get('value') if token is not None else None
+
+
+def categorize_site(name):
+    """Map a KOA site type title to rv, tent or lodging (or None if unrecognised)."""
+    name_lower = name.lower()
+    if any(keyword in name_lower for keyword in RV_KEYWORDS):
+        return "rv"
+    if any(keyword in name_lower for keyword in TENT_KEYWORDS):
+        return "tent"
+    if any(keyword in name_lower for keyword in LODGING_KEYWORDS):
+        return "lodging"
+    return None
+
+
+def _reservation_rows(html):
+    """
+    Pull the raw fields out of a reserve results page.
+
+    Returns:
+        tuple: (error_text, rows) - the text of the first alert-danger box (or None) and
+            a (site type title, price text) pair for every site type showing a price
+    """
+    doc = parsing.document(html)
+    if doc is None:
+        return _reservation_rows_soup(html)
+
+    error_msg = parsing.first(doc.xpath(f'//div[{parsing.has_class("alert-danger")}]'))
+    error_text = error_msg.text_content() if error_msg is not None else None
+
+    rows = []
+    for container in doc.xpath(f'//div[{parsing.has_class("reserve-sitetype-main-row")}]'):
+        name_element = parsing.first(container.xpath(f'.//h4[{parsing.has_class("reserve-sitetype-title")}]'))
+        price_container = parsing.first(container.xpath(f'.//div[{parsing.has_class("reserve-quote-per-night")}]'))
+        strong = parsing.first(price_container.xpath('.//strong')) if price_container is not None else None
+        price_span = parsing.first(strong.xpath('.//span')) if strong is not None else None
+        if name_element is None or price_span is None:
+            continue
+        rows.append((name_element.text_content().strip(), price_span.text_content()))
+
+    return error_text, rows
+
+
+def _reservation_rows_soup(html):
+    """BeautifulSoup fallback for `_reservation_rows`."""
+    soup = parsing.soup(html, only=RESERVATION_ELEMENTS)
+
+    error_msg = soup.find('div', class_='alert-danger')
+    error_text = error_msg.text if error_msg else None
+
+    rows = []
+    for container in soup.find_all('div', class_='reserve-sitetype-main-row'):
+        name_element = container.find('h4', class_='reserve-sitetype-title')
+        if not name_element:
+            continue
+
+        price_container = container.find('div', class_='reserve-quote-per-night')
+        if not price_container or not price_container.find('strong') or not price_container.find('strong').find('span'):
+            continue
+
+        rows.append((name_element.text.strip(), price_container.find('strong').find('span').text))
+
+    return error_text, rows
+
+
+def parse_reservation_page(html):
+    """
+    Parse the KOA reserve results page into the cheapest option per accommodation type.
+
+    Args:
+        html (str): Body of the reserve POST response
+
+    Returns:
+        tuple: (rate_limited, results) where results maps rv/tent/lodging to
+            {"available", "price", "message"}; results is None when rate limited
+    """
+    error_text, rows = _reservation_rows(html)
+
+    # Check if we've been rate limited (looking for error message)
+    if error_text is not None and "rate limit" in error_text.lower():
+        return True, None
+
+    cheapest = {}
+
+    for name, price_text in rows:
+        try:
+            price = float(price_text.lstrip('$').split(' ')[0])
+        except ValueError as e:
+            logger.warning(f"Error parsing price: {e}")
+            continue
+
+        # Categorize based on name (simplified logic - can be refined later)
+        accommodation_type = categorize_site(name)
+        if accommodation_type and (accommodation_type not in cheapest or price < cheapest[accommodation_type][0]):
+            cheapest[accommodation_type] = (price, name)
+
+    # Initialize the results dictionary with all accommodation types
+    results = {
+        "rv": {"available": False, "price": None, "message": "No RV sites available."},
+        "tent": {"available": False, "price": None, "message": "No tent sites available."},
+        "lodging": {"available": False, "price": None, "message": "No lodging available."}
+    }
+
+    # Update with available options
+    for accommodation_type, (price, name) in cheapest.items():
+        results[accommodation_type] = {
+            "available": True,
+            "price": price,
+            "message": f"${price:.2f} per night - {name}"
+        }
+
+    return False, results
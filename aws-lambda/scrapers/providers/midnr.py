@@ -0,0 +1,313 @@
+"""
+Shared Michigan DNR reservations (midnrreservations.com) client.
+
+The site needs cookies from its main page and /create-booking before the map
+availability API answers. They are fetched once per warm session (and kept for
+COOKIE_TTL seconds), guarded by a lock so concurrent park queries never bootstrap
+twice. `check_parks` then queries every park's map concurrently on that session.
+`check_park` is what the scrapers call. In the batch Lambda and the local runner
+(`concurrency.shares_siblings()`) it checks every park in PARKS at once and shares
+the results for RESULT_TTL seconds, so the other park's scraper in the batch reuses
+them. In a park's own Lambda only that park is checked.
+
+Map requests ask for daily availability (`getDailyAvailability=true`), so a response
+reports each night of the stay separately. The nights are cached per park and party
+size for NIGHT_TTL seconds, and an overlapping stay whose nights are all cached is
+answered without another request.
+"""
+
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import requests
+
+from scrapers.common import concurrency, responses, retry, timings, transport
+
+HOST = "midnrreservations.com"
+BASE_URL = f"https://{HOST}"
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
+    "Accept": "application/json, text/plain, */*",
+    "App-Language": "en-US",
+    "App-Version": "5.94.152",
+    "Cache-Control": "no-cache",
+    "Pragma": "no-cache",
+    "Expires": "0",
+    "Sec-Ch-Ua": "\"Not A(Brand\";v=\"8\", \"Chromium\";v=\"132\", \"Google Chrome\";v=\"132\"",
+    "Sec-Ch-Ua-Mobile": "?0",
+    "Sec-Ch-Ua-Platform": "\"macOS\""
+}
+
+# Park parameters:
+#   resourceLocationId  The ID of the park location
+#   mapId               The ID of the park's map
+#   key_map_ids         Map IDs (campground loops) checked for availability; status 0 is available
+#   price               Nightly price reported when a site is available
+PARKS = {
+    "straits": {
+        "name": "Straits State Park",
+        "resourceLocationId": "-2147483350",
+        "mapId": "-2147483075",
+        "key_map_ids": ["-2147483074", "-2147483073", "-2147483072"],
+        "price": 35.0
+    },
+    "traverse_city": {
+        "name": "Traverse City State Park",
+        "resourceLocationId": "-2147483344",
+        "mapId": "-2147483043",
+        "key_map_ids": ["-2147483042", "-2147483041", "-2147483040"],
+        "price": 35.0
+    }
+}
+
+AVAILABLE = 0
+
+# Cookies from the bootstrap pages; the site expires idle sessions after roughly half an hour
+COOKIE_TTL = 20 * 60
+
+# Nightly availability changes as bookings come in, so it is only reused briefly
+NIGHT_TTL = 5 * 60
+
+# Results of checking every park are shared briefly, long enough for the sibling scraper in the same batch
+RESULT_TTL = 60
+
+REQUEST_TIMEOUT = 30
+
+_results = concurrency.SharedResults(ttl=RESULT_TTL)
+
+_bootstrap_lock = threading.Lock()
+
+_nights = {}
+_nights_lock = threading.Lock()
+
+
+class MapUnavailable(Exception):
+    """The map availability request was refused (e.g. because the cookies expired)."""
+
+    def __init__(self, status_code):
+        super().__init__(f"Failed to check map availability: {status_code}")
+        self.status_code = status_code
+
+
+def bootstrap(session):
+    """
+    Visit the main page and /create-booking once per session to collect the cookies.
+
+    Returns:
+        bool: True if cookies from an earlier bootstrap were reused
+
+    Raises:
+        RuntimeError: If a bootstrap page could not be loaded (with the message to report)
+    """
+    with _bootstrap_lock:
+        if session.bootstrap.get("midnrreservations"):
+            return True
+
+        for url, page in ((BASE_URL, "main page"), (f"{BASE_URL}/create-booking", "booking page")):
+            try:
+                with timings.stage("bootstrap"):
+                    response = session.get(url, headers=HEADERS, timeout=retry.timeout(REQUEST_TIMEOUT))
+            except requests.exceptions.RequestException as e:
+                raise RuntimeError(f"Failed to access {page}: {str(e)}")
+            if response.status_code != 200:
+                raise RuntimeError(f"Failed to access {page}: {response.status_code}")
+
+        session.bootstrap.set("midnrreservations", True, ttl=COOKIE_TTL)
+        return False
+
+
+def _cached_nights(park, party_size, nights):
+    now = time.monotonic()
+    with _nights_lock:
+        cached = _nights.get((park["mapId"], party_size), {})
+        entries = [cached.get(night) for night in nights]
+    if all(entry is not None and now - entry[0] <= NIGHT_TTL for entry in entries):
+        return [entry[1] for entry in entries]
+    return None
+
+
+def _store_nights(park, party_size, nights, statuses):
+    now = time.monotonic()
+    with _nights_lock:
+        cached = _nights.setdefault((park["mapId"], party_size), {})
+        for night in [night for night, entry in cached.items() if now - entry[0] > NIGHT_TTL]:
+            del cached[night]
+        for night, night_statuses in zip(nights, statuses):
+            cached[night] = (now, night_statuses)
+
+
+def _fetch_nights(session, park, start, end, party_size, nights):
+    start_formatted = start.strftime('%Y-%m-%d')
+    end_formatted = end.strftime('%Y-%m-%d')
+
+    referer_params = {
+        "resourceLocationId": park["resourceLocationId"],
+        "mapId": park["mapId"],
+        "searchTabGroupId": "0",
+        "bookingCategoryId": "0",
+        "startDate": start_formatted,
+        "endDate": end_formatted,
+        "nights": str(len(nights)),
+        "isReserving": "true",
+        "equipmentId": "-32768",
+        "subEquipmentId": "-32768",
+        "peopleCapacityCategoryCounts": "[[-32768,null,1,null]]",
+        "filterData": "{}",
+        "searchTime": datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3],
+        "flexibleSearch": "[false,false,null,1]"
+    }
+    encoded_referer_params = "&".join([f"{k}={requests.utils.quote(str(v))}" for k, v in referer_params.items()])
+
+    # Generate request ID and traceparent headers
+    request_id = uuid.uuid4().hex[:32]
+    headers = dict(HEADERS)
+    headers["Referer"] = f"{BASE_URL}/create-booking/results?{encoded_referer_params}"
+    headers["Request-Id"] = f"|{request_id}.{uuid.uuid4().hex[:16]}"
+    headers["traceparent"] = f"00-{request_id}-{uuid.uuid4().hex[:16]}-01"
+
+    map_params = {
+        "mapId": park["mapId"],
+        "bookingCategoryId": "0",
+        "equipmentCategoryId": "-32768",
+        "subEquipmentCategoryId": "-32768",
+        "cartUid": str(uuid.uuid4()),
+        "cartTransactionUid": str(uuid.uuid4()),
+        "bookingUid": str(uuid.uuid4()),
+        "groupHoldUid": "null",
+        "startDate": start_formatted,
+        "endDate": end_formatted,
+        "getDailyAvailability": "true",
+        "isReserving": "true",
+        "filterData": "%5B%5D",  # URL encoded []
+        "boatLength": "null",
+        "boatDraft": "null",
+        "boatWidth": "null",
+        "partySize": str(party_size),
+        "numEquipment": "null",
+        "seed": datetime.now().isoformat(timespec='milliseconds') + 'Z'
+    }
+    encoded_map_params = "&".join([f"{k}={v}" for k, v in map_params.items()])
+
+    with timings.stage("fetch"):
+        response = session.get(f"{BASE_URL}/api/availability/map?{encoded_map_params}", headers=headers,
+                               timeout=retry.timeout(REQUEST_TIMEOUT))
+    if response.status_code != 200:
+        raise MapUnavailable(response.status_code)
+
+    with timings.stage("parse"):
+        map_links = response.json().get("mapLinkAvailabilities", {})
+
+    # Daily availability lists one status per night for each map link
+    statuses = [{} for _ in nights]
+    for map_id in park["key_map_ids"]:
+        for night_statuses, status in zip(statuses, map_links.get(map_id) or []):
+            night_statuses[map_id] = status
+    _store_nights(park, party_size, nights, statuses)
+    return statuses
+
+
+def stay_result(park, statuses):
+    """
+    Build the result for a stay from its nightly statuses.
+
+    As before daily availability was requested, a night is available when any of the
+    park's key map links reports status 0 for it; the stay is available when every
+    night is, whichever loops those are.
+    """
+    if statuses and all(AVAILABLE in night.values() for night in statuses):
+        return {"available": True, "price": park["price"], "message": f"${park['price']:.2f} per night"}
+    return {"available": False, "price": None, "message": "No campsites available for selected dates"}
+
+
+def check_parks(parks, start_date, end_date, num_adults, num_kids):
+    """
+    Check several Michigan DNR parks concurrently on one bootstrapped session.
+
+    Args:
+        parks (list): Park parameter dicts (values of PARKS or caller-supplied)
+        start_date (str): Start date in format MM/DD/YY
+        end_date (str): End date in format MM/DD/YY
+        num_adults (int): Number of adults
+        num_kids (int): Number of children
+
+    Returns:
+        list: One {"available", "price", "message"} result per park, in order
+    """
+    start = datetime.strptime(start_date, '%m/%d/%y')
+    end = datetime.strptime(end_date, '%m/%d/%y')
+    nights = [(start + timedelta(days=night)).strftime('%Y-%m-%d') for night in range((end - start).days)]
+    party_size = num_adults + num_kids
+
+    results = [None] * len(parks)
+    pending = []
+    for index, park in enumerate(parks):
+        statuses = _cached_nights(park, party_size, nights)
+        if statuses is not None:
+            results[index] = stay_result(park, statuses)
+        else:
+            pending.append(index)
+
+    if not pending:
+        return results
+
+    for attempt in range(2):
+        session = transport.warm_session(HOST)
+        try:
+            reused_cookies = bootstrap(session)
+        except RuntimeError as e:
+            for index in pending:
+                results[index] = responses.failure(str(e))
+            return results
+
+        def check(index):
+            try:
+                return stay_result(parks[index], _fetch_nights(session, parks[index], start, end, party_size, nights))
+            except MapUnavailable as e:
+                return e
+            except requests.exceptions.RequestException as e:
+                return responses.failure(f"Failed to check map availability: {str(e)}")
+            except ValueError:
+                return responses.failure("Failed to parse availability data")
+
+        outcomes = concurrency.map_concurrently(check, pending)
+
+        refused = []
+        for index, outcome in zip(pending, outcomes):
+            if isinstance(outcome, MapUnavailable):
+                refused.append(index)
+                results[index] = responses.failure(str(outcome))
+            else:
+                results[index] = outcome
+
+        if not refused or not reused_cookies:
+            break
+        # The site may have expired the reused cookies; bootstrap a fresh session once
+        transport.discard_warm_session(HOST)
+        pending = refused
+
+    return results
+
+
+def check_park(park, start_date, end_date, num_adults, num_kids):
+    """
+    Check one Michigan DNR park, together with the other parks in PARKS where they can share the result.
+
+    Returns:
+        dict: {"available", "price", "message"}
+
+    Raises:
+        retry.DeadlineExceeded: If the shared check does not finish before the deadline
+    """
+    parks = list(PARKS.values())
+    index = next((i for i, known_park in enumerate(parks) if known_park is park), None)
+    if index is None or not concurrency.shares_siblings():
+        return check_parks([park], start_date, end_date, num_adults, num_kids)[0]
+
+    # A park that failed is checked again by the next caller rather than shared
+    results = _results.get((start_date, end_date, num_adults, num_kids),
+                           lambda: check_parks(parks, start_date, end_date, num_adults, num_kids),
+                           keep=lambda results: not any(map(responses.is_failure, results)))
+    return dict(results[index])
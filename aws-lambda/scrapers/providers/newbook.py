@@ -0,0 +1,188 @@
+"""
+Shared client and parsing for Newbook online booking (bookingsus.newbook.cloud).
+
+A property's availability chart is queried once per set of search parameters (e.g.
+with RV equipment for campsites and without it for cabins). `query_categories` sends
+all of a lookup's queries at the same time over the warm session's connection pool.
+"""
+
+from datetime import datetime
+
+import requests
+
+from scrapers.common import concurrency, parsing, retry, timings, transport
+
+HOST = "bookingsus.newbook.cloud"
+
+HEADERS = {
+    "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+    "Accept": "*/*",
+    "Origin": f"https://{HOST}",
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.3.1 Safari/605.1.15",
+    "X-Requested-With": "XMLHttpRequest"
+}
+
+REQUEST_TIMEOUT = 30
+
+# Marks a query that was not sent before the deadline
+TIMED_OUT = object()
+
+# Only the category containers are built into the tree
+CATEGORY_ELEMENTS = parsing.only("div", class_="newbook_online_category_details")
+
+
+def parse_categories(html):
+    """
+    Parse an `availability_chart_responsive` response into its categories.
+
+    Args:
+        html (str): Body of the Newbook api.php response
+
+    Returns:
+        list: One dict per category with "name", "bookable" (a "Book now" button and a
+            price are shown) and "price" (per-night float, None unless bookable)
+    """
+    categories = []
+
+    for name, price_text, book_now in _category_fields(html):
+        price = None
+        if book_now and price_text is not None:
+            try:
+                price = float(price_text.lstrip("$"))
+            except ValueError:
+                price = None
+
+        categories.append({
+            "name": name,
+            "bookable": price is not None,
+            "price": price
+        })
+
+    return categories
+
+
+def _category_fields(html):
+    """
+    Pull the raw fields out of every category container.
+
+    Returns:
+        list: (name, first "from" price text or None, has a "Book now" button) per category
+    """
+    doc = parsing.document(html)
+    if doc is None:
+        return _category_fields_soup(html)
+
+    fields = []
+    for container in doc.xpath(f'//div[{parsing.has_class("newbook_online_category_details")}]'):
+        h3 = parsing.first(container.xpath('.//h3'))
+        a_tag = parsing.first(h3.xpath('.//a')) if h3 is not None else None
+        if a_tag is None:
+            continue
+
+        price_span = parsing.first(container.xpath(f'.//span[{parsing.has_class("newbook_online_from_price_text")}]'))
+        book_now = container.xpath(f'.//button[{parsing.has_class("button")}][@aria-label="Book now"]')
+
+        fields.append((
+            a_tag.text_content().strip(),
+            price_span.text_content() if price_span is not None else None,
+            bool(book_now)
+        ))
+
+    return fields
+
+
+def _category_fields_soup(html):
+    """BeautifulSoup fallback for `_category_fields`."""
+    soup = parsing.soup(html, only=CATEGORY_ELEMENTS)
+    fields = []
+
+    for container in soup.find_all("div", class_="newbook_online_category_details"):
+        a_tag = container.find("h3").find("a") if container.find("h3") else None
+        if not a_tag:
+            continue
+
+        price_span = container.find_all("span", class_="newbook_online_from_price_text")
+        book_now_button = container.find("button", class_="button", attrs={"aria-label": "Book now"})
+
+        fields.append((
+            a_tag.text.strip(),
+            price_span[0].text if price_span else None,
+            book_now_button is not None
+        ))
+
+    return fields
+
+
+def availability_chart(property_name, start_date, end_date, num_adults, num_kids, extra_params=None):
+    """
+    Query a property's availability chart.
+
+    Args:
+        property_name (str): Newbook property path, e.g. "timberridgeresort"
+        start_date (str): Start date in format MM/DD/YY
+        end_date (str): End date in format MM/DD/YY
+        num_adults (int): Number of adults
+        num_kids (int): Number of children
+        extra_params (dict): Additional search parameters (e.g. equipment_type)
+
+    Returns:
+        list or None: Categories from `parse_categories`, or None if the request failed
+    """
+    start = datetime.strptime(start_date, '%m/%d/%y')
+    end = datetime.strptime(end_date, '%m/%d/%y')
+
+    data = {
+        "newbook_api_action": "availability_chart_responsive",
+        "available_from": start.strftime('%b %d %Y'),
+        "available_to": end.strftime('%b %d %Y'),
+        "nights": (end - start).days,
+        "adults": num_adults,
+        "children": num_kids,
+        "infants": 0,
+        "animals": 0
+    }
+    data.update(extra_params or {})
+
+    session = transport.warm_session(HOST)
+    headers = dict(HEADERS, Referer=f"https://{HOST}/{property_name}/index.php")
+    with timings.stage("fetch"):
+        response = session.post(f"https://{HOST}/{property_name}/api.php", headers=headers, data=data,
+                                timeout=retry.timeout(REQUEST_TIMEOUT))
+
+    if response.status_code != 200:
+        print(f"Newbook availability request for {property_name} failed: {response.status_code}")
+        return None
+
+    with timings.stage("parse"):
+        return parse_categories(response.text)
+
+
+def query_categories(property_name, queries, start_date, end_date, num_adults, num_kids):
+    """
+    Run several availability chart queries for a property at the same time.
+
+    Args:
+        property_name (str): Newbook property path
+        queries (dict): Query name -> extra search parameters
+        start_date (str): Start date in format MM/DD/YY
+        end_date (str): End date in format MM/DD/YY
+        num_adults (int): Number of adults
+        num_kids (int): Number of children
+
+    Returns:
+        dict: Query name -> categories, or None for a failed query (an error status or a
+        request exception), so one failure does not lose the other queries; queries that
+        could not be sent before the deadline are left out
+    """
+    def query(name):
+        try:
+            return availability_chart(property_name, start_date, end_date, num_adults, num_kids, queries[name])
+        except retry.DeadlineExceeded:
+            return TIMED_OUT
+        except requests.exceptions.RequestException as e:
+            print(f"Newbook {name} availability request for {property_name} failed: {str(e)}")
+            return None
+
+    names = list(queries)
+    results = concurrency.map_concurrently(query, names)
+    return {name: result for name, result in zip(names, results) if result is not TIMED_OUT}
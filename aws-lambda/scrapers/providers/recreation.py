@@ -0,0 +1,241 @@
+"""
+Shared recreation.gov (www.recreation.gov) client.
+
+Availability comes from the campground-level month endpoint, which reports every
+campsite's nightly status in one request, so a stay costs one request per calendar
+month it touches (two at most for stays up to a month) fetched concurrently. Campsites
+missing from a month response, or every campsite when a month request fails, fall
+back to the per-campsite endpoint, also concurrently. Fallback requests stop at the
+invocation deadline: the campsites already found available are still reported, and
+only a search that found nothing before the deadline fails with DeadlineExceeded.
+
+The campsite catalog (site IDs, types and group size limits) and the seasonal
+`rates_list` rarely change, so both responses are cached at module level and
+survive between warm invocations (see conditional.py). A cached catalog is reused
+for CATALOG_REVALIDATE_AFTER seconds and then revalidated with a conditional
+request when recreation.gov sent an ETag or Last-Modified, so an unchanged catalog
+costs a 304 rather than a full download. Without validators it is reused for
+CATALOG_TTL seconds before being downloaded again.
+"""
+
+from datetime import datetime, timedelta
+
+import requests
+
+from scrapers.common import concurrency, conditional, retry, timings, transport
+
+HOST = "www.recreation.gov"
+BASE_URL = f"https://{HOST}"
+
+HEADERS = {
+    "accept": "application/json, text/plain, */*",
+    "accept-encoding": "gzip, deflate, br",
+    "accept-language": "en-US,en;q=0.9",
+    "sec-ch-ua": '"Not A(Brand";v="8", "Chromium";v="132", "Google Chrome";v="132"',
+    "sec-ch-ua-mobile": "?0",
+    "sec-ch-ua-platform": '"macOS"',
+    "sec-fetch-dest": "empty",
+    "sec-fetch-mode": "cors",
+    "sec-fetch-site": "same-origin",
+    "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36"
+}
+
+# Campsite catalogs and seasonal rates are revalidated every few minutes, or kept
+# for hours when recreation.gov sends no validators
+CATALOG_REVALIDATE_AFTER = 15 * 60
+CATALOG_TTL = 6 * 60 * 60
+
+# Upper bound on concurrent per-campsite fallback requests
+MAX_SITE_WORKERS = 8
+
+REQUEST_TIMEOUT = 10
+
+# Marks a campsite whose fallback request was not sent before the deadline
+TIMED_OUT = object()
+
+_catalogs = conditional.Cache(revalidate_after=CATALOG_REVALIDATE_AFTER, freshness=CATALOG_TTL)
+
+
+def _get_json(path, referer, params=None, cache=None):
+    session = transport.warm_session(HOST)
+    headers = dict(HEADERS, referer=referer)
+    url = f"{BASE_URL}{path}"
+    timeout = retry.timeout(REQUEST_TIMEOUT)
+    if cache is not None:
+        response = cache.get(session, url, params=params, headers=headers, timeout=timeout)
+    else:
+        response = session.get(url, headers=headers, params=params, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def get_campsites(facility_id):
+    """
+    Campsites of a campground, excluding management sites.
+
+    Returns:
+        list: Dicts with "id", "name", "type", "min_people" and "max_people"
+    """
+    with timings.stage("bootstrap"):
+        data = _get_json(f"/api/camps/campgrounds/{facility_id}/campsites",
+                         f"{BASE_URL}/camping/campgrounds/{facility_id}", cache=_catalogs)
+
+    campsites = []
+    for campsite in data.get("campsites", []):
+        if campsite.get("campsite_type") == "MANAGEMENT":
+            continue
+
+        details = campsite.get("site_details_map", {})
+        min_people = int(details["min_num_people"]["attribute_value"]) if "min_num_people" in details else 1
+        max_people = int(details["max_num_people"]["attribute_value"]) if "max_num_people" in details else 8
+
+        campsites.append({
+            "id": str(campsite["campsite_id"]),
+            "name": campsite["campsite_name"],
+            "type": campsite["campsite_type"],
+            "min_people": min_people,
+            "max_people": max_people
+        })
+    return campsites
+
+
+def get_rates(facility_id, referer_site_id):
+    """
+    Returns:
+        list: The campground's seasonal `rates_list`
+    """
+    with timings.stage("fetch"):
+        data = _get_json(f"/api/camps/campgrounds/{facility_id}/rates",
+                         f"{BASE_URL}/camping/campsites/{referer_site_id}", cache=_catalogs)
+    return data.get("rates_list", [])
+
+
+def stay_nights(start, end):
+    """
+    Returns:
+        list: The nights of the stay as recreation.gov availability keys ("2025-06-29T00:00:00Z")
+    """
+    return [(start + timedelta(days=night)).strftime("%Y-%m-%dT00:00:00Z") for night in range((end - start).days)]
+
+
+def stay_months(start, end):
+    """
+    Returns:
+        list: First day of every calendar month containing a night of the stay
+    """
+    months = []
+    night = start
+    while night < end:
+        month = night.replace(day=1)
+        if month not in months:
+            months.append(month)
+        night = (month + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def _month_availability(facility_id, month):
+    with timings.stage("fetch"):
+        data = _get_json(f"/api/camps/availability/campground/{facility_id}/month",
+                         f"{BASE_URL}/camping/campgrounds/{facility_id}",
+                         params={"start_date": month.strftime("%Y-%m-01T00:00:00.000Z")})
+    return {
+        str(site_id): site.get("availabilities", {})
+        for site_id, site in data.get("campsites", {}).items()
+    }
+
+
+def _site_availability(site_id):
+    try:
+        with timings.stage("fetch"):
+            data = _get_json(f"/api/camps/availability/campsite/{site_id}/all",
+                             f"{BASE_URL}/camping/campsites/{site_id}")
+    except retry.DeadlineExceeded:
+        return TIMED_OUT
+    except (requests.RequestException, ValueError) as e:
+        print(f"Error fetching availability for campsite {site_id}: {str(e)}")
+        return None
+    return data.get("availability", {}).get("availabilities", {})
+
+
+def available_campsites(facility_id, campsites, start, end):
+    """
+    Find the campsites available for every night of a stay.
+
+    Args:
+        facility_id (str): recreation.gov campground (facility) ID
+        campsites (list): Candidate campsites from `get_campsites`
+        start (datetime): Check-in date
+        end (datetime): Check-out date
+
+    Returns:
+        list: The available campsites, in catalog order
+
+    Raises:
+        retry.DeadlineExceeded: If the deadline passed before any campsite was found
+            available and some were left unchecked
+    """
+    nights = stay_nights(start, end)
+    availabilities = {}
+    missing = {site["id"] for site in campsites}
+
+    def fetch_month(month):
+        try:
+            return _month_availability(facility_id, month)
+        except (requests.RequestException, ValueError) as e:
+            print(f"Error fetching {month.strftime('%B %Y')} availability for {facility_id}: {str(e)}")
+            return None
+
+    month_results = concurrency.map_concurrently(fetch_month, stay_months(start, end), max_workers=2)
+    if all(result is not None for result in month_results):
+        for result in month_results:
+            for site_id, site_availability in result.items():
+                availabilities.setdefault(site_id, {}).update(site_availability)
+        # A site is only covered when every month reported it
+        missing = {site_id for site_id in missing if not all(site_id in result for result in month_results)}
+
+    unchecked = 0
+    if missing:
+        fallback_ids = [site["id"] for site in campsites if site["id"] in missing]
+        for site_id, site_availability in zip(fallback_ids, concurrency.map_concurrently(_site_availability, fallback_ids, MAX_SITE_WORKERS)):
+            if site_availability is TIMED_OUT:
+                unchecked += 1
+            if site_availability is None or site_availability is TIMED_OUT:
+                availabilities.pop(site_id, None)
+            else:
+                availabilities[site_id] = site_availability
+
+    available = [
+        site for site in campsites
+        if site["id"] in availabilities and all(availabilities[site["id"]].get(night) == "Available" for night in nights)
+    ]
+    if unchecked and not available:
+        raise retry.DeadlineExceeded(f"Deadline reached with {unchecked} of {len(campsites)} campsites unchecked")
+    return available
+
+
+def season_price(rates_list, start, site_type_label):
+    """
+    Price of a site type in the season containing `start`.
+
+    Args:
+        rates_list (list): Seasonal rates from `get_rates`
+        start (datetime): Check-in date
+        site_type_label (str): Substring of the price_map key, e.g. "STANDARD NONELECTRIC"
+
+    Returns:
+        float or None: The nightly price, or None if no season matches
+    """
+    price = None
+    for rate_info in rates_list:
+        try:
+            season_start = datetime.strptime(rate_info.get("season_start", ""), "%Y-%m-%dT%H:%M:%SZ")
+            season_end = datetime.strptime(rate_info.get("season_end", ""), "%Y-%m-%dT%H:%M:%SZ")
+        except (ValueError, TypeError):
+            continue
+
+        if season_start <= start <= season_end:
+            for site_type, site_price in rate_info.get("price_map", {}).items():
+                if site_type_label in site_type:
+                    price = site_price
+                    break
+    return price
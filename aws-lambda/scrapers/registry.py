@@ -0,0 +1,48 @@
+"""
+Registry of scraper modules by campground ID.
+
+Lets callers that run several scrapers in one process (the batch Lambda and the
+backend's in-process execution mode) find a campground's Lambda module without
+going through API Gateway. Campground IDs match the backend's lambda_mappings.py.
+"""
+
+import importlib
+
+SCRAPER_MODULES = {
+    # Traverse City
+    "traverse-city-state-park": "scrapers.traverse_city.scrapeTraverseCityStatePark.lambda_function",
+    "traverse-city-koa": "scrapers.traverse_city.scrapeTraverseCityKoa.lambda_function",
+    "anchor-inn": "scrapers.traverse_city.scrapeAnchorInn.lambda_function",
+    "leelanau-pines": "scrapers.traverse_city.scrapeLeelanauPines.lambda_function",
+    "timber-ridge": "scrapers.traverse_city.scrapeTimberRidge.lambda_function",
+    # Mackinac City
+    "st-ignace-koa": "scrapers.mackinac_city.scrapeStIgnaceKoa.lambda_function",
+    "indian-river": "scrapers.mackinac_city.scrapeIndianRiver.lambda_function",
+    "straits-state-park": "scrapers.mackinac_city.scrapeStraitsStatePark.lambda_function",
+    "cabins-of-mackinaw": "scrapers.mackinac_city.scrapeCabinsOfMackinaw.lambda_function",
+    "teepee-campground": "scrapers.mackinac_city.scrapeTeePeeCampground.lambda_function",
+    # Pictured Rocks
+    "munising-koa": "scrapers.pictured_rocks.scrapeMunisingKoa.lambda_function",
+    "tourist-park": "scrapers.pictured_rocks.scrapeTouristPark.lambda_function",
+    "uncle-duckys-au-train": "scrapers.pictured_rocks.scrapeUncleDuckysAuTrain.lambda_function",
+    "uncle-duckys-paddlers-village": "scrapers.pictured_rocks.scrapeUncleDuckysPaddlersVillage.lambda_function",
+    "fort-superior": "scrapers.pictured_rocks.scrapeFortSuperior.lambda_function",
+    "au-train-lake": "scrapers.pictured_rocks.scrapeAuTrainLakeCampground.lambda_function"
+}
+
+
+def get_handler(campground_id):
+    """
+    Import a campground's scraper module and return its Lambda handler.
+
+    Args:
+        campground_id (str): Campground ID, e.g. "anchor-inn"
+
+    Returns:
+        callable: The module's `lambda_handler(event, context)`
+
+    Raises:
+        KeyError: If no scraper is registered for the campground
+    """
+    module = importlib.import_module(SCRAPER_MODULES[campground_id])
+    return module.lambda_handler
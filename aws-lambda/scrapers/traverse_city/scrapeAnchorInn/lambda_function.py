@@ -1,11 +1,8 @@
 import json
-# Only import datetime module if it's not already imported in the original code
-import sys
-import os
-import traceback
-
 from datetime import datetime
-import requests
+
+from scrapers.common import responses, retry, timings, transport
+from scrapers.common.handler import handle_request
 
 def scrape_anchorInn(start_date_str, end_date_str, num_adults, num_kids=0):
     # Calculate num_travelers from num_adults and num_kids
@@ -43,10 +40,12 @@ def scrape_anchorInn(start_date_str, end_date_str, num_adults, num_kids=0):
     }
      
     # Send the request
-    response = requests.post(url, headers=headers, data={})  # Sending an empty JSON object as payload
+    with timings.stage("fetch"):
+        response = transport.warm_session("secure.thinkreservations.com").post(url, headers=headers, data={}, timeout=retry.timeout(30))  # Sending an empty JSON object as payload
  
     if response.status_code == 200:
-        units = response.json()
+        with timings.stage("parse"):
+            units = response.json()
         for unit in units:
             name = unit["unit"]["name"]
             valid = (len(unit["validRateTypeAvailabilities"]) > 0)
@@ -76,11 +75,7 @@ def scrape_anchorInn(start_date_str, end_date_str, num_adults, num_kids=0):
     else:
         print(f"Failed to fetch data: {response.status_code}, {response.text}")
         return {
-            "lodging": {
-                "available": False,
-                "price": None,
-                "message": f"Failed to retrieve data: {response.status_code}"
-            }
+            "lodging": responses.failure(f"Failed to retrieve data: {response.status_code}")
         }
 
 def lambda_handler(event, context):
@@ -94,80 +89,7 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response object
     """
-    try:
-        # Parse the request body
-        if event.get('body'):
-            try:
-                body = json.loads(event['body'])
-            except Exception as e:
-                return {
-                    'statusCode': 400,
-                    'body': json.dumps({
-                        'message': f'Error parsing request body: {str(e)}'
-                    })
-                }
-        else:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'message': 'Missing request body'
-                })
-            }
-        
-        # Extract parameters
-        start_date = body.get('startDate')
-        end_date = body.get('endDate')
-        num_adults = body.get('numAdults', 2)
-        num_kids = body.get('numKids', 0)
-        
-        if not all([start_date, end_date]):
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'message': 'Missing required parameters'
-                })
-            }
-        
-        # Call the scraper function
-        result = scrape_anchorInn(start_date, end_date, num_adults, num_kids)
-        
-        # Add timestamp and scraper name
-        from datetime import datetime
-        result['timestamp'] = datetime.now().isoformat()
-        result['scraper'] = "Anchorinn"
-        
-        # Return the result
-        return {
-            'statusCode': 200,
-            'body': json.dumps(result),
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Credentials': 'true'
-            }
-        }
-        
-    except Exception as e:
-        error_traceback = traceback.format_exc()
-        print(f"Error in Anchorinn Lambda: {str(e)}")
-        
-        # Get current time for timestamp
-        from datetime import datetime
-        current_time = datetime.now().isoformat()
-        
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'message': f'Error: {str(e)}',
-                'scraper': "Anchorinn",
-                'timestamp': current_time
-            }),
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Credentials': 'true'
-            }
-        }
+    return handle_request(event, context, scrape_anchorInn, "Anchorinn")
 
 
 # This is used for local testing
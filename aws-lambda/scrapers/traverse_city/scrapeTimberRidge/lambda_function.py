@@ -1,138 +1,89 @@
 import json
-# Only import datetime module if it's not already imported in the original code
-import sys
-import os
-import traceback
 
-from datetime import datetime, timedelta
-import requests
-from bs4 import BeautifulSoup
+from scrapers.common import retry
+from scrapers.common.handler import handle_request
+from scrapers.providers import newbook
 
-def scrape_timberRidge(start_date, end_date, num_adults, num_kids):
-    url = "https://bookingsus.newbook.cloud/timberridgeresort/api.php"
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-        "Accept": "*/*",
-        "Origin": "https://bookingsus.newbook.cloud",
-        "Referer": "https://bookingsus.newbook.cloud/timberridgeresort/index.php",
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.3.1 Safari/605.1.15",
-        "X-Requested-With": "XMLHttpRequest"
-    }
-    
-    def convert_date(date_str):
-        date_obj = datetime.strptime(date_str, '%m/%d/%y')
-        return date_obj.strftime('%b %d %Y')
-    
-    # Calculate the actual number of nights
-    start_date_obj = datetime.strptime(start_date, '%m/%d/%y')
-    end_date_obj = datetime.strptime(end_date, '%m/%d/%y')
-    nights = (end_date_obj - start_date_obj).days
-    
-    start_date_formatted = convert_date(start_date)
-    end_date_formatted = convert_date(end_date)
+PROPERTY = "timberridgeresort"
 
-    results = {
-        "rv": {"available": False, "price": None, "message": "Not available"},
-        "tent": {"available": False, "price": None, "message": "Not available"},
-        "lodging": {"available": False, "price": None, "message": "Not available"}
-    }
+TENT_RV_SITES = ["Site Deluxe 30/50 amp", "Site Premium Super 30/50 amp"]
 
-    # First, make a request for tent/RV sites with equipment parameters
-    tent_rv_data = {
-        "newbook_api_action": "availability_chart_responsive",
-        "available_from": start_date_formatted,
-        "available_to": end_date_formatted,
-        "nights": nights,
-        "adults": num_adults,
-        "children": num_kids,
-        "infants": 0,
-        "animals": 0,
-        "equipment_type": 3,
-        "equipment_length": 20
-    }
-    
-    tent_rv_response = requests.post(url, headers=headers, data=tent_rv_data, timeout=30)
-    
-    # Process tent/RV results
-    if tent_rv_response.status_code == 200:
-        inventory = tent_rv_response.text
-        soup = BeautifulSoup(inventory, 'html.parser')
-        all_containers = soup.find_all("div", class_="newbook_online_category_details")
-        
+# Availability chart queries: campsites are searched with RV equipment, cabins without
+QUERIES = {
+    "sites": {"equipment_type": 3, "equipment_length": 20},
+    "cabins": {}
+}
+
+# Query needed for each accommodation type
+TYPE_QUERIES = {"tent": "sites", "rv": "sites", "lodging": "cabins"}
+
+def scrape_timberRidge(start_date, end_date, num_adults, num_kids, types=None):
+    """
+    Scrape Timber Ridge Resort availability from Newbook.
+
+    Args:
+        start_date: Start date in format MM/DD/YY
+        end_date: End date in format MM/DD/YY
+        num_adults: Number of adults
+        num_kids: Number of children
+        types: Accommodation types to check (default: tent, rv and lodging); only
+            the queries those types need are sent
+
+    Returns:
+        dict: Availability per requested accommodation type; types whose query failed
+        or was cut off by the deadline are left out and the result is marked "partial"
+
+    Raises:
+        retry.RetryableError: If every query failed
+    """
+    types = [accommodation_type for accommodation_type in TYPE_QUERIES if types is None or accommodation_type in types]
+    needed = {TYPE_QUERIES[accommodation_type] for accommodation_type in types}
+
+    # The campsite and cabin queries run at the same time
+    responses = newbook.query_categories(PROPERTY, {name: QUERIES[name] for name in QUERIES if name in needed},
+                                         start_date, end_date, num_adults, num_kids)
+
+    if not responses:
+        raise retry.DeadlineExceeded("Deadline reached before Timber Ridge was queried")
+
+    failed = {name for name, categories in responses.items() if categories is None}
+    if failed == needed:
+        raise retry.RetryableError("Timber Ridge availability requests failed")
+
+    results = {}
+    if responses.keys() != needed or failed:
+        results["partial"] = True
+
+    if responses.get("sites") is not None:
+        categories = responses["sites"]
         # Process for tent and RV (they'll have the same values)
         tent_rv_result = {"available": False, "price": None, "message": "No options available."}
         
-        for container in all_containers:
-            a_tag = container.find("h3").find("a") if container.find("h3") else None
-            if a_tag:
-                stay_name = a_tag.text.strip()
-                
-                # Check if it's one of the tent/RV sites we're looking for
-                if stay_name in ["Site Deluxe 30/50 amp", "Site Premium Super 30/50 amp"]:
-                    book_now_button = container.find("button", class_="button", attrs={"aria-label": "Book now"})
-                    price_span = container.find_all("span", class_="newbook_online_from_price_text")
-                    
-                    if book_now_button and price_span:
-                        price = float(price_span[0].text.lstrip("$"))
-                        tent_rv_result = {
-                            "available": True,
-                            "price": price,
-                            "message": f"${price:.2f} per night - {stay_name}"
-                        }
-                        break  # Found a valid tent/RV site, no need to check further
+        for category in categories:
+            # Check if it's one of the tent/RV sites we're looking for
+            if category["name"] in TENT_RV_SITES and category["bookable"]:
+                price = category["price"]
+                tent_rv_result = {
+                    "available": True,
+                    "price": price,
+                    "message": f"${price:.2f} per night - {category['name']}"
+                }
+                break  # Found a valid tent/RV site, no need to check further
         
-        results["tent"] = tent_rv_result
-        results["rv"] = tent_rv_result  # Same results for tent and RV
-    else:
-        # If the API request failed, set tent/RV types to unavailable
-        error_message = "Failed to retrieve tent/RV data"
-        results["tent"] = {"available": False, "price": None, "message": error_message}
-        results["rv"] = {"available": False, "price": None, "message": error_message}
+        for accommodation_type in ("tent", "rv"):
+            if accommodation_type in types:
+                results[accommodation_type] = dict(tent_rv_result)
     
-    # Now, make a second request for cabins without equipment parameters
-    cabin_data = {
-        "newbook_api_action": "availability_chart_responsive",
-        "available_from": start_date_formatted,
-        "available_to": end_date_formatted,
-        "nights": nights,
-        "adults": num_adults,
-        "children": num_kids,
-        "infants": 0,
-        "animals": 0
-    }
-    
-    cabin_response = requests.post(url, headers=headers, data=cabin_data, timeout=30)
-    
-    # Process cabin results
-    if cabin_response.status_code == 200:
-        inventory = cabin_response.text
-        soup = BeautifulSoup(inventory, 'html.parser')
-        all_containers = soup.find_all("div", class_="newbook_online_category_details")
-        
-        # Process for cabins
+    if responses.get("cabins") is not None:
+        categories = responses["cabins"]
+        # Process for cabins, skipping the tent/RV sites
         cabin_stays = {}
-        
-        for container in all_containers:
-            a_tag = container.find("h3").find("a") if container.find("h3") else None
-            if a_tag:
-                stay_name = a_tag.text.strip()
-                
-                # Skip if it's one of the tent/RV sites
-                if stay_name in ["Site Deluxe 30/50 amp", "Site Premium Super 30/50 amp"]:
-                    continue
-                
-                price_span = container.find_all("span", class_="newbook_online_from_price_text")
-                if price_span:
-                    # Find the "Book now" button
-                    book_now_button = container.find("button", class_="button", attrs={"aria-label": "Book now"})
-                    if book_now_button:
-                        stay_price = float(price_span[0].text.lstrip("$"))
-                        cabin_stays[stay_name] = stay_price
-                    else:
-                        cabin_stays[stay_name] = 'Unavailable'
-                else:
-                    cabin_stays[stay_name] = 'Unavailable'
-        
+
+        for category in categories:
+            if category["name"] in TENT_RV_SITES:
+                continue
+            cabin_stays[category["name"]] = category["price"] if category["bookable"] else 'Unavailable'
+
         # Define cabin types
         bunkhouse = "Bunkhouse (Sleeps 10)"
         cabin_deluxe = "Cabin Deluxe (Sleeps 2.)"
@@ -145,10 +96,10 @@ def scrape_timberRidge(start_date, end_date, num_adults, num_kids):
 
         # Calculate total number of travelers
         num_travelers = num_adults + num_kids
-        
+
         # Define priority lists based on number of travelers
         priority_list = []
-        
+
         if num_travelers <= 2:
             priority_list = [cabin_deluxe, yurt_deluxe, yurt_basic, cottage, cottage_premium, park_home]
         elif num_travelers <= 5:
@@ -157,17 +108,17 @@ def scrape_timberRidge(start_date, end_date, num_adults, num_kids):
             priority_list = [premium_park_home, bunkhouse]
         else:
             priority_list = [bunkhouse]
-        
+
         # Try to find the first available option in the priority list
         selected_cabin = None
         selected_price = None
-        
+
         for cabin_type in priority_list:
             if cabin_type in cabin_stays and cabin_stays[cabin_type] != 'Unavailable':
                 selected_cabin = cabin_type
                 selected_price = cabin_stays[cabin_type]
                 break
-        
+
         if selected_cabin and selected_price:
             results["lodging"] = {
                 "available": True,
@@ -180,10 +131,6 @@ def scrape_timberRidge(start_date, end_date, num_adults, num_kids):
                 "price": None,
                 "message": "No suitable lodging available for the selected dates and party size."
             }
-    else:
-        # If the API request failed, set lodging type to unavailable
-        error_message = "Failed to retrieve lodging data"
-        results["lodging"] = {"available": False, "price": None, "message": error_message}
     
     return results
 
@@ -198,80 +145,7 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response object
     """
-    try:
-        # Parse the request body
-        if event.get('body'):
-            try:
-                body = json.loads(event['body'])
-            except Exception as e:
-                return {
-                    'statusCode': 400,
-                    'body': json.dumps({
-                        'message': f'Error parsing request body: {str(e)}'
-                    })
-                }
-        else:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'message': 'Missing request body'
-                })
-            }
-        
-        # Extract parameters
-        start_date = body.get('startDate')
-        end_date = body.get('endDate')
-        num_adults = body.get('numAdults', 2)
-        num_kids = body.get('numKids', 0)
-        
-        if not all([start_date, end_date]):
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'message': 'Missing required parameters'
-                })
-            }
-        
-        # Call the scraper function
-        result = scrape_timberRidge(start_date, end_date, num_adults, num_kids)
-        
-        # Add timestamp and scraper name
-        from datetime import datetime
-        result['timestamp'] = datetime.now().isoformat()
-        result['scraper'] = "Timberridge"
-        
-        # Return the result
-        return {
-            'statusCode': 200,
-            'body': json.dumps(result),
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Credentials': 'true'
-            }
-        }
-        
-    except Exception as e:
-        error_traceback = traceback.format_exc()
-        print(f"Error in Timberridge Lambda: {str(e)}")
-        
-        # Get current time for timestamp
-        from datetime import datetime
-        current_time = datetime.now().isoformat()
-        
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'message': f'Error: {str(e)}',
-                'scraper': "Timberridge",
-                'timestamp': current_time
-            }),
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Credentials': 'true'
-            }
-        }
+    return handle_request(event, context, scrape_timberRidge, "Timberridge")
 
 
 # This is used for local testing
@@ -1,18 +1,11 @@
 import json
-# Only import datetime module if it's not already imported in the original code
-import sys
-import os
-import traceback
-
-from bs4 import BeautifulSoup
-import requests
-import time
-import random
-from requests.exceptions import RequestException
 import logging
+import random
+
+from scrapers.common import responses, retry, timings, transport
+from scrapers.common.handler import handle_request
+from scrapers.providers import koa
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # List of user agents to rotate
@@ -24,11 +17,7 @@ USER_AGENTS = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36",
 ]
 
-def scrape_traverseCityKoa(start_date, end_date, num_adults=2, num_kids=0, retry_count=0, max_retries=3):
-    # Add delay with jitter to avoid predictable patterns (higher delay on retries)
-    delay = (2 + retry_count * 3) + random.uniform(0.5, 1.5)
-    time.sleep(delay)
-    
+def scrape_traverseCityKoa(start_date, end_date, num_adults=2, num_kids=0, max_retries=3):
     # Ensure we have string dates in MM/DD/YY format
     if isinstance(start_date, str) and isinstance(end_date, str):
         # Assuming dates are in MM/DD/YY format
@@ -58,166 +47,95 @@ def scrape_traverseCityKoa(start_date, end_date, num_adults=2, num_kids=0, retry
         "Connection": "keep-alive",
     }
 
-    session = requests.Session()
-
-    try:
-        logger.info(f"Making initial GET request (attempt {retry_count+1}/{max_retries+1})")
-        response = session.get(get_url, headers=headers, timeout=10)
-        response.raise_for_status() 
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-        token = soup.find('input', {'name': '__RequestVerificationToken'})
-
-        if token:
-            token = token.get('value')
-        else:
-            logger.warning("Token not found in HTML. Check if the page structure has changed.")
-            raise ValueError("Token not found in HTML. Check if the page structure has changed.")
+    def attempt(attempt_number):
+        # Kept across warm invocations, so the token and cookies are only fetched when stale
+        session = transport.warm_session("koa.com")
+
+        try:
+            # Reuse the token from an earlier date range or warm invocation
+            token = session.bootstrap.get(get_url)
+
+            if not token:
+                logger.info(f"Making initial GET request (attempt {attempt_number+1}/{max_retries+1})")
+                koa.pacer.wait()
+                with timings.stage("bootstrap"):
+                    response = koa.get_landing_page(session, get_url, headers)
+                if response.status_code == 429:
+                    koa.pacer.rate_limited(response.headers.get("Retry-After"))
+                response.raise_for_status() 
+
+                with timings.stage("parse"):
+                    token = koa.parse_verification_token(response.text)
+
+                if not token:
+                    logger.warning("Token not found in HTML. Check if the page structure has changed.")
+                    raise retry.RetryableError("Token not found in HTML. Check if the page structure has changed.")
+
+                session.bootstrap[get_url] = token
+
+            post_url = "https://koa.com/campgrounds/traverse-city/reserve/"
+
+            data = {
+                "Reservation.SiteCategory": "A",
+                "Reservation.CheckInDate": check_in_date,
+                "Reservation.CheckOutDate": check_out_date,
+                "Reservation.Adults": str(num_adults),
+                "Reservation.Kids": str(num_kids),
+                "Reservation.Free": "0",
+                "Reservation.Pets": "No",
+                "Reservation.EquipmentType": "A",
+                "Reservation.EquipmentLength": "0",
+                "__RequestVerificationToken": token
+            }
 
-        # Add a small delay between GET and POST
-        time.sleep(1 + random.uniform(0.5, 1.0))
+            logger.info("Making POST request")
+            # Sends immediately unless koa.com has recently been rate limiting us
+            koa.pacer.wait()
+            with timings.stage("fetch"):
+                post_response = session.post(post_url, headers=headers, data=data, timeout=retry.timeout(10))
+        except retry.DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Error during scraping: {str(e)}")
+            transport.discard_warm_session("koa.com")
+            raise
+
+        rate_limited, results = post_response.status_code == 429, None
+        if post_response.status_code == 200 and post_response.text:
+            with timings.stage("parse"):
+                rate_limited, results = koa.parse_reservation_page(post_response.text)
 
-        post_url = "https://koa.com/campgrounds/traverse-city/reserve/"
+        # Rate limited either with a 429 or with an error message on the page
+        if rate_limited:
+            koa.pacer.rate_limited(post_response.headers.get("Retry-After"))
+            logger.warning(f"Rate limit detected in response, pacing now {koa.pacer.state()}")
+            session.bootstrap.pop(get_url, None)
+            raise retry.RetryableError("Rate limited after retries.")
 
-        data = {
-            "Reservation.SiteCategory": "A",
-            "Reservation.CheckInDate": check_in_date,
-            "Reservation.CheckOutDate": check_out_date,
-            "Reservation.Adults": str(num_adults),
-            "Reservation.Kids": str(num_kids),
-            "Reservation.Free": "0",
-            "Reservation.Pets": "No",
-            "Reservation.EquipmentType": "A",
-            "Reservation.EquipmentLength": "0",
-            "__RequestVerificationToken": token
-        }
+        if results is None:
+            logger.warning(f"Unexpected status code: {post_response.status_code}")
+            transport.discard_warm_session("koa.com")
+            raise retry.RetryableError(f"Error: Status code {post_response.status_code}")
 
-        logger.info("Making POST request")
-        post_response = session.post(post_url, headers=headers, data=data, timeout=10)
+        koa.pacer.succeeded()
+        return results
 
-        if post_response.status_code == 200 and post_response.text:
-            soup = BeautifulSoup(post_response.text, 'html.parser')
-            
-            # Check if we've been rate limited (looking for error message)
-            error_msg = soup.find('div', class_='alert-danger')
-            if error_msg and "rate limit" in error_msg.text.lower():
-                logger.warning("Rate limit detected in response")
-                if retry_count < max_retries:
-                    logger.info(f"Retrying with exponential backoff ({retry_count+1}/{max_retries})")
-                    return scrape_traverseCityKoa(start_date, end_date, num_adults, num_kids, 
-                                                 retry_count=retry_count+1, max_retries=max_retries)
-                else:
-                    error_message = "Rate limited after retries."
-                    return {
-                        "rv": {"available": False, "price": None, "message": error_message},
-                        "tent": {"available": False, "price": None, "message": error_message},
-                        "lodging": {"available": False, "price": None, "message": error_message}
-                    }
-            
-            containers = soup.find_all('div', class_='reserve-sitetype-main-row')
-            available_rv = False
-            available_tent = False
-            available_lodging = False
-            cheapest_rv_price = 1000000
-            cheapest_tent_price = 1000000
-            cheapest_lodging_price = 1000000
-            cheapest_rv_name = None
-            cheapest_tent_name = None
-            cheapest_lodging_name = None
-            
-            for container in containers:
-                name_element = container.find('h4', class_='reserve-sitetype-title')
-                if not name_element:
-                    continue
-                
-                name = name_element.text.strip()
-                price_container = container.find('div', class_='reserve-quote-per-night')
-                
-                if not price_container or not price_container.find('strong') or not price_container.find('strong').find('span'):
-                    continue
-                
-                try:
-                    price_text = price_container.find('strong').find('span').text.lstrip('$').split(' ')[0]
-                    price = float(price_text)
-                    
-                    # Categorize based on name (simplified logic - can be refined later)
-                    name_lower = name.lower()
-                    if 'rv' in name_lower or 'full hook' in name_lower or 'pull-thru' in name_lower or 'hook-up' in name_lower:
-                        if price < cheapest_rv_price:
-                            cheapest_rv_price = price
-                            available_rv = True
-                            cheapest_rv_name = name
-                    elif 'tent' in name_lower or 'primitive' in name_lower:
-                        if price < cheapest_tent_price:
-                            cheapest_tent_price = price
-                            available_tent = True
-                            cheapest_tent_name = name
-                    elif 'cabin' in name_lower or 'lodge' in name_lower or 'cottage' in name_lower:
-                        if price < cheapest_lodging_price:
-                            cheapest_lodging_price = price
-                            available_lodging = True
-                            cheapest_lodging_name = name
-                except (ValueError, AttributeError) as e:
-                    logger.warning(f"Error parsing price: {e}")
-                    continue
-            
-            # Initialize the results dictionary with all accommodation types
-            results = {
-                "rv": {"available": False, "price": None, "message": "No RV sites available."},
-                "tent": {"available": False, "price": None, "message": "No tent sites available."},
-                "lodging": {"available": False, "price": None, "message": "No lodging available."}
-            }
-            
-            # Update with available options
-            if available_rv:
-                results["rv"] = {
-                    "available": True, 
-                    "price": cheapest_rv_price, 
-                    "message": f"${cheapest_rv_price:.2f} per night - {cheapest_rv_name}"
-                }
-                
-            if available_tent:
-                results["tent"] = {
-                    "available": True, 
-                    "price": cheapest_tent_price, 
-                    "message": f"${cheapest_tent_price:.2f} per night - {cheapest_tent_name}"
-                }
-                
-            if available_lodging:
-                results["lodging"] = {
-                    "available": True, 
-                    "price": cheapest_lodging_price, 
-                    "message": f"${cheapest_lodging_price:.2f} per night - {cheapest_lodging_name}"
-                }
-                
-            return results
+    def error_results(error):
+        if isinstance(error, retry.RetryableError):
+            error_message = str(error)
+        elif isinstance(error, retry.DeadlineExceeded):
+            error_message = f"Timed out: {str(error)}"
         else:
-            logger.warning(f"Unexpected status code: {post_response.status_code}")
-            if retry_count < max_retries:
-                return scrape_traverseCityKoa(start_date, end_date, num_adults, num_kids, 
-                                             retry_count=retry_count+1, max_retries=max_retries)
-            else:
-                error_message = f"Error: Status code {post_response.status_code}"
-                return {
-                    "rv": {"available": False, "price": None, "message": error_message},
-                    "tent": {"available": False, "price": None, "message": error_message},
-                    "lodging": {"available": False, "price": None, "message": error_message}
-                }
-    
-    except (RequestException, ValueError, Exception) as e:
-        logger.error(f"Error during scraping: {str(e)}")
-        if retry_count < max_retries:
-            logger.info(f"Retrying with exponential backoff ({retry_count+1}/{max_retries})")
-            return scrape_traverseCityKoa(start_date, end_date, num_adults, num_kids, 
-                                         retry_count=retry_count+1, max_retries=max_retries)
-        else:
-            error_message = f"Error after retries: {str(e)}"
-            return {
-                "rv": {"available": False, "price": None, "message": error_message},
-                "tent": {"available": False, "price": None, "message": error_message},
-                "lodging": {"available": False, "price": None, "message": error_message}
-            }
+            error_message = f"Error after retries: {str(error)}"
+        return {
+            "rv": responses.failure(error_message),
+            "tent": responses.failure(error_message),
+            "lodging": responses.failure(error_message)
+        }
 
+    # Iterative retries with bounded backoff that stop in time to answer before the deadline;
+    # the pacer adds its own backoff when koa.com is rate limiting
+    return retry.run(attempt, max_attempts=max_retries + 1, base_delay=0.5, max_delay=4.0, fallback=error_results)
 
 def lambda_handler(event, context):
     """
@@ -230,81 +148,7 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response object
     """
-    try:
-        # Parse the request body
-        if event.get('body'):
-            try:
-                body = json.loads(event['body'])
-            except Exception as e:
-                return {
-                    'statusCode': 400,
-                    'body': json.dumps({
-                        'message': f'Error parsing request body: {str(e)}'
-                    })
-                }
-        else:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'message': 'Missing request body'
-                })
-            }
-        
-        # Extract parameters
-        start_date = body.get('startDate')
-        end_date = body.get('endDate')
-        num_adults = body.get('numAdults', 2)
-        num_kids = body.get('numKids', 0)
-        
-        if not all([start_date, end_date]):
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'message': 'Missing required parameters'
-                })
-            }
-        
-        # Call the scraper function
-        result = scrape_traverseCityKoa(start_date, end_date, num_adults, num_kids)
-        
-        # Add timestamp and scraper name
-        from datetime import datetime
-        result['timestamp'] = datetime.now().isoformat()
-        result['scraper'] = "Traversecitykoa"
-        
-        # Return the result
-        return {
-            'statusCode': 200,
-            'body': json.dumps(result),
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Credentials': 'true'
-            }
-        }
-        
-    except Exception as e:
-        error_traceback = traceback.format_exc()
-        print(f"Error in Traversecitykoa Lambda: {str(e)}")
-        print(f"Traceback: {error_traceback}")
-        
-        # Get current time for timestamp
-        from datetime import datetime
-        current_time = datetime.now().isoformat()
-        
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'message': f'Error: {str(e)}',
-                'scraper': "Traversecitykoa",
-                'timestamp': current_time
-            }),
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Credentials': 'true'
-            }
-        }
+    return handle_request(event, context, scrape_traverseCityKoa, "Traversecitykoa")
 
 
 # This is used for local testing
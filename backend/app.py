@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, Response
 from flask_cors import CORS
 import json
 import stripe
@@ -9,13 +9,21 @@ import logging
 from dotenv import load_dotenv
 import time
 from supabase import create_client
+import math
 import random
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 from helpers.trip_itineraries import TRIP_ITINERARIES
 from helpers.cities_data import get_cities_data
 from helpers.campgrounds_data import get_campgrounds_data
 from helpers.lambda_mappings import get_lambda_mappings
 from helpers.email_service import send_confirmation_email
+from helpers import metrics
+from helpers import tracing
+from helpers import local_scrapers
+from helpers import snapshots
 
 load_dotenv()
 
@@ -24,8 +32,25 @@ logger = logging.getLogger(__name__)
 
 availability_cache = {}
 CACHE_DURATION = 1800
+
+# Oldest result, in seconds, a scraper may answer from its own warm cache (maxAge):
+# SCRAPER_MAX_AGE_COLD when the backend has no entry for the stay, SCRAPER_MAX_AGE_REFRESH
+# when it is refreshing one
+SCRAPER_MAX_AGE_COLD = 300
+SCRAPER_MAX_AGE_REFRESH = 60
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 5000))
 MAX_CONCURRENT_REQUESTS = 10
 
+# Seconds an availability request waits for its scrapers; scrapers get the matching
+# absolute deadline, minus the time the response needs to travel back
+SCRAPE_TIMEOUT = 30
+SCRAPE_RESPONSE_MARGIN = 1.0
+
+# Lambda-backed campgrounds are sent to the batch scraper once a request covers this many
+BATCH_LAMBDA_PATH = "scrapers/batch"
+BATCH_MIN_CAMPGROUNDS = int(os.environ.get('BATCH_MIN_CAMPGROUNDS', 3))
+BATCH_MAX_JOBS = 50
+
 app = Flask(__name__)
 
 FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
@@ -48,7 +73,35 @@ supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
 
 stripe.api_key = os.environ.get("STRIPE_SECRET_KEY")
 
-def call_lambda_function(lambda_path, payload, timeout=30):
+def scrape_deadline():
+    """Absolute deadline (Unix epoch seconds) for the scrapes of a request starting now."""
+    return time.time() + SCRAPE_TIMEOUT
+
+def apply_deadline(payload, timeout, deadline):
+    """
+    Pass a request deadline on to a scraper.
+    
+    Args:
+        payload (dict): The scraper payload
+        timeout (int): Timeout in seconds to use without a deadline
+        deadline (float): Absolute deadline (Unix epoch seconds), or None
+        
+    Returns:
+        tuple: (payload, timeout) with the scraper's `deadline` set and the timeout
+        shortened to the time left
+    """
+    if deadline is None:
+        return payload, timeout
+    payload = {**payload, "deadline": deadline - SCRAPE_RESPONSE_MARGIN}
+    return payload, min(timeout, max(deadline - time.time(), 0))
+
+def _deadline_error(name):
+    return {
+        "error": f"Deadline reached before {name} was called",
+        "timestamp": datetime.now().isoformat()
+    }
+
+def call_lambda_function(lambda_path, payload, timeout=30, trace=None, deadline=None, max_age=None):
     """
     Call a Lambda function with the given payload.
     
@@ -56,11 +109,31 @@ def call_lambda_function(lambda_path, payload, timeout=30):
         lambda_path (str): The path to the Lambda function
         payload (dict): The payload to send to the Lambda function
         timeout (int): Timeout in seconds
+        trace (Trace): Request trace to propagate to the Lambda and record the call in
+        deadline (float): Absolute deadline (Unix epoch seconds) sent to the Lambda, which
+            stops scraping once it passes; also bounds the timeout
+        max_age (float): Oldest result the scraper may answer from its warm cache, in
+            seconds (see scrape_max_age); the scraper's default when None
         
     Returns:
         dict: The response from the Lambda function
     """
+    if max_age is not None:
+        payload = {**payload, "maxAge": max_age}
+    payload, timeout = apply_deadline(payload, timeout, deadline)
+    if timeout <= 0:
+        return _deadline_error(f"Lambda function {lambda_path}")
+    
     lambda_url = f"{LAMBDA_BASE_URL}/{lambda_path}"
+    trace_context = trace.child_context() if trace else None
+    if trace_context:
+        payload = {**payload, "trace": trace_context}
+    
+    in_flight = metrics.LAMBDA_IN_FLIGHT.labels(lambda_path)
+    in_flight.inc()
+    started = time.perf_counter()
+    status = None
+    lambda_timings = None
     
     try:
         response = requests.post(
@@ -68,10 +141,17 @@ def call_lambda_function(lambda_path, payload, timeout=30):
             json=payload,
             timeout=timeout
         )
+        status = response.status_code
+        metrics.LAMBDA_REQUESTS.labels(lambda_path, response.status_code).inc()
         
         if response.status_code == 200:
-            return response.json()
+            result = response.json()
+            # Stage timings belong in the trace, not in the cached availability result
+            if isinstance(result, dict):
+                lambda_timings = result.pop('timings', None)
+            return result
         else:
+            metrics.LAMBDA_ERRORS.labels(lambda_path, "bad_status").inc()
             error_message = f"Lambda function {lambda_path} returned status code {response.status_code}"
             logger.error(f"{error_message}: {response.text}")
             return {
@@ -79,6 +159,10 @@ def call_lambda_function(lambda_path, payload, timeout=30):
                 "timestamp": datetime.now().isoformat()
             }
     except requests.exceptions.Timeout:
+        status = "timeout"
+        metrics.LAMBDA_REQUESTS.labels(lambda_path, "timeout").inc()
+        metrics.LAMBDA_TIMEOUTS.labels(lambda_path).inc()
+        metrics.LAMBDA_ERRORS.labels(lambda_path, "timeout").inc()
         error_message = f"Lambda function {lambda_path} timed out"
         logger.error(error_message)
         return {
@@ -86,13 +170,338 @@ def call_lambda_function(lambda_path, payload, timeout=30):
             "timestamp": datetime.now().isoformat()
         }
     except requests.exceptions.RequestException as e:
+        status = "connection_error"
+        metrics.LAMBDA_REQUESTS.labels(lambda_path, "connection_error").inc()
+        metrics.LAMBDA_ERRORS.labels(lambda_path, "connection_error").inc()
         error_message = f"Failed to connect to Lambda function {lambda_path}: {str(e)}"
         logger.error(error_message)
         return {
             "error": error_message,
             "timestamp": datetime.now().isoformat()
         }
+    finally:
+        ended = time.perf_counter()
+        metrics.LAMBDA_REQUEST_DURATION.labels(lambda_path).observe(ended - started)
+        in_flight.dec()
+        if trace:
+            trace.add_lambda_call(lambda_path, trace_context, started, ended, status, lambda_timings)
+
+def call_local_scraper(campground_id, payload, timeout=30, trace=None, deadline=None, max_age=None):
+    """
+    Run a campground's scraper in the backend's process pool instead of on Lambda.
+    
+    Args:
+        campground_id (str): The campground to scrape
+        payload (dict): The payload that would be sent to the Lambda function
+        timeout (int): Timeout in seconds
+        trace (Trace): Request trace to propagate to the scraper and record the run in
+        deadline (float): Absolute deadline (Unix epoch seconds); a scraper still running
+            when the wait times out stops at it instead of finishing in the background
+        max_age (float): As for call_lambda_function
+        
+    Returns:
+        dict: The scraper result, in the same format as call_lambda_function
+    """
+    if max_age is not None:
+        payload = {**payload, "maxAge": max_age}
+    payload, timeout = apply_deadline(payload, timeout, deadline)
+    if timeout <= 0:
+        return _deadline_error(f"Local scraper {campground_id}")
+    
+    trace_context = trace.child_context() if trace else None
+    if trace_context:
+        payload = {**payload, "trace": trace_context}
     
+    started = time.perf_counter()
+    status = None
+    scraper_timings = None
+    
+    try:
+        status, result = local_scrapers.run_scraper(campground_id, payload, timeout=timeout)
+        
+        if status == 200:
+            scraper_timings = result.pop('timings', None)
+            return result
+        else:
+            error_message = f"Local scraper {campground_id} returned status code {status}"
+            logger.error(f"{error_message}: {result}")
+            return {
+                "error": error_message,
+                "timestamp": datetime.now().isoformat()
+            }
+    except FutureTimeoutError:
+        status = "timeout"
+        error_message = f"Local scraper {campground_id} timed out"
+        logger.error(error_message)
+        return {
+            "error": error_message,
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        status = "error"
+        error_message = f"Local scraper {campground_id} failed: {str(e)}"
+        logger.error(error_message)
+        return {
+            "error": error_message,
+            "timestamp": datetime.now().isoformat()
+        }
+    finally:
+        ended = time.perf_counter()
+        metrics.LOCAL_SCRAPER_RUNS.labels(campground_id, status).inc()
+        metrics.LOCAL_SCRAPER_DURATION.labels(campground_id).observe(ended - started)
+        if trace:
+            trace.add_lambda_call(f"local/{campground_id}", trace_context, started, ended, status, scraper_timings)
+
+def call_batch_lambda(jobs, timeout=30, trace=None, deadline=None):
+    """
+    Scrape several campgrounds with a single call to the batch Lambda.
+    
+    Args:
+        jobs (list): Dicts with campgroundId, startDate, endDate, numAdults and numKids, and
+            optionally types and maxAge
+        timeout (int): Timeout in seconds
+        trace (Trace): Request trace to propagate to the Lambda and record the call in
+        deadline (float): Absolute deadline (Unix epoch seconds) shared by every job
+        
+    Returns:
+        list: One result per job, in job order, each in the same format as call_lambda_function
+    """
+    response = call_lambda_function(BATCH_LAMBDA_PATH, {"jobs": jobs}, timeout=timeout, trace=trace, deadline=deadline)
+    if 'error' in response:
+        return [dict(response) for _ in jobs]
+    
+    results = []
+    for job, job_result in zip(jobs, response.get('results', [])):
+        campground_id = job['campgroundId']
+        if job_result.get('statusCode') == 200:
+            result = job_result['result']
+            job_timings = result.pop('timings', None)
+        else:
+            job_timings = job_result.get('timings')
+            error_message = f"Batch scraper for {campground_id} failed: {job_result.get('error')}"
+            logger.error(error_message)
+            result = {
+                "error": error_message,
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        if trace and job_timings:
+            trace.add_batch_job(campground_id, job_timings)
+        results.append(result)
+    
+    # Jobs the batch Lambda returned no result for
+    for job in jobs[len(results):]:
+        error_message = f"Batch scraper returned no result for {job['campgroundId']}"
+        logger.error(error_message)
+        results.append({
+            "error": error_message,
+            "timestamp": datetime.now().isoformat()
+        })
+    
+    return results
+
+ACCOMMODATION_TYPES = ("tent", "rv", "lodging")
+
+def make_cache_key(campground_id, start_date, end_date, num_adults, num_kids):
+    return f"{campground_id}_{start_date}_{end_date}_{num_adults}_{num_kids}"
+
+def normalize_types(types):
+    """
+    Validate the optional `types` field of an availability request.
+    
+    Args:
+        types (list or None): Requested accommodation types
+        
+    Returns:
+        tuple: (types, error) - the types in canonical order (None for all types) and an
+            error message if they are invalid
+    """
+    if types is None:
+        return None, None
+    if not isinstance(types, list) or not types or any(t not in ACCOMMODATION_TYPES for t in types):
+        return None, f"types must be a non-empty list of {', '.join(ACCOMMODATION_TYPES)}"
+    return [t for t in ACCOMMODATION_TYPES if t in types], None
+
+def scrape_max_age(cache_key):
+    """
+    How old a result the scraper has cached for a stay may be, given the backend's own cache.
+    
+    Must be called before get_cached_availability, which evicts expired entries.
+    
+    Args:
+        cache_key (str): The availability cache key
+        
+    Returns:
+        int: SCRAPER_MAX_AGE_REFRESH when the backend holds an entry for the stay (it is
+            refreshing expired or adding missing types), SCRAPER_MAX_AGE_COLD otherwise
+    """
+    if f"{cache_key}_meta" in availability_cache:
+        return SCRAPER_MAX_AGE_REFRESH
+    return SCRAPER_MAX_AGE_COLD
+
+def _cache_lookup(entry_key):
+    """Return a fresh cache entry's value, evicting it if it has expired."""
+    entry = availability_cache.get(entry_key)
+    if entry is None:
+        return None
+    value, timestamp = entry
+    if time.time() - timestamp < CACHE_DURATION:
+        return value
+    if availability_cache.pop(entry_key, None) is not None:
+        metrics.CACHE_EVICTIONS.labels("expired").inc()
+        metrics.CACHE_ENTRIES.labels().set(len(availability_cache))
+    return None
+
+def get_cached_availability(cache_key, campground_id, types=None):
+    """
+    Look up cached availability, merging the per-type entries.
+    
+    Results are cached per accommodation type, so a request for some types can be
+    answered from earlier requests for other subsets. Without `types`, the request is
+    for every type the campground offers, which is known once it has been scraped in full.
+    
+    Args:
+        cache_key (str): The availability cache key
+        campground_id (str): The campground the lookup is for (used as a metric label)
+        types (list): Requested accommodation types, or None for all of them
+        
+    Returns:
+        tuple: (result, missing) - the cached types merged into one result (None if none
+            are cached) and the types still to scrape (empty on a full hit, None when the
+            campground's types are unknown and it has to be scraped in full)
+    """
+    meta = _cache_lookup(f"{cache_key}_meta")
+    if types is None:
+        types = meta.get("types") if meta else None
+        if types is None:
+            metrics.CACHE_MISSES.labels(campground_id).inc()
+            return None, None
+    
+    result = {}
+    missing = []
+    for accommodation_type in types:
+        cached = _cache_lookup(f"{cache_key}_{accommodation_type}")
+        if cached is None:
+            missing.append(accommodation_type)
+        elif cached is not False:
+            # False marks a type the campground does not offer
+            result[accommodation_type] = cached
+    
+    if missing:
+        metrics.CACHE_MISSES.labels(campground_id).inc()
+    else:
+        metrics.CACHE_HITS.labels(campground_id).inc()
+    
+    if len(missing) == len(types):
+        return None, missing
+    if meta:
+        result.update({key: value for key, value in meta.items() if key != "types"})
+    return result, missing
+
+def _cache_put(entry_key, value):
+    availability_cache.pop(entry_key, None)
+    availability_cache[entry_key] = (value, time.time())
+
+def store_cached_availability(cache_key, result, types=None):
+    """
+    Store an availability result per accommodation type, evicting the oldest entries
+    once the cache is full.
+    
+    Args:
+        cache_key (str): The availability cache key
+        result (dict): The scraper result to cache
+        types (list): The types the scrape was asked for, or None if it was a full scrape
+    """
+    partial = result.get('partial', False)
+    if partial:
+        # The deadline cut the scrape short; only the types it returned are known
+        types = [t for t in (types or ACCOMMODATION_TYPES) if t in result]
+    
+    meta = _cache_lookup(f"{cache_key}_meta") or {}
+    meta = {**meta, **{key: value for key, value in result.items() if key not in ACCOMMODATION_TYPES and key != 'partial'}}
+    if types is None:
+        # A full scrape tells which types the campground offers
+        meta["types"] = [t for t in ACCOMMODATION_TYPES if t in result]
+    _cache_put(f"{cache_key}_meta", meta)
+    
+    for accommodation_type in (types or ACCOMMODATION_TYPES):
+        _cache_put(f"{cache_key}_{accommodation_type}", result.get(accommodation_type, False))
+    
+    # Dicts keep insertion order, so the first keys are the oldest entries
+    while len(availability_cache) > CACHE_MAX_ENTRIES:
+        try:
+            oldest_key = next(iter(availability_cache))
+            del availability_cache[oldest_key]
+        except (StopIteration, KeyError, RuntimeError):
+            break
+        metrics.CACHE_EVICTIONS.labels("capacity").inc()
+    
+    metrics.CACHE_ENTRIES.labels().set(len(availability_cache))
+
+def record_scrape(campground_id, start_date, end_date, num_adults, num_kids, result):
+    """Keep a successful scrape result beyond the cache, in the snapshot store and the availability matrix."""
+    if result.get('error'):
+        return
+    # Types the scraper failed to check are marked "error" and would be recorded as closed
+    checked = {name: value for name, value in result.items() if not (isinstance(value, dict) and value.get('error'))}
+    snapshots.record(campground_id, start_date, end_date, num_adults, num_kids, checked)
+    # The availability matrix (and NumPy) is imported by the first heatmap request; until
+    # then there are no matrices to update
+    matrix_module = sys.modules.get('helpers.availability_matrix')
+    if matrix_module is not None:
+        matrix_module.observe(campground_id, start_date, end_date, num_adults, num_kids, result)
+
+def merge_availability(cached_result, result):
+    """Combine cached types with freshly scraped ones (errors are returned as they are)."""
+    if cached_result is None or 'error' in result:
+        return result
+    return {**cached_result, **result}
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.trace = tracing.Trace(
+        f"{request.method} {request.path}",
+        trace_id=tracing.valid_trace_id(request.headers.get('X-Trace-Id')),
+        queue_ms=tracing.parse_request_start(request.headers.get('X-Request-Start'))
+    )
+
+@app.after_request
+def record_request_latency(response):
+    started = getattr(g, 'request_started', None)
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    if started is not None:
+        metrics.HTTP_REQUEST_DURATION.labels(route, request.method, response.status_code).observe(
+            time.perf_counter() - started
+        )
+    
+    trace = getattr(g, 'trace', None)
+    if trace is not None:
+        trace.finish(response.status_code)
+        response.headers['X-Trace-Id'] = trace.trace_id
+        response.headers['Server-Timing'] = trace.server_timing()
+        if not route.startswith('/api/traces') and route != '/api/metrics':
+            tracing.store_trace(trace)
+    return response
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Expose backend metrics in Prometheus text format"""
+    return Response(metrics.render_metrics(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/traces', methods=['GET'])
+def list_traces():
+    """Return the most recent request traces held by this worker"""
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify(tracing.recent_traces(limit))
+
+@app.route('/api/traces/<trace_id>', methods=['GET'])
+def get_trace(trace_id):
+    """Return a single request trace with per-stage timings"""
+    trace = tracing.get_trace(trace_id)
+    if trace is None:
+        return jsonify({"error": f"No trace found for {trace_id}"}), 404
+    return jsonify(trace)
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -130,40 +539,335 @@ def check_availability():
     if not all([campground_id, start_date, end_date]):
         return jsonify({"error": "Missing required parameters"}), 400
     
+    types, types_error = normalize_types(data.get('types'))
+    if types_error:
+        return jsonify({"error": types_error}), 400
+    
     try:
-        # Check cache
-        cache_key = f"{campground_id}_{start_date}_{end_date}_{num_adults}_{num_kids}"
-        if cache_key in availability_cache:
-            cached_result, timestamp = availability_cache[cache_key]
-            if time.time() - timestamp < CACHE_DURATION:
-                return jsonify(cached_result)
-        
-        # Get lambda mappings
+        # Get lambda mappings; unknown campgrounds are rejected before the cache (and its
+        # per-campground metrics) sees them
         lambda_mappings = get_lambda_mappings()
         lambda_path = lambda_mappings.get(campground_id)
         
         if not lambda_path:
             return jsonify({"error": f"No scraper configured for {campground_id}"}), 404
         
+        # Check cache; types cached by earlier requests are merged with the ones still to scrape
+        cache_key = make_cache_key(campground_id, start_date, end_date, num_adults, num_kids)
+        max_age = scrape_max_age(cache_key)
+        cached_result, missing_types = get_cached_availability(cache_key, campground_id, types)
+        if missing_types == []:
+            return jsonify(cached_result)
+        
         payload = {
             "startDate": start_date,
             "endDate": end_date,
             "numAdults": num_adults,
             "numKids": num_kids
         }
+        if missing_types is not None:
+            payload["types"] = missing_types
         
-        result = call_lambda_function(lambda_path, payload)
+        deadline = scrape_deadline()
+        if local_scrapers.is_local(campground_id):
+            result = call_local_scraper(campground_id, payload, trace=g.trace, deadline=deadline, max_age=max_age)
+        else:
+            result = call_lambda_function(lambda_path, payload, trace=g.trace, deadline=deadline, max_age=max_age)
         
         if 'error' not in result:
-            availability_cache[cache_key] = (result, time.time())
+            store_cached_availability(cache_key, result, missing_types)
+            record_scrape(campground_id, start_date, end_date, num_adults, num_kids, result)
         
-        return jsonify(result)
+        return jsonify(merge_availability(cached_result, result))
+    
+    except Exception as e:
+        return jsonify({
+            "error": f"Internal server error: {str(e)}",
+            "timestamp": datetime.now().isoformat()
+        }), 500
+
+@app.route('/api/availability/batch', methods=['POST'])
+def check_availability_batch():
+    """
+    Check availability for several campgrounds (and date ranges) in one request.
+    
+    Cached results are returned directly. Campgrounds configured for in-process
+    scraping run locally; the rest go to the batch Lambda when there are at least
+    BATCH_MIN_CAMPGROUNDS of them, and to their own Lambdas otherwise.
+    """
+    data = request.json
+    if not data or not isinstance(data.get('requests'), list):
+        return jsonify({"error": "No requests provided"}), 400
+    
+    items = data['requests']
+    lambda_mappings = get_lambda_mappings()
+    results = {}
+    pending = {}
+    cached_parts = {}
+    
+    # Result key of each item, in order; invalid items get one of their own
+    item_keys = []
+    
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            item_keys.append(f"#{index}")
+            results[item_keys[-1]] = {"error": "Each request must be an object"}
+            continue
+        campground_id = item.get('campgroundId')
+        start_date = item.get('startDate')
+        end_date = item.get('endDate')
+        num_adults = item.get('numAdults', 2)
+        num_kids = item.get('numKids', 0)
+        types, types_error = normalize_types(item.get('types'))
+        
+        error = None
+        if not all([campground_id, start_date, end_date]):
+            error = "Missing required parameters"
+        elif not isinstance(campground_id, str) or campground_id not in lambda_mappings:
+            error = f"No scraper configured for {campground_id}"
+        elif types_error:
+            error = types_error
+        if error:
+            item_keys.append(f"#{index}")
+            results[item_keys[-1]] = {"error": error}
+            continue
+        
+        # Requests for different types of the same stay are answered separately
+        cache_key = make_cache_key(campground_id, start_date, end_date, num_adults, num_kids)
+        key = f"{cache_key}|{','.join(types or [])}"
+        item_keys.append(key)
+        if key in results or key in pending:
+            continue
+        
+        max_age = scrape_max_age(cache_key)
+        cached_result, missing_types = get_cached_availability(cache_key, campground_id, types)
+        if missing_types == []:
+            results[key] = cached_result
+            continue
+        
+        cached_parts[key] = (cache_key, cached_result, missing_types)
+        pending[key] = {
+            "campgroundId": campground_id,
+            "startDate": start_date,
+            "endDate": end_date,
+            "numAdults": num_adults,
+            "numKids": num_kids,
+            "maxAge": max_age
+        }
+        if missing_types is not None:
+            pending[key]["types"] = missing_types
+    
+    try:
+        local_keys = [key for key, job in pending.items() if local_scrapers.is_local(job['campgroundId'])]
+        lambda_keys = [key for key in pending if key not in local_keys]
+        trace = g.trace
+        # Every scrape of the request shares one deadline, including those waiting for a worker
+        deadline = scrape_deadline()
+        
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            futures = []
+            for key in local_keys:
+                job = pending[key]
+                payload = {name: value for name, value in job.items() if name != 'campgroundId'}
+                futures.append(([key], executor.submit(call_local_scraper, job['campgroundId'], payload, trace=trace, deadline=deadline)))
+            
+            if len(lambda_keys) >= BATCH_MIN_CAMPGROUNDS:
+                for offset in range(0, len(lambda_keys), BATCH_MAX_JOBS):
+                    keys = lambda_keys[offset:offset + BATCH_MAX_JOBS]
+                    futures.append((keys, executor.submit(call_batch_lambda, [pending[key] for key in keys], trace=trace, deadline=deadline)))
+            else:
+                for key in lambda_keys:
+                    job = pending[key]
+                    payload = {name: value for name, value in job.items() if name != 'campgroundId'}
+                    lambda_path = lambda_mappings[job['campgroundId']]
+                    futures.append(([key], executor.submit(call_lambda_function, lambda_path, payload, trace=trace, deadline=deadline)))
+            
+            for keys, future in futures:
+                outcome = future.result()
+                for key, result in zip(keys, outcome if isinstance(outcome, list) else [outcome]):
+                    cache_key, cached_result, missing_types = cached_parts[key]
+                    if 'error' not in result:
+                        store_cached_availability(cache_key, result, missing_types)
+                        job = pending[key]
+                        record_scrape(job['campgroundId'], job['startDate'], job['endDate'],
+                                      job['numAdults'], job['numKids'], result)
+                    results[key] = merge_availability(cached_result, result)
     
     except Exception as e:
         return jsonify({
             "error": f"Internal server error: {str(e)}",
             "timestamp": datetime.now().isoformat()
         }), 500
+    
+    response = []
+    for item, key in zip(items, item_keys):
+        item = item if isinstance(item, dict) else {}
+        response.append({
+            "campgroundId": item.get('campgroundId'),
+            "startDate": item.get('startDate'),
+            "endDate": item.get('endDate'),
+            "result": results[key]
+        })
+    
+    return jsonify({"results": response, "timestamp": datetime.now().isoformat()})
+
+@app.route('/api/availability/changes', methods=['GET'])
+def get_availability_changes():
+    """
+    Return the availability change feed, oldest first.
+    
+    Query parameters: `since` (the last change ID already seen, default 0),
+    `campgroundId` and `limit` (default 100, at most 1000). Poll again with
+    `since` set to the returned `next`.
+    """
+    since = request.args.get('since', 0, type=int)
+    limit = request.args.get('limit', 100, type=int)
+    campground_id = request.args.get('campgroundId')
+    
+    try:
+        changes = snapshots.changes(since, campground_id, limit)
+    except sqlite3.Error as e:
+        return jsonify({"error": f"Could not read the change feed: {str(e)}"}), 500
+    
+    return jsonify({
+        "changes": changes,
+        "next": changes[-1]["id"] if changes else since,
+        "timestamp": datetime.now().isoformat()
+    })
+
+def format_date(value):
+    """Format a date the way the API takes them (M/D/YY)."""
+    return f"{value.month}/{value.day}/{str(value.year)[2:]}"
+
+def scrape_heatmap_gaps(jobs, num_adults, num_kids, types, trace):
+    """
+    Scrape single nights for the heatmap, one scraper call per campground job.
+    
+    Args:
+        jobs (list): (campground ID, [nights]) pairs from heatmap.scrape_jobs
+        num_adults (int): Adults in the party
+        num_kids (int): Kids in the party
+        types (list): Accommodation types to scrape, or None for all of them
+        trace (Trace): Request trace to record the calls in
+        
+    Returns:
+        int: Nights scraped successfully
+    """
+    lambda_mappings = get_lambda_mappings()
+    deadline = scrape_deadline()
+    
+    def scrape(job):
+        campground_id, nights = job
+        payload = {
+            "ranges": [{"startDate": format_date(night), "endDate": format_date(night + timedelta(days=1))} for night in nights],
+            "numAdults": num_adults,
+            "numKids": num_kids
+        }
+        if types is not None:
+            payload["types"] = types
+        # Gap nights have no backend entry
+        if local_scrapers.is_local(campground_id):
+            return call_local_scraper(campground_id, payload, trace=trace, deadline=deadline,
+                                      max_age=SCRAPER_MAX_AGE_COLD)
+        return call_lambda_function(lambda_mappings[campground_id], payload, trace=trace, deadline=deadline,
+                                    max_age=SCRAPER_MAX_AGE_COLD)
+    
+    scraped = 0
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        for (campground_id, _), outcome in zip(jobs, executor.map(scrape, jobs)):
+            for entry in outcome.get('ranges', []):
+                result = entry.get('result')
+                if result is None or 'error' in result:
+                    continue
+                cache_key = make_cache_key(campground_id, entry['startDate'], entry['endDate'], num_adults, num_kids)
+                store_cached_availability(cache_key, result, types)
+                record_scrape(campground_id, entry['startDate'], entry['endDate'], num_adults, num_kids, result)
+                scraped += 1
+    return scraped
+
+@app.route('/api/destinations/<destination_id>/heatmap', methods=['GET'])
+def get_destination_heatmap(destination_id):
+    """
+    Return, for every start date from `from` to `to`, whether the destination's itinerary
+    of `nights` nights is bookable and its lowest total price.
+    
+    Answers come from the availability matrix. Nights it does not know are scraped a
+    few at a time (see helpers/heatmap.py), so start dates may come back unknown
+    (`bookable` null) and fill in on later requests. Optional query parameters:
+    `numAdults`, `numKids` and `types` (comma-separated).
+    """
+    # Imported here so NumPy is only loaded by workers that serve the heatmap
+    from helpers import availability_matrix, heatmap
+    
+    nights = request.args.get('nights', type=int)
+    from_str = request.args.get('from')
+    to_str = request.args.get('to')
+    num_adults = request.args.get('numAdults', 2, type=int)
+    num_kids = request.args.get('numKids', 0, type=int)
+    
+    if not all([nights, from_str, to_str]):
+        return jsonify({"error": "Missing required parameters"}), 400
+    if num_adults < 1 or num_kids < 0 or num_adults + num_kids > heatmap.MAX_PARTY_SIZE:
+        return jsonify({"error": f"numAdults must be at least 1 and numKids at least 0, "
+                                 f"with at most {heatmap.MAX_PARTY_SIZE} people in total"}), 400
+    
+    try:
+        first_start = datetime.strptime(from_str, '%m/%d/%y').date()
+        last_start = datetime.strptime(to_str, '%m/%d/%y').date()
+    except ValueError:
+        return jsonify({"error": "from and to must be dates in MM/DD/YY format"}), 400
+    
+    num_starts = (last_start - first_start).days + 1
+    if num_starts < 1 or num_starts > heatmap.MAX_DAYS:
+        return jsonify({"error": f"to must be on or after from, and at most {heatmap.MAX_DAYS} days later"}), 400
+    
+    types_param = request.args.get('types')
+    types, types_error = normalize_types(types_param.split(',') if types_param else None)
+    if types_error:
+        return jsonify({"error": types_error}), 400
+    
+    if destination_id not in TRIP_ITINERARIES:
+        return jsonify({"error": f"No itinerary found for destination: {destination_id}"}), 404
+    stops = heatmap.itinerary_stops(destination_id, nights)
+    if stops is None:
+        return jsonify({"error": f"No itinerary found for {destination_id} with {nights} nights"}), 404
+    if not all(campground_ids for campground_ids, _ in stops):
+        return jsonify({"error": f"No scraped campgrounds for this itinerary: {destination_id} with {nights} nights"}), 404
+    
+    try:
+        matrix = availability_matrix.get_matrix(num_adults, num_kids)
+        
+        gap_nights = heatmap.gaps(matrix, stops, first_start, num_starts, types)
+        jobs = []
+        for job in heatmap.scrape_jobs(gap_nights, heatmap.get_scrapes_per_request()):
+            if not heatmap.limiter.acquire():
+                break
+            jobs.append(job)
+        scraped = scrape_heatmap_gaps(jobs, num_adults, num_kids, types, g.trace) if jobs else 0
+        
+        status, price = availability_matrix.itinerary(matrix, stops, first_start, num_starts, types)
+    except Exception as e:
+        logger.error(f"Error building heatmap for {destination_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    
+    bookable = {availability_matrix.YES: True, availability_matrix.NO: False, availability_matrix.UNKNOWN: None}
+    days = []
+    for offset in range(num_starts):
+        days.append({
+            "startDate": format_date(first_start + timedelta(days=offset)),
+            "bookable": bookable[int(status[offset])],
+            "minPrice": None if math.isnan(float(price[offset])) else round(float(price[offset]), 2)
+        })
+    
+    return jsonify({
+        "destinationId": destination_id,
+        "nights": nights,
+        "days": days,
+        "unknownDays": sum(1 for day in days if day["bookable"] is None),
+        "scrapedNights": scraped,
+        "pendingNights": max(len(gap_nights) - sum(len(job_nights) for _, job_nights in jobs), 0),
+        "timestamp": datetime.now().isoformat()
+    })
 
 @app.route('/api/trip-plan', methods=['POST'])
 def generate_trip_plan():
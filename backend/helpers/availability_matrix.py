@@ -0,0 +1,345 @@
+"""
+Helper module for the in-memory availability matrix.
+
+Availability is held in NumPy arrays indexed by campground x night x accommodation
+type, one matrix per party size:
+
+    known        Whether the night has been observed
+    available    Whether it was available
+    price        The nightly price (NaN when unknown or not available)
+    observed_at  When it was observed (Unix time), so stale cells can be ignored
+
+plus `offered`, campground x type, the types each campground's results have
+reported. Scrapers leave out types a campground does not have, so once a
+campground has been seen, its missing types count as not available.
+
+The matrix is filled from scraper results as the backend receives them and, on
+first use, from the snapshot store (see snapshots.py). A result for a stay says
+every night of it is available when the stay is, but a multi-night stay that is
+not available does not say which night is missing, so only single-night results
+mark nights as unavailable.
+
+Queries are vectorized over the whole calendar: whether a stay of N nights is
+bookable at a campground for every start date (a sliding window over nights), the
+same across the campgrounds of a city (any), and across the stops of an itinerary
+(all), with the minimum total price. A stay counts as bookable when each of its
+nights is available with the same accommodation type, which can be optimistic when
+different sites are free on different nights.
+
+Answers are tri-state: YES, NO or UNKNOWN, for stays with nights that have not been
+observed (or were observed longer than `max_age` seconds ago).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from helpers import snapshots
+from helpers.lambda_mappings import get_lambda_mappings
+
+ACCOMMODATION_TYPES = ("tent", "rv", "lodging")
+
+YES = 1
+NO = 0
+UNKNOWN = -1
+
+# Nights covered by each matrix, starting yesterday
+DEFAULT_DAYS = 400
+
+# Observations older than this are ignored by queries unless they ask otherwise
+DEFAULT_MAX_AGE = 6 * 60 * 60
+
+# Party sizes held at once; the least recently used matrix is dropped beyond this
+DEFAULT_MAX_MATRICES = 8
+
+# Least recently used first
+_matrices = OrderedDict()
+_matrices_lock = threading.Lock()
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    for date_format in ('%m/%d/%y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, date_format).date()
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def get_max_age():
+    try:
+        return float(os.environ.get('AVAILABILITY_MATRIX_MAX_AGE', DEFAULT_MAX_AGE))
+    except ValueError:
+        return DEFAULT_MAX_AGE
+
+
+def get_max_matrices():
+    try:
+        return max(int(os.environ.get('AVAILABILITY_MATRIX_MAX_MATRICES', DEFAULT_MAX_MATRICES)), 1)
+    except ValueError:
+        return DEFAULT_MAX_MATRICES
+
+
+class AvailabilityMatrix:
+    """Night-level availability of a set of campgrounds over a fixed range of nights."""
+
+    def __init__(self, campground_ids, first_night, num_nights):
+        self.campground_ids = list(campground_ids)
+        self.first_night = first_night
+        self.num_nights = num_nights
+        self._index = {campground_id: i for i, campground_id in enumerate(self.campground_ids)}
+        self._lock = threading.Lock()
+
+        shape = (len(self.campground_ids), num_nights, len(ACCOMMODATION_TYPES))
+        self.known = np.zeros(shape, dtype=bool)
+        self.available = np.zeros(shape, dtype=bool)
+        self.price = np.full(shape, np.nan, dtype=np.float32)
+        self.observed_at = np.zeros(shape, dtype=np.float64)
+        self.offered = np.zeros((len(self.campground_ids), len(ACCOMMODATION_TYPES)), dtype=bool)
+
+    def night_index(self, night):
+        """Position of a night in the matrix (may fall outside it)."""
+        return (_to_date(night) - self.first_night).days
+
+    def rebase(self, first_night):
+        """Move the matrix forward so it starts at `first_night`, dropping the nights before it."""
+        shift = (first_night - self.first_night).days
+        if shift <= 0:
+            return
+        with self._lock:
+            for array, empty in ((self.known, False), (self.available, False),
+                                 (self.price, np.nan), (self.observed_at, 0.0)):
+                if shift < self.num_nights:
+                    array[:, :-shift] = array[:, shift:]
+                array[:, max(self.num_nights - shift, 0):] = empty
+            self.first_night = first_night
+
+    def observe(self, campground_id, start_date, end_date, accommodation_type, available, price=None, observed_at=None):
+        """
+        Record one accommodation type of a scraped stay.
+
+        Args:
+            campground_id (str): Campground ID
+            start_date (str or date): Check-in date (MM/DD/YY, ISO or a date)
+            end_date (str or date): Check-out date
+            accommodation_type (str): "tent", "rv" or "lodging"
+            available (bool): Whether the stay was available
+            price (float): Nightly price, if known
+            observed_at (float): When the stay was scraped (Unix time, default now)
+        """
+        row = self._index.get(campground_id)
+        start, end = _to_date(start_date), _to_date(end_date)
+        if row is None or start is None or end is None or accommodation_type not in ACCOMMODATION_TYPES:
+            return
+        column = ACCOMMODATION_TYPES.index(accommodation_type)
+        self.offered[row, column] = True
+        if not available and (end - start).days != 1:
+            return
+
+        first = max(self.night_index(start), 0)
+        last = min(self.night_index(end), self.num_nights)
+        if first >= last:
+            return
+
+        observed_at = observed_at if observed_at is not None else time.time()
+        with self._lock:
+            # Cells already holding a newer observation keep it
+            nights = np.arange(first, last)
+            nights = nights[self.observed_at[row, nights, column] <= observed_at]
+            self.known[row, nights, column] = True
+            self.available[row, nights, column] = bool(available)
+            self.price[row, nights, column] = price if available and price is not None else np.nan
+            self.observed_at[row, nights, column] = observed_at
+
+    def observe_result(self, campground_id, start_date, end_date, result, observed_at=None):
+        """Record every accommodation type of a scraper result, except those the scraper failed to check."""
+        for accommodation_type in ACCOMMODATION_TYPES:
+            value = result.get(accommodation_type)
+            if isinstance(value, dict) and value.get('error'):
+                # The campground has the type, but the failed check says nothing about its nights
+                row = self._index.get(campground_id)
+                if row is not None:
+                    self.offered[row, ACCOMMODATION_TYPES.index(accommodation_type)] = True
+            elif isinstance(value, dict):
+                self.observe(campground_id, start_date, end_date, accommodation_type, bool(value.get('available')),
+                             snapshots.parse_price(value.get('price')), observed_at)
+
+    def cells(self, campground_ids, first_night, num_nights, types=None, max_age=None):
+        """
+        Copy a block of the matrix.
+
+        Nights outside the matrix, campgrounds it does not cover and observations older
+        than `max_age` are reported as unknown.
+
+        Returns:
+            tuple: (known, available, price) arrays shaped (campgrounds, nights, types),
+                and `offered` shaped (campgrounds, types)
+        """
+        max_age = get_max_age() if max_age is None else max_age
+        columns = [ACCOMMODATION_TYPES.index(t) for t in (types or ACCOMMODATION_TYPES)]
+        shape = (len(campground_ids), num_nights, len(columns))
+        known = np.zeros(shape, dtype=bool)
+        available = np.zeros(shape, dtype=bool)
+        price = np.full(shape, np.nan, dtype=np.float32)
+        offered = np.zeros((len(campground_ids), len(columns)), dtype=bool)
+
+        rows = [(i, self._index[c]) for i, c in enumerate(campground_ids) if c in self._index]
+        if not rows:
+            return known, available, price, offered
+        targets, sources = map(list, zip(*rows))
+        offered[targets] = self.offered[np.ix_(sources, columns)]
+
+        offset = self.night_index(first_night)
+        first, last = max(offset, 0), min(offset + num_nights, self.num_nights)
+        if first >= last:
+            return known, available, price, offered
+
+        block = np.ix_(sources, np.arange(first, last), columns)
+        with self._lock:
+            fresh = self.known[block] & (self.observed_at[block] >= time.time() - max_age)
+            known[targets, first - offset:last - offset] = fresh
+            available[targets, first - offset:last - offset] = self.available[block] & fresh
+            price[targets, first - offset:last - offset] = np.where(fresh, self.price[block], np.nan)
+        return known, available, price, offered
+
+    def stays(self, campground_ids, first_start, num_starts, nights, types=None, max_age=None):
+        """
+        Whether a stay of `nights` nights is bookable at each campground, for consecutive start dates.
+
+        Returns:
+            tuple: (status, price) arrays shaped (campgrounds, starts) - YES/NO/UNKNOWN and
+                the lowest total price over the accommodation types (NaN when unknown)
+        """
+        known, available, price, offered = self.cells(campground_ids, first_start, num_starts + nights - 1, types,
+                                                      max_age)
+
+        # (campgrounds, starts, types, nights) windows over the nights axis
+        all_available = sliding_window_view(available, nights, axis=1).all(axis=-1)
+        any_unavailable = sliding_window_view(known & ~available, nights, axis=1).any(axis=-1)
+        total = sliding_window_view(price, nights, axis=1).sum(axis=-1)
+
+        # Types missing from a campground's results are not offered there
+        not_offered = ~offered & offered.any(axis=1, keepdims=True)
+        any_unavailable |= not_offered[:, np.newaxis, :]
+
+        status = np.where(all_available.any(axis=-1), YES, np.where(any_unavailable.all(axis=-1), NO, UNKNOWN))
+        total = np.fmin.reduce(np.where(all_available, total, np.nan), axis=-1)
+        return status.astype(np.int8), total
+
+
+def any_of(status, price):
+    """
+    Combine campgrounds (axis 0): bookable when any of them is.
+
+    Returns:
+        tuple: (status, price) with the first axis reduced, price being the lowest
+    """
+    combined = np.where((status == YES).any(axis=0), YES, np.where((status == NO).all(axis=0), NO, UNKNOWN))
+    return combined.astype(np.int8), np.fmin.reduce(price, axis=0)
+
+
+def all_of(status, price):
+    """
+    Combine stops (axis 0): bookable when every one of them is.
+
+    Returns:
+        tuple: (status, price) with the first axis reduced, price being the total
+    """
+    combined = np.where((status == NO).any(axis=0), NO, np.where((status == YES).all(axis=0), YES, UNKNOWN))
+    return combined.astype(np.int8), np.where(combined == YES, price.sum(axis=0), np.nan)
+
+
+def itinerary(matrix, stops, first_start, num_starts, types=None, max_age=None):
+    """
+    Whether a multi-stop trip is bookable for consecutive start dates.
+
+    Args:
+        matrix (AvailabilityMatrix): The party's matrix
+        stops (list): (campground IDs, nights) per stop, in travel order
+        first_start (date): First trip start date
+        num_starts (int): Number of consecutive start dates
+        types (list): Accommodation types to consider, or None for all of them
+
+    Returns:
+        tuple: (status, price) arrays shaped (starts,) - YES/NO/UNKNOWN and the lowest
+            total price of the trip (NaN unless bookable)
+    """
+    statuses, prices = [], []
+    offset = 0
+    for campground_ids, nights in stops:
+        status, price = matrix.stays(campground_ids, first_start + timedelta(days=offset), num_starts, nights,
+                                     types, max_age)
+        status, price = any_of(status, price)
+        statuses.append(status)
+        prices.append(price)
+        offset += nights
+    return all_of(np.array(statuses), np.array(prices))
+
+
+def _new_matrix(num_adults, num_kids):
+    try:
+        days = int(os.environ.get('AVAILABILITY_MATRIX_DAYS', DEFAULT_DAYS))
+    except ValueError:
+        days = DEFAULT_DAYS
+    matrix = AvailabilityMatrix(get_lambda_mappings(), date.today() - timedelta(days=1), days)
+    for campground_id, start_date, end_date, accommodation_type, available, price, observed_at in snapshots.latest(
+            num_adults, num_kids, since=time.time() - get_max_age()):
+        matrix.observe(campground_id, start_date, end_date, accommodation_type, bool(available), price, observed_at)
+    return matrix
+
+
+def get_matrix(num_adults, num_kids):
+    """
+    Return the matrix for a party size, creating it (from the snapshot store) on first use.
+
+    The snapshot store is read outside the lock, so other party sizes are not held
+    up; when two requests build the same matrix at once, the first one kept wins.
+    Beyond `AVAILABILITY_MATRIX_MAX_MATRICES` party sizes, the least recently used
+    matrix is dropped.
+
+    Args:
+        num_adults (int): Adults in the party
+        num_kids (int): Kids in the party
+
+    Returns:
+        AvailabilityMatrix: The party's matrix, covering every campground with a scraper
+    """
+    key = (int(num_adults), int(num_kids))
+    with _matrices_lock:
+        matrix = _matrices.get(key)
+        if matrix is not None:
+            _matrices.move_to_end(key)
+    if matrix is None:
+        built = _new_matrix(num_adults, num_kids)
+        with _matrices_lock:
+            matrix = _matrices.setdefault(key, built)
+            _matrices.move_to_end(key)
+            while len(_matrices) > get_max_matrices():
+                _matrices.popitem(last=False)
+    matrix.rebase(date.today() - timedelta(days=1))
+    return matrix
+
+
+def observe(campground_id, start_date, end_date, num_adults, num_kids, result):
+    """
+    Record a scraper result in its party's matrix.
+
+    Only matrices that already exist are updated, so the request path never reads
+    the snapshot store; a matrix created later loads the result from there.
+    """
+    try:
+        key = (int(num_adults), int(num_kids))
+    except (TypeError, ValueError):
+        return
+    matrix = _matrices.get(key)
+    if matrix is not None and isinstance(result, dict):
+        matrix.observe_result(campground_id, start_date, end_date, result)
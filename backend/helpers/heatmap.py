@@ -0,0 +1,163 @@
+"""
+Helper module for the destination availability heatmap.
+
+The heatmap answers, for every start date in a season, whether a destination's
+itinerary is bookable and what it costs at least. Answers come from the
+availability matrix (see availability_matrix.py). Nights the matrix does not know
+are scraped as single-night stays, the finest data the matrix can hold, but only
+a few scraper calls per request and per minute are allowed, so a calendar page
+view never fans out into hundreds of live scrapes. Start dates that are still
+unknown are reported as such, and fill in on later requests.
+"""
+
+import os
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+
+from helpers import availability_matrix
+from helpers.campgrounds_data import get_campgrounds_data
+from helpers.lambda_mappings import get_lambda_mappings
+from helpers.trip_itineraries import TRIP_ITINERARIES
+
+# Longest season one request may cover, in start dates
+MAX_DAYS = 120
+
+# Largest party a request may ask about; each party size gets its own matrix
+MAX_PARTY_SIZE = 12
+
+# Single-night ranges per scraper call; scrapers handle ranges one after another
+RANGES_PER_CALL = 7
+
+DEFAULT_SCRAPES_PER_REQUEST = 4
+DEFAULT_SCRAPES_PER_MINUTE = 20
+
+
+def _setting(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class RateLimiter:
+    """
+    Token bucket shared by the requests of this worker.
+
+    Holds up to `burst` tokens and regains `per_minute` of them a minute. `acquire`
+    never waits: a request that finds the bucket empty scrapes less.
+    """
+
+    def __init__(self, per_minute, burst=None):
+        self.per_minute = per_minute
+        self.burst = burst if burst is not None else per_minute
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token if one is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.per_minute / 60.0)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+limiter = RateLimiter(_setting('HEATMAP_SCRAPES_PER_MINUTE', DEFAULT_SCRAPES_PER_MINUTE))
+
+
+def get_scrapes_per_request():
+    return _setting('HEATMAP_SCRAPES_PER_REQUEST', DEFAULT_SCRAPES_PER_REQUEST)
+
+
+def itinerary_stops(destination_id, nights):
+    """
+    Returns:
+        list or None: (campground IDs with a scraper, nights) per stop of the itinerary,
+            or None if the destination has no itinerary of that length. A stop's list is
+            empty when none of its campgrounds has a scraper
+    """
+    itinerary = TRIP_ITINERARIES.get(destination_id, {}).get(nights)
+    if itinerary is None:
+        return None
+    campgrounds = get_campgrounds_data()
+    lambda_mappings = get_lambda_mappings()
+    return [
+        ([campground['id'] for campground in campgrounds.get(stop['city'], []) if campground['id'] in lambda_mappings],
+         stop['nights'])
+        for stop in itinerary
+    ]
+
+
+def gaps(matrix, stops, first_start, num_starts, types=None):
+    """
+    Nights to scrape to settle the start dates the matrix cannot answer yet.
+
+    Only stops that are unknown for a start date that is unknown overall count, and
+    in them only the nights a campground has no observation for. Campgrounds known
+    not to offer any of the requested types are skipped.
+
+    Returns:
+        list: (campground ID, night) pairs, earliest start dates first
+    """
+    columns = [availability_matrix.ACCOMMODATION_TYPES.index(t) for t in (types or availability_matrix.ACCOMMODATION_TYPES)]
+    stop_details = []
+    offset = 0
+    for campground_ids, nights in stops:
+        status, price = matrix.stays(campground_ids, first_start + timedelta(days=offset), num_starts, nights, types)
+        stop_status, _ = availability_matrix.any_of(status, price)
+        known, _, _, offered = matrix.cells(campground_ids, first_start + timedelta(days=offset),
+                                            num_starts + nights - 1)
+        observed = known[:, :, columns].any(axis=-1)
+        skipped = offered.any(axis=1) & ~offered[:, columns].any(axis=1)
+        stop_details.append((campground_ids, nights, offset, stop_status, observed, skipped))
+        offset += nights
+
+    overall, _ = availability_matrix.all_of(np.array([detail[3] for detail in stop_details]),
+                                            np.zeros((len(stop_details), num_starts)))
+
+    pairs = []
+    seen = set()
+    for start in np.flatnonzero(overall == availability_matrix.UNKNOWN):
+        for campground_ids, nights, offset, stop_status, observed, skipped in stop_details:
+            if stop_status[start] != availability_matrix.UNKNOWN:
+                continue
+            for row, campground_id in enumerate(campground_ids):
+                if skipped[row]:
+                    continue
+                for night in range(start, start + nights):
+                    pair = (campground_id, first_start + timedelta(days=int(offset + night)))
+                    # Past nights cannot be booked, and nights outside the matrix cannot be held
+                    if not 0 < matrix.night_index(pair[1]) < matrix.num_nights:
+                        continue
+                    if not observed[row, night] and pair not in seen:
+                        seen.add(pair)
+                        pairs.append(pair)
+    return pairs
+
+
+def scrape_jobs(gap_nights, max_jobs):
+    """
+    Group gap nights into scraper calls of up to RANGES_PER_CALL single-night ranges.
+
+    Returns:
+        list: At most `max_jobs` (campground ID, [nights]) pairs, the calls covering
+            the earliest nights first
+    """
+    nights_by_campground = {}
+    for campground_id, night in gap_nights:
+        nights_by_campground.setdefault(campground_id, []).append(night)
+
+    jobs = []
+    for campground_id, nights in nights_by_campground.items():
+        nights = sorted(nights)
+        for offset in range(0, len(nights), RANGES_PER_CALL):
+            jobs.append((campground_id, nights[offset:offset + RANGES_PER_CALL]))
+    jobs.sort(key=lambda job: job[1][0])
+    return jobs[:max_jobs]
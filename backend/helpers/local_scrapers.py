@@ -0,0 +1,159 @@
+"""
+Helper module for running scrapers inside the backend instead of on AWS Lambda.
+
+Campgrounds listed in the LOCAL_SCRAPERS environment variable (comma-separated IDs,
+or "all") are scraped by importing their Lambda module from aws-lambda/scrapers and
+calling its `lambda_handler` in a process pool. This skips API Gateway, the Lambda
+cold start and two network hops, and because the same handler runs, the result
+contract is identical to the Lambda path (including the `timings` field).
+"""
+
+import atexit
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCRAPERS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'aws-lambda'))
+DEFAULT_WORKERS = 4
+
+_pool = None
+_pool_lock = threading.Lock()
+_registry = None
+
+
+def _add_scrapers_path(scrapers_path):
+    if scrapers_path not in sys.path:
+        sys.path.insert(0, scrapers_path)
+
+
+def _init_worker(scrapers_path):
+    """Runs once in each pool process."""
+    _add_scrapers_path(scrapers_path)
+    # Every local campground runs in these processes, so providers may share lookups between them
+    os.environ['SCRAPER_SHARE_SIBLINGS'] = '1'
+
+
+def get_scrapers_path():
+    """Directory containing the `scrapers` package (SCRAPERS_PATH, default ../aws-lambda)."""
+    return os.environ.get('SCRAPERS_PATH', DEFAULT_SCRAPERS_PATH)
+
+
+def _load_registry():
+    """
+    Import the scraper registry from the aws-lambda directory.
+
+    Returns:
+        module or None: scrapers.registry, or None if the scrapers are not deployed alongside the backend
+    """
+    global _registry
+    if _registry is None:
+        scrapers_path = get_scrapers_path()
+        if not os.path.isdir(os.path.join(scrapers_path, 'scrapers')):
+            logger.warning(f"LOCAL_SCRAPERS is set but no scrapers were found in {scrapers_path}; using Lambda")
+            _registry = False
+        else:
+            _add_scrapers_path(scrapers_path)
+            from scrapers import registry
+            _registry = registry
+    return _registry or None
+
+
+def get_local_campgrounds():
+    """
+    Returns:
+        set: Campground IDs configured to run in-process (may contain "all")
+    """
+    configured = os.environ.get('LOCAL_SCRAPERS', '')
+    return {campground_id.strip() for campground_id in configured.split(',') if campground_id.strip()}
+
+
+def is_local(campground_id):
+    """
+    Check whether a campground should be scraped in-process.
+
+    Args:
+        campground_id (str): Campground ID, e.g. "anchor-inn"
+
+    Returns:
+        bool: True if the campground is configured for local execution and has a registered scraper
+    """
+    local_campgrounds = get_local_campgrounds()
+    if not local_campgrounds or (campground_id not in local_campgrounds and 'all' not in local_campgrounds):
+        return False
+
+    registry = _load_registry()
+    return registry is not None and campground_id in registry.SCRAPER_MODULES
+
+
+def _run_handler(campground_id, payload):
+    """Runs in a pool process: invoke the scraper's Lambda handler with an API Gateway-style event."""
+    from scrapers import registry
+
+    handler = registry.get_handler(campground_id)
+    response = handler({'body': json.dumps(payload)}, None)
+    return response.get('statusCode', 500), json.loads(response.get('body') or '{}')
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned (not forked) workers, so they never inherit Flask or Gunicorn threads
+            _pool = ProcessPoolExecutor(
+                max_workers=int(os.environ.get('LOCAL_SCRAPER_WORKERS', DEFAULT_WORKERS)),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(get_scrapers_path(),)
+            )
+        return _pool
+
+
+def _reset_pool():
+    """Drop a broken pool (e.g. a worker was killed) so the next call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def run_scraper(campground_id, payload, timeout=30):
+    """
+    Run a campground's scraper in the process pool.
+
+    Args:
+        campground_id (str): Campground ID, e.g. "anchor-inn"
+        payload (dict): The same payload that would be sent to the Lambda
+        timeout (int): Seconds to wait for the result
+
+    Returns:
+        tuple: (status_code, body) as the Lambda would have returned them
+
+    Raises:
+        concurrent.futures.TimeoutError: If the scraper did not finish in time
+        BrokenProcessPool: If a pool worker died
+    """
+    future = _get_pool().submit(_run_handler, campground_id, payload)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        # Only drops the job if it has not started; a running scraper finishes in the background
+        future.cancel()
+        raise
+    except BrokenProcessPool:
+        _reset_pool()
+        raise
+
+
+@atexit.register
+def _shutdown_pool():
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,272 @@
+"""
+Helper module containing lightweight Prometheus-style metric collectors.
+
+Collectors are kept in-process (one set per Gunicorn worker) and rendered in the
+Prometheus text exposition format by the /api/metrics endpoint. Each labelled
+child carries its own lock, so recording a sample only costs a dict lookup and an
+uncontended lock acquire on the request path.
+"""
+
+import threading
+from bisect import bisect_left
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, spanning cache hits through slow Lambda scrapes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.extend(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _CounterChild:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0.0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def samples(self):
+        return [("", (), self._value)]
+
+
+class _GaugeChild:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0.0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value):
+        with self._lock:
+            self._value = value
+
+    def samples(self):
+        return [("", (), self._value)]
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self._lock = threading.Lock()
+        self._upper_bounds = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+
+    def observe(self, value):
+        index = bisect_left(self._upper_bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def samples(self):
+        with self._lock:
+            counts = list(self._counts)
+            total_sum = self._sum
+
+        samples = []
+        cumulative = 0
+        for upper_bound, count in zip(self._upper_bounds + (float('inf'),), counts):
+            cumulative += count
+            samples.append(("_bucket", (("le", _format_value(upper_bound)),), cumulative))
+        samples.append(("_count", (), cumulative))
+        samples.append(("_sum", (), total_sum))
+        return samples
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *labelvalues):
+        """
+        Return the child collector for the given label values, creating it on first use.
+        """
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labelvalues}")
+
+        key = tuple(str(value) for value in labelvalues)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._new_child()
+                    self._children[key] = child
+        return child
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ]
+        for labelvalues, child in sorted(self._children.items()):
+            for suffix, extra_labels, value in child.samples():
+                labels = _format_labels(self.labelnames, labelvalues, extra_labels)
+                lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+
+class Registry:
+    """
+    A collection of metrics rendered together for a scrape of /api/metrics.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        """
+        Render every registered metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition document, terminated by a newline
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+LAMBDA_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "caravan_lambda_request_duration_seconds",
+    "Wall-clock time spent calling a scraper Lambda, including API Gateway.",
+    ["lambda_path"]
+))
+LAMBDA_REQUESTS = REGISTRY.register(Counter(
+    "caravan_lambda_requests_total",
+    "Scraper Lambda calls by outcome status (HTTP status code, timeout or connection_error).",
+    ["lambda_path", "status"]
+))
+LAMBDA_ERRORS = REGISTRY.register(Counter(
+    "caravan_lambda_errors_total",
+    "Scraper Lambda calls that did not return a usable result.",
+    ["lambda_path", "reason"]
+))
+LAMBDA_TIMEOUTS = REGISTRY.register(Counter(
+    "caravan_lambda_timeouts_total",
+    "Scraper Lambda calls abandoned after the backend timeout.",
+    ["lambda_path"]
+))
+LAMBDA_IN_FLIGHT = REGISTRY.register(Gauge(
+    "caravan_lambda_in_flight_requests",
+    "Outbound scraper Lambda calls currently waiting for a response.",
+    ["lambda_path"]
+))
+LOCAL_SCRAPER_DURATION = REGISTRY.register(Histogram(
+    "caravan_local_scraper_duration_seconds",
+    "Wall-clock time spent running a scraper in the backend's process pool.",
+    ["campground_id"]
+))
+LOCAL_SCRAPER_RUNS = REGISTRY.register(Counter(
+    "caravan_local_scraper_runs_total",
+    "In-process scraper runs by outcome status (HTTP status code, timeout or error).",
+    ["campground_id", "status"]
+))
+CACHE_HITS = REGISTRY.register(Counter(
+    "caravan_availability_cache_hits_total",
+    "Availability lookups answered from the in-process cache.",
+    ["campground_id"]
+))
+CACHE_MISSES = REGISTRY.register(Counter(
+    "caravan_availability_cache_misses_total",
+    "Availability lookups that had to call a scraper.",
+    ["campground_id"]
+))
+CACHE_EVICTIONS = REGISTRY.register(Counter(
+    "caravan_availability_cache_evictions_total",
+    "Availability cache entries removed, by reason (expired or capacity).",
+    ["reason"]
+))
+CACHE_ENTRIES = REGISTRY.register(Gauge(
+    "caravan_availability_cache_entries",
+    "Availability cache entries currently held by this worker."
+))
+SNAPSHOT_RECORDS = REGISTRY.register(Counter(
+    "caravan_snapshot_records_total",
+    "Availability snapshot rows by outcome (written, dropped when the queue is full, or failed).",
+    ["outcome"]
+))
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "caravan_http_request_duration_seconds",
+    "Flask request latency by route.",
+    ["route", "method", "status"]
+))
+
+
+def render_metrics():
+    """
+    Render all backend metrics for the /api/metrics endpoint.
+
+    Returns:
+        str: The metrics in Prometheus text exposition format
+    """
+    return REGISTRY.render()
@@ -0,0 +1,427 @@
+"""
+Helper module for the availability snapshot store and its change feed.
+
+Every successful scrape is recorded in a local SQLite database as one row per
+accommodation type: (campground, date range, party size, type, available, price,
+observed_at). The availability cache forgets results after 30 minutes; the store
+keeps them for SNAPSHOT_RETENTION_DAYS (default 180).
+
+Recording never touches the database on the request path. `record` only puts the
+result on a queue, and a background thread writes queued results in batches, one
+transaction each. If the queue is full (more than SNAPSHOT_QUEUE_SIZE results
+waiting), results are dropped and counted in the metrics.
+
+The database has three tables:
+
+    snapshots  Every observation, append-only (rowid order is observation order)
+    latest     The most recent observation per campground, dates, party and type
+    changes    The change feed: one row whenever an observation differs from the
+               previous one for the same key ("new", "opened", "closed" or "price")
+
+The store is written to SNAPSHOT_DB_PATH (default backend/snapshots.db). Setting it
+to an empty string disables the store. The database runs in WAL mode, so every
+Gunicorn worker can write to it and read the feed at the same time.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from helpers import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'snapshots.db'))
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_RETENTION_DAYS = 180
+
+ACCOMMODATION_TYPES = ("tent", "rv", "lodging")
+
+# Results written per transaction, and how often old rows are pruned
+WRITE_BATCH_SIZE = 500
+PRUNE_INTERVAL = 3600
+
+MAX_FEED_LIMIT = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    campground_id TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    num_adults INTEGER NOT NULL,
+    num_kids INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    available INTEGER NOT NULL,
+    price REAL,
+    observed_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS latest (
+    campground_id TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    num_adults INTEGER NOT NULL,
+    num_kids INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    available INTEGER NOT NULL,
+    price REAL,
+    observed_at REAL NOT NULL,
+    PRIMARY KEY (campground_id, start_date, end_date, num_adults, num_kids, type)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS changes (
+    id INTEGER PRIMARY KEY,
+    campground_id TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    num_adults INTEGER NOT NULL,
+    num_kids INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    change TEXT NOT NULL,
+    available INTEGER NOT NULL,
+    price REAL,
+    previous_available INTEGER,
+    previous_price REAL,
+    previous_observed_at REAL,
+    observed_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS changes_by_campground ON changes (campground_id, id);
+"""
+
+_queue = None
+_writer = None
+_writer_lock = threading.Lock()
+_schema_ready = set()
+_STOP = object()
+
+
+def get_db_path():
+    """Path of the snapshot database, or None when the store is disabled."""
+    return os.environ.get('SNAPSHOT_DB_PATH', DEFAULT_DB_PATH) or None
+
+
+def _retention_seconds():
+    try:
+        return float(os.environ.get('SNAPSHOT_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)) * 86400
+    except ValueError:
+        return DEFAULT_RETENTION_DAYS * 86400
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, timeout=10)
+    connection.row_factory = sqlite3.Row
+    if path not in _schema_ready:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        _schema_ready.add(path)
+    # WAL makes NORMAL safe against corruption; only the last commits can be lost on power failure
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+def _normalize_date(value):
+    try:
+        return datetime.strptime(value, '%m/%d/%y').date().isoformat()
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _party(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_price(value):
+    """
+    Returns:
+        float or None: A scraper price (number or text like "$129.00") as a number
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace('$', '').replace(',', '').strip())
+    except ValueError:
+        return None
+
+
+def observations(campground_id, start_date, end_date, num_adults, num_kids, result, observed_at=None):
+    """
+    Turn a scraper result into snapshot rows, one per accommodation type it reports.
+
+    Returns:
+        list: (campground_id, start_date, end_date, num_adults, num_kids, type, available,
+            price, observed_at) tuples, with dates in ISO format
+    """
+    observed_at = observed_at if observed_at is not None else time.time()
+    key = (
+        campground_id, _normalize_date(start_date), _normalize_date(end_date),
+        _party(num_adults, 2), _party(num_kids, 0)
+    )
+    rows = []
+    for accommodation_type in ACCOMMODATION_TYPES:
+        value = result.get(accommodation_type)
+        if not isinstance(value, dict):
+            continue
+        available = bool(value.get('available'))
+        rows.append(key + (accommodation_type, int(available), parse_price(value.get('price')), observed_at))
+    return rows
+
+
+def classify_change(previous, available, price):
+    """
+    Compare an observation with the previous one for the same key.
+
+    Args:
+        previous (sqlite3.Row or None): The `latest` row, if there is one
+        available (int): 1 if available, 0 otherwise
+        price (float or None): The observed price
+
+    Returns:
+        str or None: "new", "opened", "closed" or "price", or None if nothing changed
+    """
+    if previous is None:
+        return "new"
+    if previous["available"] != available:
+        return "opened" if available else "closed"
+    if available and previous["price"] != price:
+        return "price"
+    return None
+
+
+def write(connection, rows):
+    """Append observations, update the latest values and record the changes, in one transaction."""
+    with connection:
+        connection.executemany(
+            "INSERT INTO snapshots (campground_id, start_date, end_date, num_adults, num_kids, type,"
+            " available, price, observed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        for row in rows:
+            key, (available, price, observed_at) = row[:6], row[6:]
+            previous = connection.execute(
+                "SELECT available, price, observed_at FROM latest WHERE campground_id = ? AND start_date = ?"
+                " AND end_date = ? AND num_adults = ? AND num_kids = ? AND type = ?",
+                key
+            ).fetchone()
+            if previous is not None and previous["observed_at"] > observed_at:
+                # Another worker already wrote a newer observation
+                continue
+
+            change = classify_change(previous, available, price)
+            if change is not None:
+                connection.execute(
+                    "INSERT INTO changes (campground_id, start_date, end_date, num_adults, num_kids, type, change,"
+                    " available, price, previous_available, previous_price, previous_observed_at, observed_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    key + (change, available, price) + (
+                        (previous["available"], previous["price"], previous["observed_at"]) if previous is not None
+                        else (None, None, None)
+                    ) + (observed_at,)
+                )
+            connection.execute(
+                "INSERT OR REPLACE INTO latest (campground_id, start_date, end_date, num_adults, num_kids, type,"
+                " available, price, observed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row
+            )
+
+
+def prune(connection, now=None):
+    """
+    Delete snapshots and changes older than the retention period.
+
+    Both tables are appended in time order, so the old rows are the lowest IDs and
+    no index on observed_at is needed to find them.
+    """
+    cutoff = (now if now is not None else time.time()) - _retention_seconds()
+    with connection:
+        for table in ("snapshots", "changes"):
+            first_kept = connection.execute(
+                f"SELECT id FROM {table} WHERE observed_at >= ? ORDER BY id LIMIT 1", (cutoff,)
+            ).fetchone()
+            if first_kept is not None:
+                connection.execute(f"DELETE FROM {table} WHERE id < ?", (first_kept["id"],))
+            else:
+                connection.execute(f"DELETE FROM {table}")
+
+
+def _run_writer(path, pending):
+    connection = None
+    last_prune = 0.0
+    while True:
+        batch = [pending.get()]
+        while len(batch) < WRITE_BATCH_SIZE:
+            try:
+                batch.append(pending.get_nowait())
+            except queue.Empty:
+                break
+
+        stop = any(rows is _STOP for rows in batch)
+        rows = [row for rows in batch if rows is not _STOP for row in rows]
+        try:
+            if connection is None:
+                connection = _connect(path)
+            if rows:
+                write(connection, rows)
+                metrics.SNAPSHOT_RECORDS.labels("written").inc(len(rows))
+            if time.monotonic() - last_prune > PRUNE_INTERVAL:
+                prune(connection)
+                last_prune = time.monotonic()
+        except sqlite3.Error as e:
+            logger.error(f"Could not write {len(rows)} availability snapshots to {path}: {str(e)}")
+            metrics.SNAPSHOT_RECORDS.labels("failed").inc(len(rows))
+        finally:
+            for _ in batch:
+                pending.task_done()
+
+        if stop:
+            if connection is not None:
+                connection.close()
+            return
+
+
+def _start_writer(path):
+    global _queue, _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            try:
+                size = int(os.environ.get('SNAPSHOT_QUEUE_SIZE', DEFAULT_QUEUE_SIZE))
+            except ValueError:
+                size = DEFAULT_QUEUE_SIZE
+            _queue = queue.Queue(maxsize=size)
+            _writer = threading.Thread(target=_run_writer, args=(path, _queue), name="snapshot-writer", daemon=True)
+            _writer.start()
+        return _queue
+
+
+def record(campground_id, start_date, end_date, num_adults, num_kids, result):
+    """
+    Queue a successful scrape result for the snapshot store.
+
+    Args:
+        campground_id (str): Campground ID, e.g. "anchor-inn"
+        start_date (str): Check-in date (MM/DD/YY)
+        end_date (str): Check-out date (MM/DD/YY)
+        num_adults (int): Adults in the party
+        num_kids (int): Kids in the party
+        result (dict): The scraper result; only the accommodation types it contains are recorded
+    """
+    path = get_db_path()
+    if path is None or not isinstance(result, dict):
+        return
+    rows = observations(campground_id, start_date, end_date, num_adults, num_kids, result)
+    if not rows:
+        return
+    try:
+        _start_writer(path).put_nowait(rows)
+    except queue.Full:
+        metrics.SNAPSHOT_RECORDS.labels("dropped").inc(len(rows))
+
+
+def flush():
+    """Wait until every queued result has been written."""
+    if _queue is not None and _writer is not None and _writer.is_alive():
+        _queue.join()
+
+
+@atexit.register
+def _stop_writer():
+    if _queue is not None and _writer is not None and _writer.is_alive():
+        try:
+            _queue.put(_STOP, timeout=1)
+        except queue.Full:
+            return
+        _writer.join(timeout=5)
+
+
+def _row_to_change(row):
+    change = {
+        "id": row["id"],
+        "campgroundId": row["campground_id"],
+        "startDate": row["start_date"],
+        "endDate": row["end_date"],
+        "numAdults": row["num_adults"],
+        "numKids": row["num_kids"],
+        "type": row["type"],
+        "change": row["change"],
+        "available": bool(row["available"]),
+        "price": row["price"],
+        "observedAt": datetime.fromtimestamp(row["observed_at"]).isoformat()
+    }
+    if row["previous_observed_at"] is not None:
+        change["previous"] = {
+            "available": bool(row["previous_available"]),
+            "price": row["previous_price"],
+            "observedAt": datetime.fromtimestamp(row["previous_observed_at"]).isoformat()
+        }
+    return change
+
+
+def changes(since=0, campground_id=None, limit=100):
+    """
+    Read the change feed.
+
+    Args:
+        since (int): Only return changes with a higher ID (the `id` of the last change seen)
+        campground_id (str): Only return changes for this campground
+        limit (int): Maximum number of changes, capped at MAX_FEED_LIMIT
+
+    Returns:
+        list: Changes in the order they were recorded, oldest first
+    """
+    path = get_db_path()
+    if path is None or not os.path.exists(path):
+        return []
+
+    limit = max(1, min(limit, MAX_FEED_LIMIT))
+    query = "SELECT * FROM changes WHERE id > ?"
+    params = [since]
+    if campground_id:
+        query += " AND campground_id = ?"
+        params.append(campground_id)
+    query += " ORDER BY id LIMIT ?"
+    params.append(limit)
+
+    connection = _connect(path)
+    try:
+        return [_row_to_change(row) for row in connection.execute(query, params)]
+    finally:
+        connection.close()
+
+
+def latest(num_adults, num_kids, since=0):
+    """
+    Read the most recent observation of every stay for one party size.
+
+    Args:
+        num_adults (int): Adults in the party
+        num_kids (int): Kids in the party
+        since (float): Only return observations made at or after this Unix time
+
+    Returns:
+        list: (campground_id, start_date, end_date, type, available, price, observed_at)
+            tuples, with dates in ISO format
+    """
+    path = get_db_path()
+    if path is None or not os.path.exists(path):
+        return []
+
+    connection = _connect(path)
+    try:
+        return [tuple(row) for row in connection.execute(
+            "SELECT campground_id, start_date, end_date, type, available, price, observed_at FROM latest"
+            " WHERE num_adults = ? AND num_kids = ? AND observed_at >= ?",
+            (_party(num_adults, 2), _party(num_kids, 0), since)
+        )]
+    finally:
+        connection.close()
@@ -0,0 +1,254 @@
+"""
+Helper module for end-to-end request tracing.
+
+A Trace is created for every Flask request. Its context is sent to the scraper
+Lambdas in the payload (`trace`), and the stage timings they return in the
+`timings` field are merged back in, so a slow trip plan can be broken down into
+backend queueing, API Gateway overhead, Lambda cold start, deliberate sleeps,
+upstream fetches and parsing.
+"""
+
+import logging
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+MAX_STORED_TRACES = 500
+SLOW_TRACE_THRESHOLD_MS = 5000
+
+# Client-supplied trace IDs are accepted only in this form; anything else gets a new ID
+TRACE_ID_PATTERN = re.compile(r'[A-Za-z0-9-]{1,64}')
+
+
+def new_id():
+    return uuid.uuid4().hex[:16]
+
+
+def valid_trace_id(value):
+    """
+    Return a client-supplied trace ID if it is safe to log and use as a key.
+
+    Returns:
+        str or None: The ID, or None unless it is 1-64 letters, digits and dashes
+    """
+    if value and TRACE_ID_PATTERN.fullmatch(value):
+        return value
+    return None
+
+
+def parse_request_start(header_value, now=None):
+    """
+    Work out how long a request queued before Flask saw it.
+
+    Args:
+        header_value (str): X-Request-Start header set by the router, e.g. "t=1718000000123456"
+        now (float): Current epoch time in seconds
+
+    Returns:
+        float or None: Queue time in milliseconds, or None if the header is missing or invalid
+    """
+    if not header_value:
+        return None
+
+    value = header_value.strip()
+    if value.startswith('t='):
+        value = value[2:]
+
+    try:
+        started = float(value)
+    except ValueError:
+        return None
+
+    # Routers send seconds, milliseconds or microseconds since the epoch
+    if started > 1e14:
+        started /= 1e6
+    elif started > 1e11:
+        started /= 1e3
+
+    now = now if now is not None else time.time()
+    return max(0.0, round((now - started) * 1000, 2))
+
+
+class Trace:
+    """
+    The spans recorded while serving a single backend request.
+    """
+
+    def __init__(self, name, trace_id=None, queue_ms=None):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.span_id = new_id()
+        self.name = name
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.queue_ms = queue_ms
+        self.duration_ms = None
+        self.status = None
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def child_context(self):
+        """
+        Build the trace context sent to a Lambda in its payload.
+
+        Returns:
+            dict: {"traceId", "spanId"} identifying the new child span
+        """
+        return {"traceId": self.trace_id, "spanId": new_id()}
+
+    def add_span(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span({
+                "name": name,
+                "spanId": new_id(),
+                "offsetMs": round((started - self.started) * 1000, 2),
+                "durationMs": round((time.perf_counter() - started) * 1000, 2),
+                **attributes
+            })
+
+    def add_lambda_call(self, lambda_path, context, started, ended, status, timings=None):
+        """
+        Record an outbound Lambda call together with the timings the Lambda reported.
+
+        The difference between the backend's wall-clock time and the Lambda's own
+        total is attributed to API Gateway and the network.
+        """
+        duration_ms = round((ended - started) * 1000, 2)
+        span = {
+            "name": f"lambda:{lambda_path}",
+            "spanId": context["spanId"],
+            "offsetMs": round((started - self.started) * 1000, 2),
+            "durationMs": duration_ms,
+            "status": status
+        }
+
+        if timings:
+            lambda_total = timings.get("totalMs") or 0.0
+            span["lambda"] = timings
+            span["coldStart"] = timings.get("coldStart", False)
+            span["gatewayMs"] = round(max(0.0, duration_ms - lambda_total), 2)
+
+        self.add_span(span)
+
+    def add_batch_job(self, campground_id, timings):
+        """
+        Record the stage timings one job of a batch Lambda call reported.
+
+        The job ran inside the batch invocation, so it has no gateway overhead of its own.
+        Its timings name the batch call's span as their parent.
+        """
+        self.add_span({
+            "name": f"batch-job:{campground_id}",
+            "spanId": new_id(),
+            "parentSpanId": timings.get("parentSpanId"),
+            "durationMs": timings.get("totalMs"),
+            "lambda": timings,
+            "coldStart": False,
+            "gatewayMs": 0.0
+        })
+
+    def finish(self, status):
+        self.status = status
+        self.duration_ms = round((time.perf_counter() - self.started) * 1000, 2)
+
+    def server_timing(self):
+        """
+        Build a Server-Timing header value so clients (e.g. loadtest.py) can see
+        how long the request queued for a worker and how long the worker was busy.
+        """
+        entries = [f"app;dur={self.duration_ms}"]
+        if self.queue_ms is not None:
+            entries.insert(0, f"queue;dur={self.queue_ms}")
+        return ", ".join(entries)
+
+    def summary(self):
+        """
+        Aggregate time per stage across all spans, including Lambda-reported stages.
+
+        A batch Lambda call contributes its gateway and init time only; the upstream,
+        parse and other stages of its jobs are counted once, from the job spans.
+
+        Returns:
+            dict: Milliseconds per stage name
+        """
+        totals = {}
+
+        def add(name, value):
+            totals[name] = round(totals.get(name, 0.0) + value, 2)
+
+        if self.queue_ms is not None:
+            add("queue", self.queue_ms)
+
+        with self._lock:
+            spans = list(self.spans)
+        batch_span_ids = {span.get("parentSpanId") for span in spans if span["name"].startswith("batch-job:")}
+
+        for span in spans:
+            lambda_timings = span.get("lambda")
+            if not lambda_timings:
+                add(span["name"].split(":")[0], span["durationMs"])
+                continue
+            add("gateway", span.get("gatewayMs", 0.0))
+            if lambda_timings.get("coldStart"):
+                add("init", lambda_timings.get("initMs", 0.0))
+            if span["spanId"] in batch_span_ids:
+                continue
+            for stage_name, value in (lambda_timings.get("totals") or {}).items():
+                add(stage_name, value)
+
+        return totals
+
+    def as_dict(self):
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "traceId": self.trace_id,
+            "name": self.name,
+            "startedAt": self.started_at,
+            "durationMs": self.duration_ms,
+            "queueMs": self.queue_ms,
+            "status": self.status,
+            "summary": self.summary(),
+            "spans": spans
+        }
+
+
+_traces = OrderedDict()
+_traces_lock = threading.Lock()
+
+
+def store_trace(trace):
+    """
+    Keep a finished trace for the /api/traces endpoints and log it if it was slow.
+    """
+    with _traces_lock:
+        _traces[trace.trace_id] = trace
+        while len(_traces) > MAX_STORED_TRACES:
+            _traces.popitem(last=False)
+
+    if trace.duration_ms is not None and trace.duration_ms >= SLOW_TRACE_THRESHOLD_MS:
+        logger.info(f"Slow request trace {trace.trace_id} ({trace.name}, {trace.duration_ms}ms): {trace.summary()}")
+
+
+def get_trace(trace_id):
+    with _traces_lock:
+        trace = _traces.get(trace_id)
+    return trace.as_dict() if trace else None
+
+
+def recent_traces(limit=50):
+    with _traces_lock:
+        traces = list(_traces.values())[-limit:]
+    return [trace.as_dict() for trace in reversed(traces)]
@@ -0,0 +1,301 @@
+"""
+Load-test harness for the backend API.
+
+Drives the availability, batch availability and trip-plan endpoints with a fixed
+number of concurrent virtual users and reports throughput, latency percentiles and
+worker saturation.
+Run it against a backend whose AWS_API_URL points at aws-lambda/local_gateway.py
+so no real Lambda invocations are spent.
+
+Scenarios:
+
+    availability  POST /api/availability for random campgrounds and date ranges
+    trip          POST /api/trip-plan, then /api/availability for every campground
+                  on every stop (what the frontend does when a trip is planned)
+    batch         POST /api/trip-plan, then one /api/availability/batch request
+                  covering every campground on every stop
+    mixed         60% availability, 20% trip, 20% batch
+
+Worker saturation is derived from the Server-Timing header the backend sets on every
+response: `app` is the time a worker spent on the request and `queue` the time it
+waited for a worker (from the X-Request-Start header this harness sends).
+
+Example:
+
+    AWS_API_URL=http://localhost:3001 gunicorn -w 4 --bind 0.0.0.0:5001 deploy:app
+    python loadtest.py --scenario trip --concurrency 20 --duration 60 --workers 4
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+
+from helpers.campgrounds_data import get_campgrounds_data
+from helpers.trip_itineraries import TRIP_ITINERARIES
+
+SERVER_TIMING_PATTERN = re.compile(r"(\w+);dur=([\d.]+)")
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def format_date(date):
+    return f"{date.month:02d}/{date.day:02d}/{str(date.year)[2:]}"
+
+
+class Stats:
+    """
+    Thread-safe collection of per-request samples.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = []
+
+    def add(self, endpoint, status, latency_ms, app_ms, queue_ms):
+        with self._lock:
+            self.samples.append({
+                "endpoint": endpoint,
+                "status": status,
+                "latencyMs": latency_ms,
+                "appMs": app_ms,
+                "queueMs": queue_ms
+            })
+
+    def report(self, wall_seconds, workers=None):
+        """
+        Summarise the run.
+
+        Returns:
+            dict: Overall and per-endpoint throughput, latency percentiles and saturation
+        """
+        with self._lock:
+            samples = list(self.samples)
+
+        def summarise(group):
+            latencies = [sample["latencyMs"] for sample in group]
+            queue_times = [sample["queueMs"] for sample in group if sample["queueMs"] is not None]
+            errors = sum(1 for sample in group if sample["status"] != 200)
+            return {
+                "requests": len(group),
+                "errors": errors,
+                "errorRate": round(errors / len(group), 4) if group else 0.0,
+                "throughputPerSecond": round(len(group) / wall_seconds, 2) if wall_seconds else 0.0,
+                "p50Ms": percentile(latencies, 0.50),
+                "p95Ms": percentile(latencies, 0.95),
+                "p99Ms": percentile(latencies, 0.99),
+                "maxMs": max(latencies) if latencies else None,
+                "queueP95Ms": percentile(queue_times, 0.95)
+            }
+
+        report = summarise(samples)
+        report["wallSeconds"] = round(wall_seconds, 2)
+        report["endpoints"] = {}
+        for endpoint in sorted({sample["endpoint"] for sample in samples}):
+            report["endpoints"][endpoint] = summarise([s for s in samples if s["endpoint"] == endpoint])
+
+        # Busy workers on average = total worker time / wall time (Little's law)
+        busy_ms = sum(sample["appMs"] for sample in samples if sample["appMs"] is not None)
+        busy_workers = busy_ms / 1000 / wall_seconds if wall_seconds else 0.0
+        report["avgBusyWorkers"] = round(busy_workers, 2)
+        if workers:
+            report["workerUtilization"] = round(busy_workers / workers, 3)
+
+        return report
+
+
+class LoadTest:
+    def __init__(self, base_url, stats, timeout, date_pool, max_nights):
+        self.base_url = base_url.rstrip("/")
+        self.stats = stats
+        self.timeout = timeout
+        self.max_nights = max_nights
+        self.campground_ids = [
+            campground["id"]
+            for campgrounds in get_campgrounds_data().values()
+            for campground in campgrounds
+        ]
+        # A small pool of start dates controls how often the backend cache is hit
+        first_date = datetime.now() + timedelta(days=14)
+        self.start_dates = [first_date + timedelta(days=offset) for offset in range(date_pool)]
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+
+    def post(self, endpoint, payload):
+        started = time.perf_counter()
+        headers = {"X-Request-Start": f"t={int(time.time() * 1e6)}"}
+        app_ms = queue_ms = None
+
+        try:
+            response = self._session().post(f"{self.base_url}{endpoint}", json=payload, headers=headers, timeout=self.timeout)
+            status = response.status_code
+            timings = dict(SERVER_TIMING_PATTERN.findall(response.headers.get("Server-Timing", "")))
+            app_ms = float(timings["app"]) if "app" in timings else None
+            queue_ms = float(timings["queue"]) if "queue" in timings else None
+            body = response.json() if status == 200 else None
+            # Scraper failures are passed through as a 200 with an "error" field
+            if isinstance(body, dict) and "error" in body:
+                status = "scraper_error"
+        except requests.exceptions.Timeout:
+            status, body = "timeout", None
+        except (requests.exceptions.RequestException, ValueError):
+            status, body = "error", None
+
+        latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        self.stats.add(endpoint, status, latency_ms, app_ms, queue_ms)
+        return body
+
+    def availability(self):
+        start = random.choice(self.start_dates)
+        end = start + timedelta(days=random.randint(1, self.max_nights))
+        self.post("/api/availability", {
+            "campgroundId": random.choice(self.campground_ids),
+            "startDate": format_date(start),
+            "endDate": format_date(end),
+            "numAdults": 2,
+            "numKids": random.choice([0, 0, 1, 2])
+        })
+
+    def trip(self, fan_out, batch=False):
+        destination_id = random.choice(list(TRIP_ITINERARIES))
+        nights = random.choice(list(TRIP_ITINERARIES[destination_id]))
+        num_kids = random.choice([0, 0, 1, 2])
+
+        plan = self.post("/api/trip-plan", {
+            "destinationId": destination_id,
+            "nights": nights,
+            "startDate": format_date(random.choice(self.start_dates)),
+            "numAdults": 2,
+            "numKids": num_kids
+        })
+        if not plan:
+            return
+
+        jobs = [
+            {
+                "campgroundId": campground["id"],
+                "startDate": stop["startDate"],
+                "endDate": stop["endDate"],
+                "numAdults": 2,
+                "numKids": num_kids
+            }
+            for stop in plan.get("stops", [])
+            for campground in stop.get("campgrounds", [])
+        ]
+
+        if batch:
+            self.post("/api/availability/batch", {"requests": jobs})
+            return
+
+        # The frontend checks a trip's campgrounds in parallel
+        with ThreadPoolExecutor(max_workers=fan_out) as executor:
+            list(executor.map(lambda job: self.post("/api/availability", job), jobs))
+
+
+def run_user(load_test, scenario, deadline, remaining, remaining_lock, think_time, fan_out):
+    while time.monotonic() < deadline:
+        if remaining is not None:
+            with remaining_lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+
+        choice = scenario
+        if scenario == "mixed":
+            choice = random.choices(["availability", "trip", "batch"], weights=[60, 20, 20])[0]
+
+        if choice == "trip":
+            load_test.trip(fan_out)
+        elif choice == "batch":
+            load_test.trip(fan_out, batch=True)
+        else:
+            load_test.availability()
+
+        if think_time:
+            time.sleep(random.uniform(0, 2 * think_time))
+
+
+def print_report(report, scenario, concurrency):
+    def ms(value):
+        return "-" if value is None else f"{value:.0f}"
+
+    print(f"\nScenario: {scenario}, {concurrency} concurrent users, {report['wallSeconds']}s")
+    print(f"{'endpoint':<22}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}{'queue95':>9}")
+    rows = list(report["endpoints"].items()) + [("total", report)]
+    for endpoint, summary in rows:
+        print(
+            f"{endpoint:<22}{summary['requests']:>10}{summary['errors']:>8}{summary['throughputPerSecond']:>9.2f}"
+            f"{ms(summary['p50Ms']):>8}{ms(summary['p95Ms']):>8}{ms(summary['p99Ms']):>8}{ms(summary['maxMs']):>8}"
+            f"{ms(summary['queueP95Ms']):>9}"
+        )
+
+    saturation = f"Average busy workers: {report['avgBusyWorkers']}"
+    if "workerUtilization" in report:
+        saturation += f" ({report['workerUtilization'] * 100:.1f}% of workers)"
+    print(saturation)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Caravan backend.")
+    parser.add_argument("--base-url", default="http://localhost:5001")
+    parser.add_argument("--scenario", choices=("availability", "trip", "batch", "mixed"), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run for")
+    parser.add_argument("--iterations", type=int, help="Stop after this many scenario iterations in total")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean seconds a user waits between iterations")
+    parser.add_argument("--fan-out", type=int, default=6, help="Parallel availability calls per trip")
+    parser.add_argument("--date-pool", type=int, default=30, help="Distinct start dates (fewer means more cache hits)")
+    parser.add_argument("--max-nights", type=int, default=3, help="Longest stay for availability requests")
+    parser.add_argument("--timeout", type=float, default=60, help="Client timeout per request in seconds")
+    parser.add_argument("--workers", type=int, help="Gunicorn workers, to report utilization")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    stats = Stats()
+    load_test = LoadTest(args.base_url, stats, args.timeout, args.date_pool, args.max_nights)
+    remaining = [args.iterations] if args.iterations else None
+    remaining_lock = threading.Lock()
+
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(
+            target=run_user,
+            args=(load_test, args.scenario, deadline, remaining, remaining_lock, args.think_time, args.fan_out),
+            daemon=True
+        )
+        for _ in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.monotonic() - started
+
+    report = stats.report(wall_seconds, args.workers)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.scenario, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
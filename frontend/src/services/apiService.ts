@@ -55,14 +55,16 @@ export const apiService = {
   },
 
   /**
-   * Check availability for a specific campground and date range
+   * Check availability for a specific campground and date range.
+   * Pass `types` (e.g. ['rv']) to only check those accommodation types.
    */
   async checkAvailability(
     campgroundId: string,
     startDate: string, // Format: MM/DD/YY
     endDate: string,   // Format: MM/DD/YY
     numAdults: number,
-    numKids: number
+    numKids: number,
+    types?: string[]
   ): Promise<FullAvailability> {
     try {
       const response = await api.post('/availability', {
@@ -70,7 +72,8 @@ export const apiService = {
         startDate,
         endDate,
         numAdults,
-        numKids
+        numKids,
+        ...(types ? { types } : {})
       });
       
       return response.data;